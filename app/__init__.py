@@ -0,0 +1,4 @@
+import time
+
+# Reference point of the startup timings: first import of the app package
+IMPORT_STARTED = time.perf_counter()
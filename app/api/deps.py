@@ -1,9 +1,54 @@
-from typing import Generator
-from app.db.session import SessionLocal 
+import time
+from typing import Generator, Optional
+from fastapi import HTTPException, Request, status
+from app.db.deadline import QueryDeadline, QueryInterrupted, query_deadlines
+from app.db.session import SessionLocal
 
-def get_db() -> Generator:
-    db = SessionLocal()
+# Cookie set after a write; holds the time until which reads stay on the primary
+PRIMARY_UNTIL_COOKIE = "db_primary_until"
+
+# nginx's "client closed request"; nobody reads it, but it keeps these out of the 5xx counts
+CLIENT_CLOSED_REQUEST = 499
+
+def _request_deadline(request: Request) -> Optional[QueryDeadline]:
+    """
+    Start the statement deadline of a request's route
+
+    The deadline object is created by QueryDeadlineMiddleware (which also
+    cancels it when the client disconnects).
+    """
+    deadline = request.scope.get("query_deadline")
+    if deadline is not None:
+        route = request.scope.get("route")
+        deadline.start(query_deadlines.timeout_ms(getattr(route, "name", None)))
+    return deadline
+
+def _session(request: Request, **info) -> Generator:
+    deadline = _request_deadline(request)
+    if deadline is not None:
+        info["query_deadline"] = deadline
+    db = SessionLocal(info=info)
     try:
         yield db
+    except QueryInterrupted as e:
+        if e.reason == "disconnect":
+            raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="Client closed request")
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Query exceeded the request deadline")
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_db(request: Request) -> Generator:
+    yield from _session(request)
+
+def get_read_db(request: Request) -> Generator:
+    """
+    Session for read-only endpoints
+
+    Reads go to a replica, except for clients that wrote recently
+    (read-your-writes), which keep reading from the primary.
+    """
+    try:
+        primary_until = float(request.cookies.get(PRIMARY_UNTIL_COOKIE, 0))
+    except ValueError:
+        primary_until = 0
+    yield from _session(request, read_only=primary_until < time.time())
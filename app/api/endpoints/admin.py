@@ -0,0 +1,191 @@
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db
+from app.core.config import settings
+from app.core.memory_profiler import memory_profiler
+from app.core.pubsub import event_hub
+from app.core.slow_query import slow_query_log
+from app.db.deadline import query_deadlines
+from app.db.session import engines
+from app.db.statement_cache import statement_cache_stats
+from app.db.write_coordinator import write_coordinator
+from app.core.response_cache import response_cache
+from app.schemas.job import Job
+from app.services.backup_service import backup_service
+from app.services.book_service import book_service
+from app.services.idempotency_service import idempotency_service
+from app.services.job_service import job_service
+
+
+router = APIRouter()
+
+
+@router.get("/startup")
+def startup_stats(request: Request):
+    """Startup timings of this worker: imports, warm-up steps, total until ready"""
+    return request.app.state.startup
+
+
+@router.get("/singleflight")
+def singleflight_stats():
+    """Request coalescing metrics of the book read paths"""
+    return book_service.reads.stats()
+
+
+@router.get("/admission")
+def admission_stats(request: Request):
+    """Current adaptive concurrency limits per traffic class (empty when admission control is off)"""
+    limits = request.scope.get("admission_limits")
+    return limits.stats() if limits is not None else {}
+
+
+@router.get("/response-cache")
+def response_cache_stats():
+    """Size and hit counts of the precompressed response cache"""
+    return response_cache.stats()
+
+
+@router.get("/stream")
+def stream_stats():
+    """Subscribers and delivery counters of the live event stream"""
+    return event_hub.stats()
+
+
+@router.get("/write-coordinator")
+def write_coordinator_stats():
+    """Group commit metrics of the single-writer mode"""
+    return write_coordinator.stats()
+
+
+@router.get("/query-deadlines")
+def query_deadline_stats():
+    """Statement deadlines and the number of queries interrupted by them or by disconnects"""
+    return query_deadlines.stats()
+
+
+@router.get("/idempotency")
+def idempotency_stats():
+    """Stored, replayed and conflicting Idempotency-Key requests"""
+    return idempotency_service.stats()
+
+
+@router.get("/jobs")
+def job_stats(db: Session = Depends(get_db)):
+    """Job counts per status and the jobs running in this worker"""
+    return job_service.stats(db)
+
+
+@router.post("/reindex", response_model=Job, status_code=status.HTTP_202_ACCEPTED)
+def reindex(db: Session = Depends(get_db)):
+    """Queue a rebuild of the in-memory search indexes and caches of every worker"""
+    return job_service.enqueue(db, "reindex", {})
+
+
+@router.post("/related-index", response_model=Job, status_code=status.HTTP_202_ACCEPTED)
+def rebuild_related_index(db: Session = Depends(get_db)):
+    """Queue a rebuild of the related books index"""
+    return job_service.enqueue(db, "related-index", {})
+
+
+@router.post("/backup", response_model=Job, status_code=status.HTTP_202_ACCEPTED)
+def take_backup(db: Session = Depends(get_db)):
+    """Queue an online backup of the SQLite database and its covers"""
+    # Fail now, not in the job, on databases that cannot be backed up
+    backup_service.database_path()
+    return job_service.enqueue(db, "backup", {})
+
+
+@router.get("/backups")
+def list_backups():
+    """Manifests of the complete backups, newest first"""
+    return backup_service.list_backups()
+
+
+@router.get("/slow-queries")
+def slow_queries(
+    limit: int = Query(10, ge=1, le=100),
+    order_by: Literal["total", "max", "avg", "count"] = "total",
+    explain: bool = False
+):
+    """
+    Worst SQL statements by fingerprint (literals stripped)
+    - order_by: total, max or avg time, or number of executions
+    - explain: Capture the query plan of the reported SELECTs (on the primary)
+    """
+    return slow_query_log.top(limit, order_by, explain_engine=engines.primary if explain else None)
+
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+def reset_slow_queries():
+    """Clear the slow-query aggregates"""
+    slow_query_log.reset()
+
+
+@router.get("/statement-cache")
+def statement_cache():
+    """Hit ratio of SQLAlchemy's compiled statement cache, and statements that cannot be cached"""
+    return statement_cache_stats.stats()
+
+
+@router.delete("/statement-cache", status_code=status.HTTP_204_NO_CONTENT)
+def reset_statement_cache():
+    """Clear the statement cache counters"""
+    statement_cache_stats.reset()
+
+
+def memory_profiling_enabled():
+    """Memory profiling endpoints only exist with MEMORY_PROFILING_ENABLED"""
+    if not settings.MEMORY_PROFILING_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Memory profiling is disabled")
+
+
+@router.get("/memory", dependencies=[Depends(memory_profiling_enabled)])
+def memory_status():
+    """RSS, traced memory and the stored snapshots of this worker"""
+    return memory_profiler.status()
+
+
+@router.post("/memory/start", dependencies=[Depends(memory_profiling_enabled)])
+def start_memory_tracing(frames: Optional[int] = Query(None, ge=1, le=64)):
+    """Start tracing allocations (frames: traceback depth kept per allocation)"""
+    memory_profiler.start(frames)
+    return memory_profiler.status()
+
+
+@router.post("/memory/stop", dependencies=[Depends(memory_profiling_enabled)])
+def stop_memory_tracing():
+    """Stop tracing allocations (snapshots are kept)"""
+    memory_profiler.stop()
+    return memory_profiler.status()
+
+
+@router.post("/memory/snapshots", status_code=status.HTTP_201_CREATED, dependencies=[Depends(memory_profiling_enabled)])
+def take_memory_snapshot(label: str = ""):
+    """Snapshot the traced allocations and live object counts (starts tracing if needed)"""
+    return memory_profiler.take_snapshot(label).summary()
+
+
+@router.delete("/memory/snapshots", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(memory_profiling_enabled)])
+def clear_memory_snapshots():
+    """Drop the stored snapshots"""
+    memory_profiler.clear()
+
+
+@router.get("/memory/diff", dependencies=[Depends(memory_profiling_enabled)])
+def memory_diff(
+    from_id: Optional[int] = None,
+    to_id: Optional[int] = None,
+    group_by: Literal["module", "caller", "lineno"] = "module",
+    limit: int = Query(20, ge=1, le=200),
+):
+    """
+    Memory growth between two snapshots (the last two by default)
+    - group_by: module (MEMORY_PROFILE_GROUPS), caller (innermost app module
+      of each allocation) or lineno (top allocating lines)
+    """
+    try:
+        return memory_profiler.diff(from_id, to_id, group_by, limit)
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, status
 from typing import List
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
+from app.api.deps import get_db, get_read_db
 from app.schemas.author import Author, AuthorCreate, AuthorUpdate
 from app.services.author_service import author_service
 
@@ -11,13 +11,13 @@ router = APIRouter()
 
 
 @router.get("/", response_model=List[Author])
-def list_authors(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def list_authors(skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db)):
     """Get list of authors with pagination"""
     return author_service.get_authors(db, skip=skip, limit=limit)
 
 
 @router.get("/{author_id}", response_model=Author)
-def get_author(author_id: int, db: Session = Depends(get_db)):
+def get_author(author_id: int, db: Session = Depends(get_read_db)):
     """Get an author by its ID"""
     return author_service.get_author(db, author_id)
 
@@ -40,8 +40,17 @@ def delete_author(author_id: int, db: Session = Depends(get_db)):
     return author_service.delete_author(db, author_id)
 
 
+@router.post("/{author_id}/merge-into/{target_id}")
+def merge_author(author_id: int, target_id: int, db: Session = Depends(get_db)):
+    """Move every book of an author to the target author, then delete it"""
+    return author_service.merge_author(db, author_id, target_id)
+
+
 @router.get("/search/", response_model=List[Author])
-def search_authors(keyword: str, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Search authors by name keyword"""
-    return author_service.search_authors(db, keyword, skip=skip, limit=limit)
+def search_authors(keyword: str, skip: int = 0, limit: int = 100, fuzzy: bool = False, db: Session = Depends(get_read_db)):
+    """
+    Search authors by name keyword
+    - fuzzy: Typo-tolerant search ranked by trigram similarity
+    """
+    return author_service.search_authors(db, keyword, skip=skip, limit=limit, fuzzy=fuzzy)
 
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, status, UploadFile, File
+from fastapi import APIRouter, Depends, Query, status, UploadFile, File
 from typing import List
+from datetime import datetime
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
-from app.schemas.book import Book, BookCreate, BookUpdate
+from app.api.deps import get_db, get_read_db
+from app.schemas.book import Book, BookCreate, BookUpdate, BookFilter
+from app.schemas.job import Job
 from app.services.book_service import book_service
 
 router = APIRouter()
@@ -14,21 +16,43 @@ def list_books(
     limit: int = 100, 
     author_id: int | None = None,
     category_id: int | None = None,
+    author_ids: List[int] | None = Query(None),
+    category_ids: List[int] | None = Query(None),
     year: int | None = None,
+    year_from: int | None = None,
+    year_to: int | None = None,
     keyword: str | None = None,
-    db: Session = Depends(get_db)
+    has_cover: bool | None = None,
+    created_since: datetime | None = None,
+    sort: str = "-created_at",
+    db: Session = Depends(get_read_db)
 ):
     """
     Get list of books with pagination
-    - author_id: Filter by author ID
-    - category_id: Filter by category ID
+    - author_id / author_ids: Filter by one or more author IDs (author_ids=1&author_ids=2)
+    - category_id / category_ids: Filter by one or more category IDs
     - year: Filter by published year
+    - year_from / year_to: Filter by published year range (inclusive)
     - keyword: Search by title keyword 
+    - has_cover: Only books with (true) or without (false) a cover image
+    - created_since: Only books created at or after this time
+    - sort: Comma-separated fields, "-" for descending (e.g. -published_year,title).
+      Allowed: id, title, published_year, created_at, updated_at
     """
-    return book_service.get_books(db, skip=skip, limit=limit, author_id=author_id, category_id=category_id, year=year, keyword=keyword)
+    book_filter = BookFilter(
+        author_ids=(author_ids or []) + ([author_id] if author_id is not None else []) or None,
+        category_ids=(category_ids or []) + ([category_id] if category_id is not None else []) or None,
+        year=year,
+        year_from=year_from,
+        year_to=year_to,
+        keyword=keyword,
+        has_cover=has_cover,
+        created_since=created_since,
+    )
+    return book_service.get_books(db, skip=skip, limit=limit, book_filter=book_filter, sort=sort)
 
 @router.get("/{book_id}", response_model=Book)
-def get_book(book_id: int, db: Session = Depends(get_db)):
+def get_book(book_id: int, db: Session = Depends(get_read_db)):
     """Get a book by its ID"""
     return book_service.get_book(db, book_id)
 
@@ -62,17 +86,44 @@ async def upload_book_cover(
     """
     return await book_service.upload_cover_image(db, book_id, file)
 
+@router.post("/{book_id}/upload-cover-async", response_model=Job, status_code=status.HTTP_202_ACCEPTED)
+def upload_book_cover_async(
+    book_id: int,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db)
+):
+    """
+    Upload cover image for a book, processed in the background
+    
+    Returns a job right away; poll `GET /api/v1/jobs/{id}` for the result.
+    - **book_id**: ID of the book
+    - **file**: Image file (jpg, jpeg, png, gif, webp)
+    - Maximum file size: 5MB
+    """
+    return book_service.enqueue_cover_upload(db, book_id, file)
+
 @router.get("/author/{author_id}", response_model=List[Book])
-def get_books_by_author(author_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def get_books_by_author(author_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db)):
     """Get all books by a specific author"""
     return book_service.get_books_by_author(db, author_id, skip=skip, limit=limit)
 
 @router.get("/category/{category_id}", response_model=List[Book])
-def get_books_by_category(category_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def get_books_by_category(category_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db)):
     """Get all books by a specific category"""
     return book_service.get_books_by_category(db, category_id, skip=skip, limit=limit)
 
+@router.get("/{book_id}/related", response_model=List[Book])
+def get_related_books(book_id: int, limit: int = Query(10, ge=1, le=50), db: Session = Depends(get_read_db)):
+    """
+    Get the books most related to a book (similar title/description, same
+    author or category, close publication year), best first
+    """
+    return book_service.get_related_books(db, book_id, limit=limit)
+
 @router.get("/search/", response_model=List[Book])
-def search_books(keyword: str, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Search books by title keyword"""
-    return book_service.search_books(db, keyword, skip=skip, limit=limit)
+def search_books(keyword: str, skip: int = 0, limit: int = 100, fuzzy: bool = False, db: Session = Depends(get_read_db)):
+    """
+    Search books by title keyword
+    - fuzzy: Typo-tolerant search ranked by trigram similarity
+    """
+    return book_service.search_books(db, keyword, skip=skip, limit=limit, fuzzy=fuzzy)
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, status
 from typing import List
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
+from app.api.deps import get_db, get_read_db
 from app.schemas.category import Category, CategoryCreate, CategoryUpdate
 from app.services.category_service import category_service
 
@@ -11,13 +11,13 @@ router = APIRouter()
 
 
 @router.get("/", response_model=List[Category])
-def list_categories(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def list_categories(skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db)):
     """Get list of categories with pagination"""
     return category_service.get_categories(db, skip=skip, limit=limit)
 
 
 @router.get("/{category_id}", response_model=Category)
-def get_category(category_id: int, db: Session = Depends(get_db)):
+def get_category(category_id: int, db: Session = Depends(get_read_db)):
     """Get a category by its ID"""
     return category_service.get_category(db, category_id)
 
@@ -40,7 +40,13 @@ def delete_category(category_id: int, db: Session = Depends(get_db)):
     return category_service.delete_category(db, category_id)
 
 
+@router.post("/{category_id}/merge-into/{target_id}")
+def merge_category(category_id: int, target_id: int, db: Session = Depends(get_db)):
+    """Move every book of a category to the target category, then delete it"""
+    return category_service.merge_category(db, category_id, target_id)
+
+
 @router.get("/search/", response_model=List[Category])
-def search_categories(keyword: str, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def search_categories(keyword: str, skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db)):
     """Search categories by name keyword"""
     return category_service.search_categories(db, keyword, skip=skip, limit=limit)
@@ -0,0 +1,26 @@
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_read_db
+from app.schemas.change import ChangePage
+from app.services.change_service import change_service
+
+
+router = APIRouter()
+
+
+@router.get("", response_model=ChangePage)
+def list_changes(
+    since: int = Query(0, ge=0, description="Last sequence number already seen"),
+    limit: int = Query(100, ge=1, le=1000),
+    entity: Optional[Literal["books", "authors", "categories"]] = Query(None),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get created, updated and deleted records after a sequence number
+    - since: `next_since` of the previous page (0 for a full sync)
+    - limit: Maximum number of changes per page
+    - entity: Only changes of one table (books, authors, categories)
+    """
+    return change_service.get_changes(db, since=since, limit=limit, entity=entity)
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db
+from app.schemas.job import Job
+from app.services.job_service import job_service
+
+
+router = APIRouter()
+
+
+@router.get("/{job_id}", response_model=Job)
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    """
+    Get the status of a background job
+    - status: queued, running, succeeded or failed
+    - result: Output of the job once it succeeded
+    - error: Last error (kept while the job is retried)
+    """
+    # Primary session: a replica may not have seen the job progress yet
+    return job_service.get_job(db, job_id)
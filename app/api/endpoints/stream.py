@@ -0,0 +1,88 @@
+import asyncio
+import json
+from typing import Literal, Optional
+from fastapi import APIRouter, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.pubsub import event_hub
+
+
+router = APIRouter()
+
+Entity = Optional[Literal["books", "authors", "categories"]]
+
+# Sent when a subscriber was dropped: resync through /api/v1/changes
+OVERFLOW_EVENT = {"type": "overflow"}
+
+
+@router.get("")
+async def stream_events(
+    request: Request,
+    entity: Entity = Query(None)
+):
+    """
+    Server-Sent Events stream of catalogue changes
+    - entity: Only events of one table (books, authors, categories)
+
+    Event types: created, updated, deleted, cover. Slow clients get an
+    `overflow` event and are disconnected; they should resync with
+    `GET /api/v1/changes` and reconnect.
+    """
+    subscription = event_hub.subscribe(entity)
+
+    async def events():
+        try:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    event = await subscription.get(timeout=settings.STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    yield f"event: overflow\ndata: {json.dumps(OVERFLOW_EVENT)}\n\n"
+                    break
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            event_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def stream_events_ws(websocket: WebSocket, entity: Entity = None):
+    """WebSocket variant of the event stream (one JSON message per event)"""
+    await websocket.accept()
+    subscription = event_hub.subscribe(entity)
+    # Detect client disconnects while waiting for events
+    receiver = asyncio.create_task(websocket.receive())
+    try:
+        while True:
+            getter = asyncio.create_task(subscription.get())
+            done, _ = await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                event = getter.result()
+                if event is None:
+                    await websocket.send_json(OVERFLOW_EVENT)
+                    await websocket.close(code=1013)
+                    break
+                await websocket.send_json(event)
+            else:
+                getter.cancel()
+            if receiver in done:
+                # Client messages are ignored; only a disconnect matters
+                if receiver.result()["type"] == "websocket.disconnect":
+                    break
+                receiver = asyncio.create_task(websocket.receive())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        event_hub.unsubscribe(subscription)
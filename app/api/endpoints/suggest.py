@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_read_db
+from app.schemas.suggest import Suggestions
+from app.services.suggest_service import suggest_service
+
+
+router = APIRouter()
+
+
+@router.get("", response_model=Suggestions)
+def suggest(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(5, ge=1, le=20),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Autocomplete book titles, author names and category names by prefix
+    - q: Prefix typed by the user (case and accent insensitive)
+    - limit: Maximum number of suggestions per group
+    """
+    return suggest_service.suggest(db, q, limit=limit)
@@ -0,0 +1,76 @@
+import time
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.admission import AdmissionLimits
+from app.core.config import Settings, settings
+
+
+READ_METHODS = {"GET", "HEAD"}
+
+# Operational endpoints stay reachable during overload; long-lived streams
+# hold no database connection and would pin a slot for their lifetime
+EXEMPT_PREFIXES = ("/api/v1/admin", "/api/v1/stream")
+
+
+def classify(scope: Scope) -> str | None:
+    """Traffic class of a request, or None if it is not admission-controlled"""
+    path = scope["path"]
+    if not path.startswith("/api/") or path.startswith(EXEMPT_PREFIXES):
+        return None
+    if "/upload-cover" in path:
+        return "upload"
+    if scope["method"] in READ_METHODS:
+        return "read"
+    return "write"
+
+
+class AdmissionControlMiddleware:
+    """
+    Shed load in front of the DB-bound routes
+
+    Requests over their class's current limit get an immediate 503 with
+    Retry-After instead of queueing in the threadpool, so latency stays
+    bounded and the connection pool is never oversubscribed. The limits
+    are sized from the app's settings and exposed to the endpoints as
+    `scope["admission_limits"]`.
+    """
+
+    def __init__(self, app: ASGIApp, app_settings: Settings = settings):
+        self.app = app
+        self.limits = AdmissionLimits(app_settings)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        scope["admission_limits"] = self.limits
+        traffic_class = classify(scope) if scope["type"] == "http" else None
+        limit = self.limits.limits.get(traffic_class)
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not limit.try_acquire():
+            response = JSONResponse(
+                {"detail": "Server is overloaded, please retry later"},
+                status_code=503,
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+
+        started = time.monotonic()
+        latency = None
+        failed = True
+
+        async def send_timed(message: Message) -> None:
+            nonlocal latency, failed
+            if message["type"] == "http.response.start":
+                latency = time.monotonic() - started
+                failed = message["status"] >= 500
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            if latency is None:
+                latency = time.monotonic() - started
+            limit.release(latency, failed)
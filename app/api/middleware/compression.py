@@ -0,0 +1,163 @@
+import asyncio
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.deps import PRIMARY_UNTIL_COOKIE
+from app.core.compression import COMPRESSORS, compress, negotiate
+from app.core.config import Settings, settings
+from app.core.response_cache import CachedResponse, Versions, response_cache
+from app.db.session import SessionLocal
+
+
+# GET responses under these prefixes only depend on the catalogue tables
+CACHEABLE_PREFIXES = ("/api/v1/books", "/api/v1/authors", "/api/v1/categories")
+
+# Never buffered or compressed (long-lived streams)
+STREAMING_CONTENT_TYPES = ("text/event-stream",)
+
+
+def _refresh_versions() -> Versions:
+    # Read from the primary: a lagging replica would hide a fresh write
+    db = SessionLocal()
+    try:
+        return response_cache.refresh_versions(db)
+    finally:
+        db.close()
+
+
+def _with_encoding(raw_headers, encoding: str | None, length: int, cache_status: str | None = None):
+    """Copy response headers with the body's encoding and length"""
+    headers = MutableHeaders(raw=list(raw_headers))
+    if "content-length" in headers:
+        del headers["content-length"]
+    if "content-encoding" in headers:
+        del headers["content-encoding"]
+    headers["content-length"] = str(length)
+    if encoding is not None:
+        headers["content-encoding"] = encoding
+    headers.add_vary_header("Accept-Encoding")
+    if cache_status is not None:
+        headers["x-cache"] = cache_status
+    return headers.raw
+
+
+class CompressionMiddleware:
+    """
+    Negotiated response compression with a precompressed response cache
+
+    Cacheable GET responses are served from `response_cache`; each entry
+    keeps its compressed variants next to the plain body, so a hot page is
+    compressed once per encoding instead of once per request. Other
+    responses are compressed on the fly, chunk by chunk. Bodies smaller
+    than COMPRESSION_MIN_SIZE are sent as is.
+    """
+
+    def __init__(self, app: ASGIApp, app_settings: Settings = settings):
+        self.app = app
+        self.settings = app_settings
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        encoding = negotiate(headers.get("accept-encoding", ""))
+        if self._is_cacheable(scope, headers):
+            await self._send_cached(scope, receive, send, encoding)
+        elif encoding is not None:
+            await self._send_compressed(scope, receive, send, encoding)
+        else:
+            await self.app(scope, receive, send)
+
+    def _is_cacheable(self, scope: Scope, headers: Headers) -> bool:
+        # Clients pinned to the primary after a write bypass the cache
+        return (
+            self.settings.RESPONSE_CACHE_ENABLED
+            and scope["method"] == "GET"
+            and scope["path"].startswith(CACHEABLE_PREFIXES)
+            and PRIMARY_UNTIL_COOKIE not in headers.get("cookie", "")
+        )
+
+    async def _send_cached(self, scope: Scope, receive: Receive, send: Send, encoding: str | None) -> None:
+        key = scope["path"] + "?" + scope["query_string"].decode("latin-1")
+        versions = response_cache.versions()
+        if versions is None:
+            versions = await asyncio.to_thread(_refresh_versions)
+        entry = response_cache.get(key, versions)
+        cache_status = "HIT"
+
+        if entry is None:
+            cache_status = "MISS"
+            start: Message = {}
+            chunks = []
+
+            async def capture(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    start.update(message)
+                elif message["type"] == "http.response.body":
+                    chunks.append(message.get("body", b""))
+
+            await self.app(scope, receive, capture)
+            entry = CachedResponse(versions, start["status"], start.get("headers", []), b"".join(chunks))
+            if entry.status == 200:
+                response_cache.put(key, entry)
+
+        body = entry.bodies["identity"]
+        if encoding is None or len(body) < self.settings.COMPRESSION_MIN_SIZE:
+            encoding = None
+        else:
+            if encoding not in entry.bodies:
+                response_cache.add_variant(key, entry, encoding, compress(encoding, body))
+            body = entry.bodies[encoding]
+
+        await send({
+            "type": "http.response.start",
+            "status": entry.status,
+            "headers": _with_encoding(entry.headers, encoding, len(body), cache_status),
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _send_compressed(self, scope: Scope, receive: Receive, send: Send, encoding: str) -> None:
+        start: Message | None = None
+        stream = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, stream, passthrough
+            if message["type"] == "http.response.start":
+                # Hold back until the first chunk shows how big the body is
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                headers = MutableHeaders(scope=start)
+                passthrough = (
+                    "content-encoding" in headers
+                    or headers.get("content-type", "").startswith(STREAMING_CONTENT_TYPES)
+                    or (not more_body and len(body) < self.settings.COMPRESSION_MIN_SIZE)
+                    or int(headers.get("content-length", self.settings.COMPRESSION_MIN_SIZE)) < self.settings.COMPRESSION_MIN_SIZE
+                )
+                if not passthrough:
+                    stream = COMPRESSORS[encoding]()
+                    del headers["content-length"]
+                    headers["content-encoding"] = encoding
+                    headers.add_vary_header("Accept-Encoding")
+                await send(start)
+                start = None
+
+            if passthrough:
+                await send(message)
+                return
+            data = stream.compress(body)
+            if not more_body:
+                data += stream.finish()
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,177 @@
+import asyncio
+import time
+from typing import Dict, List
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.middleware.read_your_writes import primary_until_cookie
+from app.core.config import Settings, settings
+from app.services.idempotency_service import idempotency_service
+
+
+IDEMPOTENT_METHODS = {"POST", "PUT", "PATCH"}
+
+MAX_KEY_LENGTH = 255
+
+# Polling interval of a duplicate waiting for a request in another worker
+MAX_POLL_SECONDS = 0.5
+
+
+class IdempotencyMiddleware:
+    """
+    Idempotency-Key support for POST/PUT/PATCH requests
+
+    The first request with a key runs and its response is stored; a retry
+    gets the stored response back (with `Idempotent-Replayed: true`)
+    without running the endpoint again. A duplicate that arrives while the
+    first one is still running waits for its response instead of running
+    it a second time, and gets 409 if that takes longer than
+    IDEMPOTENCY_WAIT_SECONDS. Reusing a key for a different request is a
+    422. Failed requests (5xx, exceptions) and oversized responses are not
+    stored: their key is released and a retry runs again.
+    """
+
+    def __init__(self, app: ASGIApp, app_settings: Settings = settings):
+        self.app = app
+        self.settings = app_settings
+        # Requests of this worker currently holding a key, so local
+        # duplicates wake up as soon as they finish
+        self._running: Dict[str, asyncio.Event] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in IDEMPOTENT_METHODS
+            or not scope["path"].startswith("/api/")
+        ):
+            await self.app(scope, receive, send)
+            return
+        key = Headers(scope=scope).get("idempotency-key")
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            response = JSONResponse(
+                {"detail": f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters"}, status_code=400
+            )
+            await response(scope, receive, send)
+            return
+
+        body = await self._read_body(receive)
+        fingerprint = idempotency_service.fingerprint(scope["method"], scope["path"], scope["query_string"], body)
+
+        deadline = time.monotonic() + self.settings.IDEMPOTENCY_WAIT_SECONDS
+        delay = 0.02
+        waited = False
+        while True:
+            acquired, entry = await asyncio.to_thread(idempotency_service.acquire, key, fingerprint)
+            if acquired:
+                break
+            # entry is None when the key went away meanwhile: back off and
+            # try to take it again, within the same deadline
+            if entry is not None and entry.fingerprint != fingerprint:
+                idempotency_service.record("mismatched")
+                response = JSONResponse(
+                    {"detail": "Idempotency-Key was already used for a different request"}, status_code=422
+                )
+                await response(scope, receive, send)
+                return
+            if entry is not None and entry.status == "completed":
+                idempotency_service.record("replayed_after_wait" if waited else "replayed")
+                await self._replay(entry, send)
+                return
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                idempotency_service.record("conflicts")
+                response = JSONResponse(
+                    {"detail": "A request with this Idempotency-Key is still being processed"},
+                    status_code=409,
+                    headers={"Retry-After": "1"},
+                )
+                await response(scope, receive, send)
+                return
+            waited = True
+            running = self._running.get(key)
+            try:
+                if running is not None:
+                    await asyncio.wait_for(running.wait(), min(delay, remaining))
+                else:
+                    await asyncio.sleep(min(delay, remaining))
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, MAX_POLL_SECONDS)
+
+        done = self._running[key] = asyncio.Event()
+        try:
+            await self._run(scope, receive, send, key, body)
+        finally:
+            done.set()
+            self._running.pop(key, None)
+
+    async def _read_body(self, receive: Receive) -> bytes:
+        chunks: List[bytes] = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    async def _run(self, scope: Scope, receive: Receive, send: Send, key: str, body: bytes) -> None:
+        """Run the request, passing its response through and keeping a copy"""
+        body_sent = False
+        start: Message = {}
+        chunks: List[bytes] = []
+        size = 0
+        storable = True
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        async def capture(message: Message) -> None:
+            nonlocal size, storable
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body" and storable:
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                if size > self.settings.IDEMPOTENCY_MAX_RESPONSE_BYTES:
+                    storable = False
+                    chunks.clear()
+                else:
+                    chunks.append(chunk)
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, capture)
+        except BaseException:
+            await asyncio.to_thread(idempotency_service.release, key)
+            raise
+
+        if not start or start["status"] >= 500 or not storable:
+            if start and not storable:
+                idempotency_service.record("too_large")
+            await asyncio.to_thread(idempotency_service.release, key)
+            return
+        await asyncio.to_thread(
+            idempotency_service.complete, key, start["status"], start.get("headers", []), b"".join(chunks)
+        )
+
+    async def _replay(self, entry, send: Send) -> None:
+        headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in entry.response_headers or []]
+        headers.append((b"idempotent-replayed", b"true"))
+        # Cookies are not stored; re-issue the read-your-writes one, which
+        # ReadYourWritesMiddleware (inside this one) never sees for a replay
+        if self.settings.SQLALCHEMY_REPLICA_URLS and entry.response_status < 400:
+            cookie = primary_until_cookie(self.settings.READ_YOUR_WRITES_SECONDS)
+            headers.append((b"set-cookie", cookie.encode("latin-1")))
+        await send({"type": "http.response.start", "status": entry.response_status, "headers": headers})
+        await send({"type": "http.response.body", "body": entry.response_body or b""})
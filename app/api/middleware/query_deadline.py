@@ -0,0 +1,50 @@
+import asyncio
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.middleware.admission import EXEMPT_PREFIXES, READ_METHODS
+from app.core.config import Settings, settings
+from app.db.deadline import QueryDeadline
+
+
+class QueryDeadlineMiddleware:
+    """
+    Give each API request a QueryDeadline and cancel it when the client leaves
+
+    The deadline's budget is started by the session dependencies once the
+    route is known. For reads, the ASGI receive channel is watched while
+    the handler runs: an `http.disconnect` cancels the request's running
+    statements, so an abandoned search or deep-offset list stops and its
+    pooled connection is returned instead of finishing for nobody. Writes
+    are left to complete (or hit their deadline) so a dropped client never
+    cuts one short halfway through a request.
+    """
+
+    def __init__(self, app: ASGIApp, app_settings: Settings = settings):
+        self.app = app
+        self.settings = app_settings
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith("/api/") or scope["path"].startswith(EXEMPT_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        deadline = scope["query_deadline"] = QueryDeadline()
+        if not self.settings.QUERY_CANCEL_ON_DISCONNECT or scope["method"] not in READ_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        messages: "asyncio.Queue[Message]" = asyncio.Queue()
+
+        async def watch() -> None:
+            while True:
+                message = await receive()
+                await messages.put(message)
+                if message["type"] == "http.disconnect":
+                    deadline.cancel()
+                    return
+
+        watcher = asyncio.create_task(watch())
+        try:
+            await self.app(scope, messages.get, send)
+        finally:
+            watcher.cancel()
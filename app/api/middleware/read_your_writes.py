@@ -0,0 +1,45 @@
+import math
+import time
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.deps import PRIMARY_UNTIL_COOKIE
+from app.core.config import Settings, settings
+
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+def primary_until_cookie(seconds: float) -> str:
+    """Set-Cookie value keeping the client's reads on the primary for `seconds`"""
+    return (
+        f"{PRIMARY_UNTIL_COOKIE}={time.time() + seconds:.3f}; "
+        f"Max-Age={math.ceil(seconds)}; Path=/; HttpOnly; SameSite=Lax"
+    )
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pin a client's reads to the primary for a while after it writes
+
+    Successful write responses get a cookie holding the time until which
+    `get_read_db` must use the primary instead of a possibly lagging
+    replica. The cookie carries server time, so it works across workers.
+    """
+
+    def __init__(self, app: ASGIApp, app_settings: Settings = settings):
+        self.app = app
+        self.settings = app_settings
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                headers = MutableHeaders(scope=message)
+                headers.append("set-cookie", primary_until_cookie(self.settings.READ_YOUR_WRITES_SECONDS))
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
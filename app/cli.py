@@ -0,0 +1,134 @@
+"""
+Maintenance commands
+
+Usage:
+    python -m app.cli rebuild-book-view
+    python -m app.cli rebuild-related-index
+    python -m app.cli memory-profile --path "/api/v1/books/?limit=100" --requests 2000
+    python -m app.cli backup
+    python -m app.cli list-backups
+    python -m app.cli restore-backup backups/backup-20261019-120000123 --yes
+"""
+import argparse
+import json
+import time
+
+from app.db.session import SessionLocal
+from app.repositories.book_view_repository import book_view_repository
+from app.services.related_service import related_books_service
+
+
+def rebuild_book_view(args: argparse.Namespace) -> None:
+    """Re-render the book_view read model from books, authors and categories"""
+    started = time.monotonic()
+    db = SessionLocal()
+    try:
+        count = book_view_repository.rebuild(db)
+    finally:
+        db.close()
+    print(f"Rebuilt book_view: {count} books in {time.monotonic() - started:.1f}s")
+
+
+def rebuild_related_index(args: argparse.Namespace) -> None:
+    """Rebuild the related books index (running workers switch to it on their own)"""
+    started = time.monotonic()
+    db = SessionLocal()
+    try:
+        count = related_books_service.rebuild(db)
+    finally:
+        db.close()
+    print(f"Rebuilt related books index: {count} books in {time.monotonic() - started:.1f}s")
+
+
+def memory_profile(args: argparse.Namespace) -> None:
+    """Run requests against the app in-process and report the memory they leave behind"""
+    from fastapi.testclient import TestClient
+    from app.core.memory_profiler import memory_profiler
+    from app.main import create_app
+
+    client = TestClient(create_app())
+    paths = args.path or ["/api/v1/books/?limit=100"]
+
+    def run(count: int) -> None:
+        for i in range(count):
+            response = client.get(paths[i % len(paths)])
+            if response.status_code >= 500:
+                raise SystemExit(f"{paths[i % len(paths)]} failed with {response.status_code}")
+
+    # Caches, compiled statements and lazy imports are filled before the baseline
+    run(args.warmup)
+    memory_profiler.start(args.frames)
+    memory_profiler.take_snapshot("baseline")
+    started = time.monotonic()
+    run(args.requests)
+    elapsed = time.monotonic() - started
+    memory_profiler.take_snapshot(f"after {args.requests} requests")
+    report = memory_profiler.diff(group_by=args.group_by, limit=args.limit)
+    report["requests"] = args.requests
+    report["seconds"] = round(elapsed, 2)
+    print(json.dumps(report, indent=2))
+
+
+def backup(args: argparse.Namespace) -> None:
+    """Take an online backup of the SQLite database and its covers (the app can keep running)"""
+    from app.services.backup_service import backup_service
+    manifest = backup_service.backup(args.dir)
+    print(json.dumps(manifest, indent=2))
+
+
+def list_backups(args: argparse.Namespace) -> None:
+    """List the complete backups, newest first"""
+    from app.services.backup_service import backup_service
+    for manifest in backup_service.list_backups(args.dir):
+        print(f"{manifest['path']}  {manifest['created_at']}  {manifest['database_bytes']} bytes  {manifest['covers']} covers")
+
+
+def restore_backup(args: argparse.Namespace) -> None:
+    """Restore a backup over the database and covers (stop the app first)"""
+    from app.services.backup_service import backup_service
+    if not args.yes:
+        answer = input(f"Overwrite {backup_service.database_path()} with {args.path}? The app must be stopped. [y/N] ")
+        if answer.strip().lower() != "y":
+            raise SystemExit("Aborted")
+    manifest = backup_service.restore(args.path)
+    print(f"Restored {manifest['name']} (taken {manifest['created_at']}, {manifest['covers']} covers)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Book Management API maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("rebuild-book-view", help=rebuild_book_view.__doc__)
+    command.set_defaults(handler=rebuild_book_view)
+
+    command = commands.add_parser("rebuild-related-index", help=rebuild_related_index.__doc__)
+    command.set_defaults(handler=rebuild_related_index)
+
+    command = commands.add_parser("memory-profile", help=memory_profile.__doc__)
+    command.add_argument("--path", action="append", help="GET path to request (repeatable; default: book list)")
+    command.add_argument("--requests", type=int, default=1000)
+    command.add_argument("--warmup", type=int, default=100, help="Requests run before the baseline snapshot")
+    command.add_argument("--frames", type=int, default=8, help="Traceback depth kept per allocation")
+    command.add_argument("--group-by", choices=["module", "caller", "lineno"], default="caller")
+    command.add_argument("--limit", type=int, default=15)
+    command.set_defaults(handler=memory_profile)
+
+    command = commands.add_parser("backup", help=backup.__doc__)
+    command.add_argument("--dir", help="Directory of the backups (default: BACKUP_DIR)")
+    command.set_defaults(handler=backup)
+
+    command = commands.add_parser("list-backups", help=list_backups.__doc__)
+    command.add_argument("--dir", help="Directory of the backups (default: BACKUP_DIR)")
+    command.set_defaults(handler=list_backups)
+
+    command = commands.add_parser("restore-backup", help=restore_backup.__doc__)
+    command.add_argument("path", help="Backup directory, e.g. backups/backup-20261019-120000123")
+    command.add_argument("--yes", action="store_true", help="Do not ask for confirmation")
+    command.set_defaults(handler=restore_backup)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import time
+from typing import Dict
+
+from app.core.config import Settings, settings
+
+
+class AIMDLimit:
+    """
+    Additive-increase / multiplicative-decrease concurrency limit
+
+    Every request finishing under the latency target raises the limit by
+    1/limit (about +1 per full window); a slow or failed request cuts it by
+    `backoff`, at most once per target period so one burst of slow
+    responses counts as a single congestion signal.
+    """
+
+    def __init__(self, max_limit: int, latency_target: float, backoff: float = 0.9):
+        self.max_limit = max_limit
+        self.min_limit = 1
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.rejected = 0
+        self._decreased_at = 0.0
+
+    def try_acquire(self) -> bool:
+        """Take a slot if the current limit allows it"""
+        if self.in_flight >= int(self.limit):
+            self.rejected += 1
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, latency: float, failed: bool = False) -> None:
+        """Return a slot and adapt the limit to the observed latency"""
+        self.in_flight -= 1
+        now = time.monotonic()
+        if failed or latency > self.latency_target:
+            if now - self._decreased_at >= self.latency_target:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._decreased_at = now
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "limit": round(self.limit, 2),
+            "max_limit": self.max_limit,
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+        }
+
+
+def _scaled_budgets(budgets: Dict[str, int], capacity: int) -> Dict[str, int]:
+    """Scale the budgets down so that together they fit the pool capacity"""
+    total = sum(budgets.values())
+    if total <= capacity:
+        return dict(budgets)
+    return {name: max(1, budget * capacity // total) for name, budget in budgets.items()}
+
+
+class AdmissionLimits:
+    """One adaptive limit per traffic class (read, write, upload)"""
+
+    def __init__(self, limits_settings: Settings = settings):
+        capacity = limits_settings.DB_POOL_SIZE + limits_settings.DB_MAX_OVERFLOW
+        latency_target = limits_settings.ADMISSION_LATENCY_TARGET_MS / 1000
+        self.limits = {
+            name: AIMDLimit(budget, latency_target)
+            for name, budget in _scaled_budgets(limits_settings.ADMISSION_MAX_CONCURRENCY, capacity).items()
+        }
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {name: limit.stats() for name, limit in self.limits.items()}
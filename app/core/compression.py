@@ -0,0 +1,88 @@
+import zlib
+from typing import Callable, Dict, List
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional: pip install zstandard
+    zstandard = None
+
+
+class _GzipStream:
+    def __init__(self):
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=5)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdStream:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=3).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+# Streaming compressors by Content-Encoding, in server preference order
+COMPRESSORS: Dict[str, Callable] = {}
+if zstandard is not None:
+    COMPRESSORS["zstd"] = _ZstdStream
+if brotli is not None:
+    COMPRESSORS["br"] = _BrotliStream
+COMPRESSORS["gzip"] = _GzipStream
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """
+    Pick the best supported encoding from an Accept-Encoding header
+
+    Returns:
+        The encoding name, or None to send the body as is
+    """
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    candidates: List[str] = [
+        name for name in COMPRESSORS
+        if accepted.get(name, accepted.get("*", 0.0)) > 0
+    ]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda name: accepted.get(name, accepted.get("*", 0.0)))
+
+
+def compress(encoding: str, data: bytes) -> bytes:
+    """Compress a whole body in one go"""
+    stream = COMPRESSORS[encoding]()
+    return stream.compress(data) + stream.finish()
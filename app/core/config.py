@@ -1,8 +1,180 @@
-from pydantic import BaseModel
+import os
+from typing import Dict, List
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from app.core.utils import APP_DIR
+
+class Settings(BaseSettings):
+    """Application settings, overridable from environment variables or .env"""
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
-class Settings(BaseModel):
     PROJECT_NAME: str = "Book Management API"
 
+    # Primary database, receives all writes
     SQLALCHEMY_DATABASE_URL: str = "sqlite:///./app.db"
 
-settings = Settings()
\ No newline at end of file
+    # Read replicas for GET traffic (JSON list in env), empty = primary only
+    SQLALCHEMY_REPLICA_URLS: List[str] = []
+    # "round_robin" or "least_connections"
+    REPLICA_SELECTION: str = "round_robin"
+    # After a write, the same client reads from the primary for this long
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+
+    # Connection pool of each engine
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+
+    # SQLite journal mode set on every connection ("wal" lets readers,
+    # including online backups, run alongside the writer), empty = unchanged
+    SQLITE_JOURNAL_MODE: str = ""
+
+    # Startup warm-up (before the worker accepts traffic): open this many
+    # pool connections per engine, run the hot queries once and, with
+    # WARMUP_CACHES, load the in-memory caches and indexes
+    WARMUP_ENABLED: bool = True
+    WARMUP_CONNECTIONS: int = 2
+    WARMUP_CACHES: bool = True
+
+    # Share one in-flight query among concurrent identical book reads
+    SINGLE_FLIGHT_ENABLED: bool = True
+
+    # Adaptive (AIMD) concurrency limits in front of the /api routes.
+    # Each budget adapts between 1 and its maximum; the maximums are scaled
+    # down if together they exceed the primary's pool capacity.
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_MAX_CONCURRENCY: Dict[str, int] = {"read": 8, "write": 4, "upload": 2}
+    ADMISSION_LATENCY_TARGET_MS: float = 250.0
+
+    # Response compression (gzip, plus br/zstd when brotli/zstandard are
+    # installed) for bodies of at least this many bytes
+    COMPRESSION_MIN_SIZE: int = 1024
+
+    # In-process cache of GET book/author/category responses, holding the
+    # compressed variants next to the plain body. Entries are checked
+    # against this worker's snapshot of the cache_versions stamps, re-read
+    # at most every RESPONSE_CACHE_CHECK_INTERVAL seconds (and after each
+    # local write), so writes in other workers invalidate them within that
+    # interval; the TTL bounds their life otherwise.
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_CHECK_INTERVAL: float = 0.5
+    RESPONSE_CACHE_TTL: float = 5.0
+    RESPONSE_CACHE_MAX_MB: float = 64.0
+
+    # Live update stream (/api/v1/stream). "local" only reaches subscribers
+    # of the same worker; slow subscribers are dropped once their queue of
+    # EVENT_QUEUE_SIZE events is full.
+    EVENT_BROKER: str = "local"
+    EVENT_QUEUE_SIZE: int = 100
+    STREAM_HEARTBEAT_SECONDS: float = 15.0
+
+    # Background jobs. JOB_WORKERS threads per web process (0 to run them
+    # only in a separate `python -m app.worker` process); JOB_CONCURRENCY
+    # caps how many jobs of each type run at once per process. A running
+    # job's lease is renewed every JOB_LEASE_SECONDS / 3 while its handler
+    # runs; jobs whose lease expires (the worker died) are requeued.
+    JOB_WORKERS: int = 2
+    JOB_POLL_INTERVAL: float = 1.0
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BASE_SECONDS: float = 2.0
+    JOB_RETRY_MAX_SECONDS: float = 300.0
+    JOB_LEASE_SECONDS: float = 600.0
+    JOB_CONCURRENCY: Dict[str, int] = {"cover": 2, "reindex": 1, "related-index": 1, "backup": 1}
+
+    # Statement deadlines per request, in ms (0 = none): the default, and
+    # overrides by endpoint function name. Enforced with statement_timeout
+    # on Postgres and a progress handler on SQLite (504 when exceeded).
+    # Reads whose client disconnects have their running queries cancelled.
+    STATEMENT_TIMEOUT_MS: float = 30000.0
+    STATEMENT_TIMEOUTS: Dict[str, float] = {"list_books": 5000.0, "search_books": 5000.0}
+    QUERY_CANCEL_ON_DISCONNECT: bool = True
+
+    # Single-writer mode: catalogue writes are queued to one writer thread
+    # that commits up to WRITE_GROUP_MAX of them per transaction (group
+    # commit), optionally waiting WRITE_GROUP_WAIT_MS for more to arrive.
+    # Mainly useful with SQLite, where concurrent writers fight for the lock.
+    # Opt-in: it helps many concurrent book writes (32 threads: 133 -> 172
+    # writes/s) but barely moves 8 threads (150 -> 155) and slows author and
+    # category writes (32 threads: 159 -> 119), since each one reloads the
+    # name cache on the single writer thread.
+    WRITE_COORDINATOR_ENABLED: bool = False
+    WRITE_GROUP_MAX: int = 64
+    WRITE_GROUP_WAIT_MS: float = 0.0
+
+    # Idempotency-Key support for POST/PUT/PATCH: the first response to a key
+    # is stored for IDEMPOTENCY_TTL_SECONDS and replayed to retries. A
+    # duplicate arriving while the first request still runs waits up to
+    # IDEMPOTENCY_WAIT_SECONDS for its response (409 after that); a key held
+    # longer than IDEMPOTENCY_LOCK_SECONDS is taken over (its worker died).
+    # Responses over IDEMPOTENCY_MAX_RESPONSE_BYTES are not stored, and the
+    # store is trimmed to IDEMPOTENCY_MAX_KEYS every IDEMPOTENCY_PURGE_INTERVAL.
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_TTL_SECONDS: float = 86400.0
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0
+    IDEMPOTENCY_LOCK_SECONDS: float = 60.0
+    IDEMPOTENCY_MAX_RESPONSE_BYTES: int = 256 * 1024
+    IDEMPOTENCY_MAX_KEYS: int = 100000
+    IDEMPOTENCY_PURGE_INTERVAL: float = 300.0
+
+    # Slow-query log: statements over the threshold plus a random sample of
+    # the others, aggregated per fingerprint (GET /api/v1/admin/slow-queries)
+    SLOW_QUERY_LOG_ENABLED: bool = True
+    SLOW_QUERY_THRESHOLD_MS: float = 100.0
+    SLOW_QUERY_SAMPLE_RATE: float = 0.01
+    SLOW_QUERY_MAX_FINGERPRINTS: int = 500
+
+    # Memory profiling with tracemalloc (admin /memory endpoints and
+    # `python -m app.cli memory-profile`). Nothing is traced until profiling
+    # is started, so it costs nothing until then. MEMORY_PROFILE_FRAMES is
+    # the traceback depth kept per allocation (> 1 to attribute library
+    # allocations to our modules). With MEMORY_PROFILE_RSS_TRIGGER_MB > 0,
+    # tracing starts by itself once RSS exceeds it (checked every
+    # MEMORY_PROFILE_CHECK_SECONDS), with another snapshot every
+    # MEMORY_PROFILE_RSS_STEP_MB of growth.
+    MEMORY_PROFILING_ENABLED: bool = False
+    MEMORY_PROFILE_FRAMES: int = 8
+    MEMORY_PROFILE_MAX_SNAPSHOTS: int = 10
+    MEMORY_PROFILE_GROUPS: List[str] = [
+        "app.repositories", "app.services", "app.core.utils", "app.core", "app.api", "app.db", "app.schemas",
+    ]
+    MEMORY_PROFILE_RSS_TRIGGER_MB: float = 0.0
+    MEMORY_PROFILE_RSS_STEP_MB: float = 100.0
+    MEMORY_PROFILE_CHECK_SECONDS: float = 30.0
+
+    # "Related books" index: neighbours kept per book, weights of the
+    # similarity blocks, and where the memory-mapped builds are stored
+    RELATED_BOOKS_K: int = 20
+    RELATED_BOOKS_WEIGHTS: Dict[str, float] = {"text": 0.55, "author": 0.2, "category": 0.15, "year": 0.1}
+    RELATED_INDEX_DIR: str = os.path.join(APP_DIR, "data", "related")
+
+    # Online backups of the SQLite database and its covers into BACKUP_DIR
+    # (`python -m app.cli backup`, or the "backup" job). The database is
+    # copied BACKUP_PAGES_PER_STEP pages at a time with BACKUP_STEP_SLEEP_MS
+    # between steps so requests keep their access to it; a copy restarted
+    # more than BACKUP_MAX_RESTARTS times by concurrent writes finishes in
+    # one step. The newest BACKUP_KEEP backups are kept.
+    BACKUP_DIR: str = "backups"
+    BACKUP_PAGES_PER_STEP: int = 256
+    BACKUP_STEP_SLEEP_MS: float = 5.0
+    BACKUP_MAX_RESTARTS: int = 3
+    BACKUP_KEEP: int = 7
+
+    # Uploads waiting for a background job (not served as static files);
+    # the staged path is stored in the job, so it must not depend on the
+    # working directory of the API or of the worker
+    UPLOAD_STAGING_DIR: str = os.path.join(APP_DIR, "uploads")
+
+    # Seconds between version checks of the in-process author/category cache
+    DIMENSION_CACHE_CHECK_INTERVAL: float = 1.0
+
+    # Seconds between version checks of the in-memory search indexes
+    SEARCH_INDEX_CHECK_INTERVAL: float = 1.0
+
+    # Autocomplete (/api/v1/suggest) prefix index
+    SUGGEST_MEMORY_BUDGET_MB: float = 64.0
+
+    # Fuzzy search: minimum trigram similarity (same scale as pg_trgm) and
+    # memory budget of the in-app trigram index used on non-Postgres databases
+    FUZZY_SIMILARITY_THRESHOLD: float = 0.3
+    FUZZY_MEMORY_BUDGET_MB: float = 256.0
+
+settings = Settings()
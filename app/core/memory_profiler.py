@@ -0,0 +1,298 @@
+import gc
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+from functools import lru_cache
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Allocations of the profiler itself and of the import machinery
+IGNORED_FILES = (__file__, tracemalloc.__file__, "<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>", "<unknown>")
+
+GROUP_BY = ("module", "caller", "lineno")
+
+
+def rss_bytes() -> Optional[int]:
+    """Resident set size of this process (None where it cannot be read)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Peak, not current, RSS: kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@lru_cache(maxsize=4096)
+def module_of(filename: str) -> str:
+    """Dotted module name of a source file ("sqlalchemy.orm.session"), or the file name"""
+    path = os.path.abspath(filename)
+    for root in sorted((os.path.abspath(p) for p in sys.path if p), key=len, reverse=True):
+        if path.startswith(root + os.sep):
+            module = os.path.splitext(os.path.relpath(path, root))[0].replace(os.sep, ".")
+            return module[:-len(".__init__")] if module.endswith(".__init__") else module
+    return filename
+
+
+def group_of(module: str) -> str:
+    """Longest MEMORY_PROFILE_GROUPS prefix of a module, else its top-level package"""
+    best = ""
+    for group in settings.MEMORY_PROFILE_GROUPS:
+        if (module == group or module.startswith(group + ".")) and len(group) > len(best):
+            best = group
+    return best or module.split(".")[0]
+
+
+class MemorySnapshot:
+    """A tracemalloc snapshot plus the process RSS and live object counts per type"""
+
+    def __init__(self, id: int, label: str, snapshot: tracemalloc.Snapshot, rss: Optional[int], objects: Counter):
+        self.id = id
+        self.label = label
+        self.taken_at = time.time()
+        self.snapshot = snapshot
+        self.rss = rss
+        self.objects = objects
+        self.traced = sum(stat.size for stat in snapshot.statistics("filename"))
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "label": self.label,
+            "taken_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.taken_at)),
+            "rss_mb": _mb(self.rss),
+            "traced_mb": _mb(self.traced),
+            "objects": sum(self.objects.values()),
+        }
+
+
+def _mb(size: Optional[int]) -> Optional[float]:
+    return None if size is None else round(size / 1024 / 1024, 3)
+
+
+class MemoryProfiler:
+    """
+    On-demand tracemalloc snapshots and diffs of a long-running worker
+
+    Nothing is traced until `start` is called (from the admin endpoints,
+    the CLI or the RSS trigger), so a worker that never profiles pays
+    nothing. Snapshots are kept in memory (the last MEMORY_PROFILE_MAX_SNAPSHOTS)
+    and compared:
+
+    - by module: allocation sites grouped by MEMORY_PROFILE_GROUPS
+      (e.g. "app.repositories", "sqlalchemy");
+    - by caller: attributed to the innermost `app.*` frame of the
+      allocation's traceback, which tells which of our modules made
+      SQLAlchemy or Pydantic allocate (needs MEMORY_PROFILE_FRAMES > 1);
+    - by line: the top allocating source lines.
+
+    Each snapshot also counts live objects per type. Only objects tracked
+    by the garbage collector (containers, class instances) are counted,
+    not str/int/bytes.
+    """
+
+    def __init__(self):
+        self._snapshots: Deque[MemorySnapshot] = deque()
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self._triggered_at: Optional[int] = None
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: Optional[int] = None) -> None:
+        """Start tracing allocations (no-op if already tracing)"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames or settings.MEMORY_PROFILE_FRAMES)
+
+    def stop(self) -> None:
+        """Stop tracing; the stored snapshots are kept"""
+        tracemalloc.stop()
+
+    def take_snapshot(self, label: str = "") -> MemorySnapshot:
+        """Snapshot the traced allocations (starts tracing first if needed)"""
+        self.start()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, filename) for filename in IGNORED_FILES]
+        )
+        objects = Counter(type(obj).__qualname__ for obj in gc.get_objects())
+        with self._lock:
+            taken = MemorySnapshot(self._next_id, label, snapshot, rss_bytes(), objects)
+            self._next_id += 1
+            self._snapshots.append(taken)
+            while len(self._snapshots) > settings.MEMORY_PROFILE_MAX_SNAPSHOTS:
+                self._snapshots.popleft()
+        return taken
+
+    def snapshots(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [taken.summary() for taken in self._snapshots]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshots.clear()
+
+    def _get(self, id: Optional[int], default_index: int) -> MemorySnapshot:
+        with self._lock:
+            if id is None:
+                if len(self._snapshots) < abs(default_index):
+                    raise LookupError("Not enough snapshots to compare, take another one first")
+                return self._snapshots[default_index]
+            for taken in self._snapshots:
+                if taken.id == id:
+                    return taken
+        raise LookupError(f"Snapshot {id} not found (only the last {settings.MEMORY_PROFILE_MAX_SNAPSHOTS} are kept)")
+
+    def _by_group(self, snapshot: tracemalloc.Snapshot, group_by: str) -> Dict[str, Tuple[int, int]]:
+        """(size, count) of the traced allocations per module group or per app caller"""
+        totals: Dict[str, List[int]] = {}
+        key_type = "traceback" if group_by == "caller" else "filename"
+        for stat in snapshot.statistics(key_type):
+            if group_by == "caller":
+                # Frames are ordered oldest first: find the innermost app frame
+                modules = [module_of(frame.filename) for frame in stat.traceback]
+                app_modules = [module for module in modules if module.startswith("app.")]
+                group = app_modules[-1] if app_modules else group_of(modules[-1])
+            else:
+                group = group_of(module_of(stat.traceback[0].filename))
+            total = totals.setdefault(group, [0, 0])
+            total[0] += stat.size
+            total[1] += stat.count
+        return {group: (size, count) for group, (size, count) in totals.items()}
+
+    def diff(
+        self,
+        from_id: Optional[int] = None,
+        to_id: Optional[int] = None,
+        group_by: str = "module",
+        limit: int = 20,
+    ) -> Dict[str, Any]:
+        """
+        Compare two snapshots (the last two by default)
+
+        Returns the RSS and traced memory growth, the top growing groups
+        (or source lines, with group_by="lineno") and the object types
+        whose live count grew the most.
+        """
+        if group_by not in GROUP_BY:
+            raise ValueError(f"group_by must be one of {', '.join(GROUP_BY)}")
+        old = self._get(from_id, -2)
+        new = self._get(to_id, -1)
+
+        if group_by == "lineno":
+            top = [
+                {
+                    "location": f"{module_of(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                    "size_diff_kb": round(stat.size_diff / 1024, 1),
+                    "count_diff": stat.count_diff,
+                    "size_kb": round(stat.size / 1024, 1),
+                }
+                for stat in new.snapshot.compare_to(old.snapshot, "lineno")[:limit]
+            ]
+        else:
+            before = self._by_group(old.snapshot, group_by)
+            after = self._by_group(new.snapshot, group_by)
+            rows = []
+            for group in set(before) | set(after):
+                size, count = after.get(group, (0, 0))
+                old_size, old_count = before.get(group, (0, 0))
+                rows.append({
+                    "group": group,
+                    "size_diff_kb": round((size - old_size) / 1024, 1),
+                    "count_diff": count - old_count,
+                    "size_kb": round(size / 1024, 1),
+                })
+            top = sorted(rows, key=lambda row: abs(row["size_diff_kb"]), reverse=True)[:limit]
+
+        growth = new.objects.copy()
+        growth.subtract(old.objects)
+        return {
+            "from": old.summary(),
+            "to": new.summary(),
+            "rss_diff_mb": None if old.rss is None or new.rss is None else _mb(new.rss - old.rss),
+            "traced_diff_mb": _mb(new.traced - old.traced),
+            "group_by": group_by,
+            "top": top,
+            "object_growth": [
+                {"type": name, "count_diff": diff, "count": new.objects[name]}
+                for name, diff in growth.most_common(limit) if diff > 0
+            ],
+        }
+
+    def status(self) -> Dict[str, Any]:
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "enabled": settings.MEMORY_PROFILING_ENABLED,
+            "tracing": self.tracing,
+            "frames": tracemalloc.get_traceback_limit() if self.tracing else None,
+            "rss_mb": _mb(rss_bytes()),
+            "traced_mb": _mb(current),
+            "traced_peak_mb": _mb(peak),
+            "tracemalloc_overhead_mb": _mb(tracemalloc.get_tracemalloc_memory()),
+            "rss_trigger_mb": settings.MEMORY_PROFILE_RSS_TRIGGER_MB or None,
+            "snapshots": self.snapshots(),
+        }
+
+    def check_rss(self) -> Optional[MemorySnapshot]:
+        """
+        Start tracing with a baseline snapshot once RSS crosses the trigger,
+        then snapshot again each time it grew by MEMORY_PROFILE_RSS_STEP_MB
+
+        Returns:
+            The snapshot taken, if any
+        """
+        trigger = settings.MEMORY_PROFILE_RSS_TRIGGER_MB * 1024 * 1024
+        rss = rss_bytes()
+        if not trigger or rss is None or rss < trigger:
+            return None
+        if self._triggered_at is None:
+            self._triggered_at = rss
+            logger.warning("RSS %.0f MB over the trigger, starting memory profiling", rss / 1024 / 1024)
+            return self.take_snapshot("rss-trigger baseline")
+        if rss - self._triggered_at < settings.MEMORY_PROFILE_RSS_STEP_MB * 1024 * 1024:
+            return None
+        self._triggered_at = rss
+        taken = self.take_snapshot(f"rss {rss / 1024 / 1024:.0f} MB")
+        top = self.diff(group_by="module", limit=5)["top"]
+        logger.warning("RSS grew to %.0f MB; top growing modules: %s", rss / 1024 / 1024, top)
+        return taken
+
+    def start_watcher(self) -> None:
+        """Check RSS against the trigger in a background thread"""
+        if not settings.MEMORY_PROFILE_RSS_TRIGGER_MB or self._watcher is not None:
+            return
+        self._stopping.clear()
+        self._watcher = threading.Thread(target=self._watch, name="memory-profiler", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        self._stopping.set()
+        if self._watcher is not None:
+            self._watcher.join(5)
+            self._watcher = None
+
+    def _watch(self) -> None:
+        while not self._stopping.wait(settings.MEMORY_PROFILE_CHECK_SECONDS):
+            try:
+                self.check_rss()
+            except Exception:
+                logger.exception("Memory profiler RSS check failed")
+
+
+memory_profiler = MemoryProfiler()
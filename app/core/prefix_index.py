@@ -0,0 +1,160 @@
+import sys
+import unicodedata
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Tuple
+
+
+# Only the first few words of a label get their own entry
+MAX_WORD_KEYS = 8
+
+
+def normalize(text: str) -> str:
+    """
+    Normalize text for prefix matching
+
+    Lowercases and strips accents so that "nguyen" matches "Nguyễn".
+    """
+    text = text.replace("đ", "d").replace("Đ", "D")
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).strip()
+
+
+def entry_keys(label: str) -> List[str]:
+    """
+    Get the index keys of a label
+
+    The full normalized label plus one key per following word, so that
+    "code" also finds "Clean Code".
+    """
+    key = normalize(label)
+    words = key.split()
+    keys = [key]
+    for i in range(1, min(len(words), MAX_WORD_KEYS)):
+        keys.append(" ".join(words[i:]))
+    return keys
+
+
+def key_size(key: str) -> int:
+    """Approximate memory used by one index entry"""
+    # string object + one slot in each of the two parallel lists
+    return sys.getsizeof(key) + 16
+
+
+class PrefixIndex:
+    """
+    Prefix index over (id, label) pairs backed by sorted parallel arrays
+
+    Lookups bisect into the sorted key list and walk forward while keys
+    still start with the prefix. Inserts and removals keep the arrays
+    sorted, which is cheap enough for name-sized catalogues.
+    """
+
+    def __init__(self):
+        self._keys: List[str] = []
+        self._ids: List[int] = []
+        self._labels: Dict[int, str] = {}
+        self.size_bytes = 0
+        self.skipped = 0
+
+    @classmethod
+    def build(cls, entries: Iterable[Tuple[int, str]], budget: int) -> "PrefixIndex":
+        """
+        Build an index in one pass
+
+        Args:
+            entries: (id, label) pairs
+            budget: Maximum approximate size in bytes
+
+        Returns:
+            The new index
+        """
+        index = cls()
+        pairs = []
+        for id, label in entries:
+            keys = index._fit(label, budget)
+            if not keys:
+                continue
+            index._labels[id] = label
+            pairs.extend((key, id) for key in keys)
+
+        pairs.sort()
+        index._keys = [key for key, _ in pairs]
+        index._ids = [id for _, id in pairs]
+        return index
+
+    def _fit(self, label: str, budget: int) -> List[str]:
+        """
+        Get the keys of a label that fit in the remaining budget
+
+        Word keys are dropped first; if even the full label does not fit
+        the entry is skipped.
+        """
+        keys = entry_keys(label)
+        size = sum(key_size(key) for key in keys) + sys.getsizeof(label)
+        if self.size_bytes + size > budget:
+            keys = keys[:1]
+            size = key_size(keys[0]) + sys.getsizeof(label)
+            if self.size_bytes + size > budget:
+                self.skipped += 1
+                return []
+        self.size_bytes += size
+        return keys
+
+    def add(self, id: int, label: str, budget: int) -> None:
+        """Add or replace the label of an id"""
+        self.remove(id)
+        keys = self._fit(label, budget)
+        if not keys:
+            return
+        self._labels[id] = label
+        for key in keys:
+            position = bisect_right(self._keys, key)
+            self._keys.insert(position, key)
+            self._ids.insert(position, id)
+
+    def remove(self, id: int) -> None:
+        """Remove an id from the index (no-op if missing)"""
+        label = self._labels.pop(id, None)
+        if label is None:
+            return
+        self.size_bytes -= sys.getsizeof(label)
+        for key in entry_keys(label):
+            start = bisect_left(self._keys, key)
+            end = bisect_right(self._keys, key, lo=start)
+            for position in range(start, end):
+                if self._ids[position] == id:
+                    del self._keys[position]
+                    del self._ids[position]
+                    self.size_bytes -= key_size(key)
+                    break
+
+    def search(self, prefix: str, limit: int) -> List[Tuple[int, str]]:
+        """
+        Find labels starting with a prefix (or with one of their words)
+
+        Args:
+            prefix: Raw user input, normalized here
+            limit: Maximum number of results
+
+        Returns:
+            (id, label) pairs in key order, without duplicates
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        results = []
+        seen = set()
+        position = bisect_left(self._keys, prefix)
+        while position < len(self._keys) and len(results) < limit:
+            if not self._keys[position].startswith(prefix):
+                break
+            id = self._ids[position]
+            if id not in seen:
+                seen.add(id)
+                results.append((id, self._labels[id]))
+            position += 1
+        return results
+
+    def __len__(self) -> int:
+        return len(self._labels)
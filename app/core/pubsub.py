@@ -0,0 +1,163 @@
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional, Set
+
+from app.core.config import settings
+
+
+Event = Dict[str, Any]
+
+
+class Broker(ABC):
+    """
+    Transport that carries events between workers
+
+    `publish` is called by the writer; every worker's hub receives the
+    event through the `deliver` callback given to `start`. A cross-worker
+    implementation (Redis pub/sub, Postgres LISTEN/NOTIFY, ...) only has to
+    provide these two methods.
+    """
+
+    @abstractmethod
+    def start(self, deliver: Callable[[Event], None]) -> None:
+        """Start receiving events, handing each one to deliver"""
+
+    @abstractmethod
+    def publish(self, event: Event) -> None:
+        """Send an event to every worker (this one included)"""
+
+
+class LocalBroker(Broker):
+    """Single-process stand-in: events only reach this worker's subscribers"""
+
+    def __init__(self):
+        self._deliver: Optional[Callable[[Event], None]] = None
+
+    def start(self, deliver: Callable[[Event], None]) -> None:
+        self._deliver = deliver
+
+    def publish(self, event: Event) -> None:
+        if self._deliver is not None:
+            self._deliver(event)
+
+
+BROKERS = {"local": LocalBroker}
+
+
+class Subscription:
+    """
+    One subscriber's bounded event queue
+
+    Must be created inside the subscriber's event loop. If the queue is
+    full when an event arrives the subscriber is too slow: it is dropped
+    (queue cleared, then a single None marks the end) rather than letting
+    it hold memory or slow down the publisher.
+    """
+
+    def __init__(self, hub: "EventHub", entity: Optional[str], maxsize: int):
+        self.hub = hub
+        self.entity = entity
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.dropped = False
+
+    def _offer(self, event: Event) -> None:
+        """Queue an event (runs in the subscriber's loop)"""
+        if self.dropped:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped = True
+            self.hub.unsubscribe(self, dropped=True)
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """
+        Wait for the next event
+
+        Returns None once the subscriber has been dropped; raises
+        asyncio.TimeoutError if nothing arrives within timeout.
+        """
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class EventHub:
+    """
+    In-process pub/sub for catalogue events
+
+    Publishing is thread-safe (services run in the threadpool) and never
+    blocks: events are handed to each subscriber's loop and queued there.
+    """
+
+    def __init__(self, broker: Broker, queue_size: int):
+        self._lock = threading.Lock()
+        self._subscribers: Set[Subscription] = set()
+        self.queue_size = queue_size
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.broker = broker
+        self.broker.start(self._deliver)
+
+    def subscribe(self, entity: Optional[str] = None) -> Subscription:
+        """Subscribe to all events, or to the events of one entity"""
+        subscription = Subscription(self, entity, self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription, dropped: bool = False) -> None:
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.discard(subscription)
+                if dropped:
+                    self.dropped += 1
+
+    def publish(self, entity: str, type: str, id: int, data: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Publish a committed change
+
+        Args:
+            entity: Table name (books, authors, categories)
+            type: created, updated, deleted or cover
+            id: Record id
+            data: Current row values (None for deletes)
+        """
+        with self._lock:
+            self.published += 1
+        self.broker.publish({"type": type, "entity": entity, "id": id, "data": data})
+
+    def _deliver(self, event: Event) -> None:
+        """Fan an event out to the local subscribers"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        delivered = 0
+        for subscription in subscribers:
+            if subscription.entity and subscription.entity != event["entity"]:
+                continue
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._offer, event)
+                delivered += 1
+            except RuntimeError:
+                # Loop closed under us
+                self.unsubscribe(subscription)
+        with self._lock:
+            self.delivered += delivered
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "broker": type(self.broker).__name__,
+                "subscribers": len(self._subscribers),
+                "queue_size": self.queue_size,
+                "published": self.published,
+                "delivered": self.delivered,
+                "dropped_subscribers": self.dropped,
+            }
+
+
+event_hub = EventHub(BROKERS[settings.EVENT_BROKER](), settings.EVENT_QUEUE_SIZE)
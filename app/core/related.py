@@ -0,0 +1,323 @@
+import json
+import math
+import os
+import shutil
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from app.core.trigram import WORD_PATTERN
+from app.core.prefix_index import normalize
+
+
+# Rows of the similarity product computed at once while building
+BUILD_CHUNK = 256
+
+# Title words count this many times as much as description words
+TITLE_REPEAT = 2
+
+# File written last by a build; names the directory of the current build
+CURRENT_FILE = "CURRENT"
+
+ARRAYS = ("ids", "neighbors", "scores", "data", "indices", "indptr", "idf")
+
+
+def tokens(text: Optional[str]) -> List[str]:
+    return WORD_PATTERN.findall(normalize(text)) if text else []
+
+
+def feature_counts(book: Dict) -> Counter:
+    """Raw text term counts of a book (title + description)"""
+    counts = Counter(tokens(book.get("description")))
+    for token in tokens(book.get("title")):
+        counts[token] += TITLE_REPEAT
+    return counts
+
+
+def facet_keys(book: Dict) -> List[Tuple[str, str, float]]:
+    """
+    Non-text features of a book: (key, weight name, share of that weight)
+
+    Years fall into two decade grids offset by five years, so books in the
+    same half-decade share both keys and books a few years apart share one.
+    """
+    year = book.get("published_year") or 0
+    return [
+        (f"author:{book['author_id']}", "author", 1.0),
+        (f"category:{book['category_id']}", "category", 1.0),
+        (f"year:{year // 10}", "year", 0.5),
+        (f"year5:{(year + 5) // 10}", "year", 0.5),
+    ]
+
+
+class RelatedBooksIndex:
+    """
+    Precomputed "related books" lists
+
+    Every book is a sparse vector: its L2-normalized TF-IDF over title and
+    description, plus one-hot author, category and year-bucket features,
+    each block scaled by the square root of its weight. The dot product of
+    two vectors is then
+
+        text * cosine + author * same_author + category * same_category
+        + year * year_proximity
+
+    The top `k` neighbours of every book are computed in batch (chunked
+    sparse products) and saved as .npy files that are memory-mapped on
+    load, together with the vectorizer (vocabulary, idf) and the feature
+    matrix. A lookup reads one row of the neighbour arrays.
+
+    Books written since the build are kept in a small in-memory overlay:
+    their own row is recomputed against the feature matrix and they are
+    inserted into the lists of their nearest neighbours. Books unknown to
+    the index are scored on the fly with one sparse matrix-vector product.
+    """
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        neighbors: np.ndarray,
+        scores: np.ndarray,
+        matrix: sparse.csr_matrix,
+        vocabulary: Dict[str, int],
+        idf: np.ndarray,
+        weights: Dict[str, float],
+        built_at: float,
+    ):
+        self.ids = ids
+        self.neighbors = neighbors
+        self.scores = scores
+        self.matrix = matrix
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.weights = weights
+        self.built_at = built_at
+        self.k = neighbors.shape[1]
+        self._overlay: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+    # Vectorizing
+
+    def vectorize(self, books: List[Dict]) -> sparse.csr_matrix:
+        """Feature rows of some books (words and facets unseen at build time are ignored)"""
+        return _vectorize(books, self.vocabulary, self.idf, self.weights)
+
+    # Building
+
+    @classmethod
+    def build(cls, books: Iterable[Dict], k: int, weights: Dict[str, float]) -> "RelatedBooksIndex":
+        """
+        Build an index in memory
+
+        Args:
+            books: Dicts with id, title, description, author_id,
+                category_id and published_year, in any order
+            k: Neighbours kept per book
+            weights: Weights of the text, author, category and year blocks
+        """
+        books = sorted(books, key=lambda book: book["id"])
+        vocabulary: Dict[str, int] = {}
+        document_frequency: Counter = Counter()
+        for book in books:
+            terms = feature_counts(book)
+            document_frequency.update(terms.keys())
+            for term in terms:
+                vocabulary.setdefault(term, len(vocabulary))
+            for key, _, _ in facet_keys(book):
+                vocabulary.setdefault(key, len(vocabulary))
+
+        n = len(books)
+        idf = np.zeros(len(vocabulary), dtype=np.float32)
+        for term, count in document_frequency.items():
+            idf[vocabulary[term]] = math.log((1 + n) / (1 + count)) + 1
+
+        ids = np.array([book["id"] for book in books], dtype=np.int64)
+        matrix = _vectorize(books, vocabulary, idf, weights)
+        neighbors = np.full((n, k), -1, dtype=np.int32)
+        scores = np.zeros((n, k), dtype=np.float32)
+        transposed = matrix.T.tocsc()
+        for start in range(0, n, BUILD_CHUNK):
+            block = (matrix[start:start + BUILD_CHUNK] @ transposed).tocsr()
+            for row in range(block.shape[0]):
+                lo, hi = block.indptr[row], block.indptr[row + 1]
+                top, top_scores = _top_k(block.indices[lo:hi], block.data[lo:hi], k, exclude=start + row)
+                neighbors[start + row, :len(top)] = top
+                scores[start + row, :len(top)] = top_scores
+        return cls(ids, neighbors, scores, matrix, vocabulary, idf, weights, time.time())
+
+    def save(self, directory: str) -> str:
+        """
+        Write the index under a new build directory and make it current
+
+        The CURRENT file is replaced atomically last, so processes loading
+        concurrently see either the old or the new build. The previous build
+        is kept for processes still loading it; older ones are removed
+        (processes that still have them mapped keep reading them).
+        """
+        os.makedirs(directory, exist_ok=True)
+        previous = self.current_build(directory)
+        name = f"build-{int(self.built_at * 1000)}-{os.getpid()}"
+        path = os.path.join(directory, name)
+        os.makedirs(path)
+        arrays = {
+            "ids": self.ids,
+            "neighbors": self.neighbors,
+            "scores": self.scores,
+            "data": self.matrix.data.astype(np.float32, copy=False),
+            "indices": self.matrix.indices.astype(np.int32, copy=False),
+            "indptr": self.matrix.indptr.astype(np.int64, copy=False),
+            "idf": self.idf,
+        }
+        for key, array in arrays.items():
+            np.save(os.path.join(path, f"{key}.npy"), array)
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "vocabulary": self.vocabulary,
+                "weights": self.weights,
+                "built_at": self.built_at,
+                "shape": list(self.matrix.shape),
+            }, f)
+
+        temporary = os.path.join(directory, f"{CURRENT_FILE}.{os.getpid()}")
+        with open(temporary, "w") as f:
+            f.write(name)
+        os.replace(temporary, os.path.join(directory, CURRENT_FILE))
+
+        for entry in os.listdir(directory):
+            if entry.startswith("build-") and entry not in (name, previous):
+                shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+        return path
+
+    @staticmethod
+    def current_build(directory: str) -> Optional[str]:
+        """Name of the current build directory, if any"""
+        try:
+            with open(os.path.join(directory, CURRENT_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["RelatedBooksIndex"]:
+        """Memory-map the current build of a directory (None if there is none)"""
+        name = cls.current_build(directory)
+        if name is None:
+            return None
+        path = os.path.join(directory, name)
+        arrays = {key: np.load(os.path.join(path, f"{key}.npy"), mmap_mode="r") for key in ARRAYS}
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        matrix = sparse.csr_matrix(
+            (arrays["data"], arrays["indices"], arrays["indptr"]), shape=tuple(meta["shape"]), copy=False
+        )
+        return cls(
+            arrays["ids"], arrays["neighbors"], arrays["scores"], matrix,
+            meta["vocabulary"], arrays["idf"], meta["weights"], meta["built_at"],
+        )
+
+    # Lookups
+
+    def row_of(self, id: int) -> Optional[int]:
+        row = int(np.searchsorted(self.ids, id))
+        if row < len(self.ids) and self.ids[row] == id:
+            return row
+        return None
+
+    def related(self, id: int, limit: int) -> Optional[List[Tuple[int, float]]]:
+        """
+        Most related books of an indexed book, best first
+
+        Returns:
+            (id, score) pairs, or None if the book is not in the index
+        """
+        if id in self._overlay:
+            ids, scores = self._overlay[id]
+        else:
+            row = self.row_of(id)
+            if row is None:
+                return None
+            neighbors = self.neighbors[row]
+            valid = neighbors >= 0
+            ids, scores = self.ids[neighbors[valid]], self.scores[row][valid]
+        return [(int(i), float(s)) for i, s in zip(ids[:limit], scores[:limit])]
+
+    def score(self, book: Dict, limit: int) -> List[Tuple[int, float]]:
+        """Score a book against every indexed book (for books the index does not know)"""
+        ids, scores = self._score(book)
+        return [(int(i), float(s)) for i, s in zip(ids[:limit], scores[:limit])]
+
+    def _score(self, book: Dict) -> Tuple[np.ndarray, np.ndarray]:
+        similarities = (self.matrix @ self.vectorize([book]).T).tocoo()
+        exclude = self.row_of(book["id"])
+        top, top_scores = _top_k(similarities.row, similarities.data, self.k, exclude=-1 if exclude is None else exclude)
+        return self.ids[top], top_scores
+
+    # Incremental updates
+
+    def upsert(self, book: Dict) -> None:
+        """
+        Apply a written book to the overlay
+
+        Its own list is recomputed; it is also inserted into the lists of
+        its neighbours where it beats their weakest entry. Lists of other
+        books keep their build-time scores until the next build.
+        """
+        ids, scores = self._score(book)
+        self._overlay[book["id"]] = (ids, scores)
+        for neighbor, score in zip(ids, scores):
+            current = self.related(int(neighbor), self.k)
+            if current is None:
+                continue
+            entries = [(i, s) for i, s in current if i != book["id"]] + [(book["id"], float(score))]
+            entries.sort(key=lambda entry: -entry[1])
+            entries = entries[:self.k]
+            self._overlay[int(neighbor)] = (
+                np.array([i for i, _ in entries], dtype=np.int64),
+                np.array([s for _, s in entries], dtype=np.float32),
+            )
+
+    def remove(self, id: int) -> None:
+        """Forget the overlay row of a deleted book (callers drop deleted ids from results)"""
+        self._overlay.pop(id, None)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def _vectorize(books: List[Dict], vocabulary: Dict[str, int], idf: np.ndarray, weights: Dict[str, float]) -> sparse.csr_matrix:
+    rows: List[int] = []
+    columns: List[int] = []
+    values: List[float] = []
+    text_weight = math.sqrt(weights["text"])
+    for row, book in enumerate(books):
+        terms = [(vocabulary[term], count) for term, count in feature_counts(book).items() if term in vocabulary]
+        tfidf = [(column, (1 + math.log(count)) * float(idf[column])) for column, count in terms]
+        norm = math.sqrt(sum(value * value for _, value in tfidf))
+        for column, value in tfidf:
+            if norm:
+                rows.append(row)
+                columns.append(column)
+                values.append(text_weight * value / norm)
+        for key, weight, share in facet_keys(book):
+            column = vocabulary.get(key)
+            if column is not None:
+                rows.append(row)
+                columns.append(column)
+                values.append(math.sqrt(weights[weight] * share))
+    return sparse.csr_matrix(
+        (np.array(values, dtype=np.float32), (np.array(rows, dtype=np.int32), np.array(columns, dtype=np.int32))),
+        shape=(len(books), len(vocabulary)),
+    )
+
+
+def _top_k(columns: np.ndarray, values: np.ndarray, k: int, exclude: int) -> Tuple[np.ndarray, np.ndarray]:
+    """The k best (column, value) entries of a sparse row, best first, ties by column"""
+    keep = (columns != exclude) & (values > 0)
+    columns, values = columns[keep], values[keep]
+    if len(values) > k:
+        best = np.argpartition(-values, k - 1)[:k]
+        columns, values = columns[best], values[best]
+    order = np.lexsort((columns, -values))
+    return columns[order].astype(np.int32), values[order].astype(np.float32)
@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.repositories.cache_version_repository import BUMPED_KEY, cache_version_repository
+
+
+# Version stamps of the tables a response was rendered from
+Versions = Tuple[Tuple[str, int], ...]
+
+
+class CachedResponse:
+    """A cached response: plain body plus its compressed variants"""
+
+    __slots__ = ("versions", "expires_at", "status", "headers", "bodies")
+
+    def __init__(self, versions: Versions, status: int, headers: List[Tuple[bytes, bytes]], body: bytes):
+        self.versions = versions
+        self.expires_at = time.monotonic() + settings.RESPONSE_CACHE_TTL
+        self.status = status
+        self.headers = headers
+        self.bodies: Dict[str, bytes] = {"identity": body}
+
+    @property
+    def size(self) -> int:
+        return sum(len(body) for body in self.bodies.values())
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache of GET responses
+
+    Entries are tagged with the `cache_versions` stamps current when their
+    request started, and only served while the stamps are unchanged. Every
+    write bumps a stamp in its own transaction. The worker keeps a snapshot
+    of the stamps instead of reading them per request (cache hits never
+    touch the database): it is re-read at most every
+    RESPONSE_CACHE_CHECK_INTERVAL seconds, so writes in other workers are
+    seen within that interval, and as soon as a session of this worker
+    commits a bump. RESPONSE_CACHE_TTL bounds how long an entry lives
+    otherwise.
+    """
+
+    def __init__(self):
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._versions: Optional[Versions] = None
+        self._checked_at = 0.0
+        # Bumped by every local commit of a write, so that a snapshot read
+        # before the commit is not kept after it
+        self._expirations = 0
+        event.listen(Session, "after_commit", self._after_commit)
+        event.listen(Session, "after_rollback", self._after_rollback)
+
+    def versions(self) -> Optional[Versions]:
+        """This worker's snapshot of the version stamps, None when due for a re-read"""
+        if self._versions is None or time.monotonic() - self._checked_at >= settings.RESPONSE_CACHE_CHECK_INTERVAL:
+            return None
+        return self._versions
+
+    def refresh_versions(self, db: Session) -> Versions:
+        """Re-read the version stamps of the cached tables"""
+        expirations = self._expirations
+        versions = tuple(sorted(cache_version_repository.get_versions(db).items()))
+        with self._lock:
+            if expirations == self._expirations:
+                self._versions = versions
+                self._checked_at = time.monotonic()
+        return versions
+
+    def _after_commit(self, session: Session) -> None:
+        if session.info.pop(BUMPED_KEY, False):
+            with self._lock:
+                self._expirations += 1
+                self._versions = None
+
+    def _after_rollback(self, session: Session) -> None:
+        session.info.pop(BUMPED_KEY, None)
+
+    def get(self, key: str, versions: Versions) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.versions != versions or entry.expires_at < time.monotonic():
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, entry: CachedResponse) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            self._size += entry.size
+            self._evict()
+
+    def add_variant(self, key: str, entry: CachedResponse, encoding: str, body: bytes) -> None:
+        """Store a compressed body next to the cached one"""
+        with self._lock:
+            if encoding in entry.bodies:
+                return
+            entry.bodies[encoding] = body
+            if self._entries.get(key) is entry:
+                self._size += len(body)
+                self._evict()
+
+    def _drop(self, key: str) -> None:
+        self._size -= self._entries.pop(key).size
+
+    def _evict(self) -> None:
+        max_size = settings.RESPONSE_CACHE_MAX_MB * 1024 * 1024
+        while self._size > max_size and self._entries:
+            self._drop(next(iter(self._entries)))
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+response_cache = ResponseCache()
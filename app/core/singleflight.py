@@ -0,0 +1,83 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    """An in-flight call that followers wait on"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls into one execution
+
+    The first caller for a key runs the function; callers arriving with the
+    same key while it is still running wait for it and get the same result
+    (or exception). Nothing is cached once the call completes.
+
+    `do` is for threadpool (sync) callers, which block on a threading.Event
+    while they wait; `do_async` for coroutines, which await one shared task.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._futures: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn, or wait for the identical call already in flight"""
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            if call is not None:
+                self.shared += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await fn(), or the identical coroutine already in flight"""
+        with self._lock:
+            self.calls += 1
+            future = self._futures.get(key)
+            if future is not None:
+                self.shared += 1
+            else:
+                future = self._futures[key] = asyncio.ensure_future(fn())
+                future.add_done_callback(lambda _: self._futures.pop(key, None))
+        # Shield so that one cancelled caller does not cancel the others
+        return await asyncio.shield(future)
+
+    def stats(self) -> Dict[str, Any]:
+        """Coalescing metrics since startup"""
+        return {
+            "calls": self.calls,
+            "shared": self.shared,
+            "in_flight": len(self._calls) + len(self._futures),
+            "coalescing_rate": self.shared / self.calls if self.calls else 0.0,
+        }
@@ -0,0 +1,253 @@
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.utils import APP_DIR
+
+
+CALLER_LAYERS = ("repositories", "services")
+
+# Callers kept per fingerprint
+MAX_CALLERS = 10
+
+# Execution option that keeps a statement out of the log (used for EXPLAIN)
+SKIP_OPTION = "skip_slow_query_log"
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"%\(\w+\)s|:\w+|\$\d+|%s|\?")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,)*\s*\?\s*\)", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Normalize a SQL statement so that executions differing only in their
+    values (literals, bound parameters, IN-list length) share one key
+    """
+    statement = _STRING.sub("?", statement)
+    statement = _PARAM.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _IN_LIST.sub("IN (...)", statement)
+    return _SPACE.sub(" ", statement).strip()
+
+
+def find_caller() -> str:
+    """
+    Service and repository functions on the current stack, outermost first
+    (e.g. "BookService.get_books.<locals>.load > BaseRepository.get_all")
+    """
+    found = {}
+    frame = sys._getframe(1)
+    while frame is not None and len(found) < len(CALLER_LAYERS):
+        filename = frame.f_code.co_filename
+        if filename.startswith(APP_DIR):
+            for layer in CALLER_LAYERS:
+                if layer not in found and f"{os.sep}{layer}{os.sep}" in filename:
+                    found[layer] = getattr(frame.f_code, "co_qualname", frame.f_code.co_name)
+        frame = frame.f_back
+    return " > ".join(found[layer] for layer in reversed(CALLER_LAYERS) if layer in found) or "?"
+
+
+class QueryStats:
+    """Aggregated executions of one statement fingerprint"""
+
+    __slots__ = (
+        "fingerprint", "count", "slow_count", "total_ms", "max_ms", "rows",
+        "callers", "statement", "parameters", "last_seen", "plan",
+    )
+
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.count = 0
+        self.slow_count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.callers: Counter = Counter()
+        self.statement: Optional[str] = None
+        self.parameters: Any = None
+        self.last_seen = 0.0
+        self.plan: Optional[List[str]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "fingerprint": self.fingerprint,
+            "count": self.count,
+            "slow_count": self.slow_count,
+            "total_ms": round(self.total_ms, 2),
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 2),
+            "rows": self.rows,
+            "callers": dict(self.callers.most_common()),
+            "last_seen": self.last_seen,
+            "plan": self.plan,
+        }
+
+
+class SlowQueryLog:
+    """
+    Slow-query log hooked into SQLAlchemy engine events
+
+    Every statement slower than `SLOW_QUERY_THRESHOLD_MS` is recorded, and
+    a random `SLOW_QUERY_SAMPLE_RATE` share of the others, so frequent
+    cheap queries show up too. Records are aggregated per fingerprint in a
+    bounded table: when it is full the fingerprint with the least total
+    time is evicted.
+
+    Row counts are affected rows for writes (cursor.rowcount) and fetched
+    rows for SELECTs run through an ORM session (see `install_session`):
+    drivers do not know the size of a SELECT result before it is fetched,
+    so a recorded SELECT's result is buffered to count it. SELECTs run on
+    a bare connection count 0.
+    """
+
+    ORDERS = {
+        "total": lambda stats: stats.total_ms,
+        "max": lambda stats: stats.max_ms,
+        "avg": lambda stats: stats.total_ms / stats.count,
+        "count": lambda stats: stats.count,
+    }
+
+    def __init__(self):
+        self._stats: Dict[str, QueryStats] = {}
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.evicted = 0
+        # Stats of the SELECT this thread just recorded, waiting for its rows
+        self._pending = threading.local()
+
+    def install(self, engine: Engine) -> None:
+        """Listen to the statements executed by an engine"""
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+
+    def install_session(self, session_class: Any) -> None:
+        """Count the rows fetched by the SELECTs of a sessionmaker/Session class"""
+        event.listen(session_class, "do_orm_execute", self._count_rows)
+
+    def _count_rows(self, orm_execute_state) -> Any:
+        options = orm_execute_state.execution_options
+        if not orm_execute_state.is_select or options.get("yield_per") or options.get("stream_results"):
+            return None
+        self._pending.stats = None
+        result = orm_execute_state.invoke_statement()
+        stats, self._pending.stats = self._pending.stats, None
+        if stats is None:
+            # Not recorded (fast and not sampled): leave the result unbuffered
+            return result
+        frozen = result.freeze()
+        with self._lock:
+            stats.rows += len(frozen.data)
+        return frozen()
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if context is not None:
+            context._slow_query_started = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        started = getattr(context, "_slow_query_started", None)
+        if started is None or context.execution_options.get(SKIP_OPTION):
+            return
+        duration_ms = (time.perf_counter() - started) * 1000
+        slow = duration_ms >= settings.SLOW_QUERY_THRESHOLD_MS
+        if not slow and random.random() >= settings.SLOW_QUERY_SAMPLE_RATE:
+            return
+        rows = cursor.rowcount if cursor.rowcount and cursor.rowcount > 0 else 0
+        is_select = cursor.description is not None and statement.lstrip()[:6].upper() in ("SELECT", "WITH")
+        if is_select:
+            # Counted once fetched, by _count_rows
+            rows = 0
+        elif not rows and statement.lstrip()[:6].upper() == "INSERT":
+            # INSERT ... RETURNING has no rowcount until its rows are fetched
+            rows = len(parameters) if executemany else 1
+        if executemany and parameters:
+            parameters = parameters[0]
+        stats = self.record(statement, parameters, duration_ms, rows, slow, find_caller())
+        if is_select:
+            self._pending.stats = stats
+
+    def record(
+        self, statement: str, parameters: Any, duration_ms: float, rows: int, slow: bool, caller: str
+    ) -> QueryStats:
+        key = fingerprint(statement)
+        with self._lock:
+            self.recorded += 1
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= settings.SLOW_QUERY_MAX_FINGERPRINTS:
+                    victim = min(self._stats.values(), key=self.ORDERS["total"])
+                    del self._stats[victim.fingerprint]
+                    self.evicted += 1
+                stats = self._stats[key] = QueryStats(key)
+            stats.count += 1
+            stats.slow_count += slow
+            stats.total_ms += duration_ms
+            stats.rows += rows
+            stats.last_seen = time.time()
+            if caller in stats.callers or len(stats.callers) < MAX_CALLERS:
+                stats.callers[caller] += 1
+            if duration_ms >= stats.max_ms:
+                # Keep the worst execution as the example to EXPLAIN
+                stats.max_ms = duration_ms
+                stats.statement = statement
+                stats.parameters = parameters
+        return stats
+
+    def explain(self, engine: Engine, stats: QueryStats) -> None:
+        """Capture the query plan of a fingerprint's worst SELECT"""
+        if stats.plan is not None or not stats.statement:
+            return
+        if not stats.statement.lstrip().upper().startswith("SELECT"):
+            return
+        prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+        try:
+            with engine.connect() as connection:
+                cursor = connection.execution_options(**{SKIP_OPTION: True}).exec_driver_sql(
+                    prefix + stats.statement, stats.parameters or ()
+                )
+                stats.plan = [" ".join(str(value) for value in row) for row in cursor]
+        except Exception as e:
+            stats.plan = [f"EXPLAIN failed: {e}"]
+
+    def top(self, limit: int = 10, order_by: str = "total", explain_engine: Optional[Engine] = None) -> Dict[str, Any]:
+        """
+        Report the worst fingerprints
+
+        Args:
+            limit: Number of fingerprints
+            order_by: total, max, avg or count
+            explain_engine: Capture missing query plans of the reported
+                statements on this engine
+        """
+        with self._lock:
+            worst = sorted(self._stats.values(), key=self.ORDERS[order_by], reverse=True)[:limit]
+        if explain_engine is not None:
+            for stats in worst:
+                self.explain(explain_engine, stats)
+        return {
+            "threshold_ms": settings.SLOW_QUERY_THRESHOLD_MS,
+            "sample_rate": settings.SLOW_QUERY_SAMPLE_RATE,
+            "fingerprints": len(self._stats),
+            "recorded": self.recorded,
+            "evicted": self.evicted,
+            "queries": [stats.to_dict() for stats in worst],
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self.recorded = 0
+            self.evicted = 0
+
+
+slow_query_log = SlowQueryLog()
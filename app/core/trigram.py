@@ -0,0 +1,160 @@
+import math
+import re
+import sys
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Set, Tuple
+
+from app.core.prefix_index import normalize
+
+
+WORD_PATTERN = re.compile(r"\w+")
+
+# Bytes per posting entry (array of signed 32-bit ints)
+POSTING_SIZE = array("i").itemsize
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Extract the trigrams of a text the way pg_trgm does
+
+    Each word is lowercased (and stripped of accents), padded with two
+    spaces in front and one behind, then split into 3-character windows.
+    """
+    result = set()
+    for word in WORD_PATTERN.findall(normalize(text)):
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            result.add(padded[i:i + 3])
+    return result
+
+
+def similarity(a: Set[str], b: Set[str]) -> float:
+    """Trigram similarity (shared / union), same as pg_trgm similarity()"""
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+class TrigramIndex:
+    """
+    Trigram inverted index for typo-tolerant search
+
+    Posting lists are append-only int arrays. The label dict is the source
+    of truth: removed or renamed ids may leave stale postings behind, which
+    are harmless because every result is re-scored against its current
+    label. Stale postings are dropped on the next rebuild.
+
+    Candidates are generated with prefix filtering: a label with similarity
+    >= t to a query of n trigrams shares at least m = ceil(t * n / (1 + t))
+    of them, so it must appear in at least one posting list of the
+    n - m + 1 rarest query trigrams. Only those lists are read; the hits
+    counted there plus the m - 1 unread lists bound each candidate's
+    similarity from above, and only the candidates whose bound can still
+    make the top results are scored exactly.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, array] = {}
+        self._labels: Dict[int, str] = {}
+        self._sizes: Dict[int, int] = {}
+        self.size_bytes = 0
+        self.skipped = 0
+
+    @classmethod
+    def build(cls, entries: Iterable[Tuple[int, str]], budget: int) -> "TrigramIndex":
+        """
+        Build an index in one pass
+
+        Args:
+            entries: (id, label) pairs
+            budget: Maximum approximate size in bytes
+
+        Returns:
+            The new index
+        """
+        index = cls()
+        for id, label in entries:
+            index._insert(id, label, budget)
+        return index
+
+    def _insert(self, id: int, label: str, budget: int) -> None:
+        grams = trigrams(label)
+        size = sys.getsizeof(label) + len(grams) * POSTING_SIZE
+        if self.size_bytes + size > budget:
+            self.skipped += 1
+            return
+
+        self.size_bytes += size
+        self._labels[id] = label
+        self._sizes[id] = len(grams)
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting is None:
+                posting = self._postings[gram] = array("i")
+                self.size_bytes += sys.getsizeof(gram) + sys.getsizeof(posting)
+            posting.append(id)
+
+    def add(self, id: int, label: str, budget: int) -> None:
+        """Add or replace the label of an id"""
+        self.remove(id)
+        self._insert(id, label, budget)
+
+    def remove(self, id: int) -> None:
+        """Remove an id from the index (its postings go stale)"""
+        label = self._labels.pop(id, None)
+        if label is not None:
+            self._sizes.pop(id)
+            self.size_bytes -= sys.getsizeof(label)
+
+    def search(self, query: str, threshold: float, limit: int) -> List[Tuple[int, float]]:
+        """
+        Find the labels most similar to a query
+
+        Args:
+            query: Raw user input
+            threshold: Minimum similarity (0..1)
+            limit: Maximum number of results
+
+        Returns:
+            (id, similarity) pairs, best first
+        """
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+
+        n = len(query_grams)
+        min_shared = max(1, math.ceil(threshold * n / (1 + threshold) - 1e-9))
+        rarest = sorted(query_grams, key=lambda gram: len(self._postings.get(gram, ())))
+        hits = Counter()
+        for gram in rarest[:n - min_shared + 1]:
+            hits.update(self._postings.get(gram, ()))
+
+        # Upper bound of each candidate's similarity: it can share at most
+        # its hits plus every unread trigram (stale postings only inflate it)
+        unread = min_shared - 1
+        bounded = []
+        for id, count in hits.items():
+            size = self._sizes.get(id)
+            if size is None:
+                continue
+            shared = min(count + unread, n, size)
+            bound = shared / (n + size - shared)
+            if bound >= threshold:
+                bounded.append((bound, id))
+        bounded.sort(reverse=True)
+
+        scored = []
+        for bound, id in bounded:
+            if len(scored) >= limit and bound < scored[-1][1]:
+                break
+            score = similarity(query_grams, trigrams(self._labels[id]))
+            if score >= threshold:
+                scored.append((id, score))
+                scored.sort(key=lambda item: (-item[1], item[0]))
+                del scored[limit:]
+        return scored
+
+    def __len__(self) -> int:
+        return len(self._labels)
@@ -1,10 +1,16 @@
 import os
+import shutil
 import uuid
 from pathlib import Path
 from typing import Tuple
 from fastapi import UploadFile, HTTPException, status
 
 
+# Served under /static, independent of the working directory
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC_DIR = os.path.join(APP_DIR, "static")
+COVERS_DIR = os.path.join(STATIC_DIR, "covers")
+
 # Allowed image extensions
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
@@ -53,7 +59,7 @@ def generate_unique_filename(original_filename: str) -> str:
 
 async def save_upload_file(
     file: UploadFile, 
-    save_dir: str = "app/static/covers"
+    save_dir: str = COVERS_DIR
 ) -> Tuple[str, str]:
     """
     Save uploaded file to disk
@@ -109,6 +115,65 @@ async def save_upload_file(
         )
 
 
+def stage_upload_file(file: UploadFile, staging_dir: str) -> str:
+    """
+    Copy an upload to a staging directory for later processing
+    
+    The spooled upload is copied in chunks, so memory use does not depend
+    on the file size.
+    
+    Args:
+        file: Uploaded file from FastAPI
+        staging_dir: Directory for staged uploads
+        
+    Returns:
+        Path of the staged file
+        
+    Raises:
+        HTTPException: If the file is invalid or too large
+    """
+    validate_image_file(file)
+    Path(staging_dir).mkdir(parents=True, exist_ok=True)
+    staged_path = os.path.join(staging_dir, generate_unique_filename(file.filename))
+    
+    size = 0
+    file.file.seek(0)
+    with open(staged_path, "wb") as f:
+        while chunk := file.file.read(1024 * 1024):
+            size += len(chunk)
+            if size > MAX_FILE_SIZE:
+                break
+            f.write(chunk)
+    
+    if size > MAX_FILE_SIZE:
+        os.remove(staged_path)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File size exceeds maximum allowed size of {MAX_FILE_SIZE / (1024*1024)}MB"
+        )
+    return staged_path
+
+
+def promote_staged_file(staged_path: str, save_dir: str = COVERS_DIR) -> Tuple[str, str]:
+    """
+    Move a staged upload to its public directory (keeping its unique name)
+    
+    Safe to call again after a retry: if the file was already moved the
+    existing target is returned.
+    
+    Returns:
+        Tuple of (file_path, url_path)
+    """
+    Path(save_dir).mkdir(parents=True, exist_ok=True)
+    filename = os.path.basename(staged_path)
+    file_path = os.path.join(save_dir, filename)
+    if os.path.exists(staged_path):
+        shutil.move(staged_path, file_path)
+    elif not os.path.exists(file_path):
+        raise FileNotFoundError(staged_path)
+    return file_path, f"/static/covers/{filename}"
+
+
 def delete_file(file_path: str) -> bool:
     """
     Delete file from disk
@@ -128,13 +193,13 @@ def delete_file(file_path: str) -> bool:
         return False
 
 
-def get_file_path_from_url(url_path: str, base_dir: str = "app") -> str:
+def get_file_path_from_url(url_path: str, base_dir: str = APP_DIR) -> str:
     """
     Convert URL path to file system path
     
     Args:
         url_path: URL path (e.g., /static/covers/image.jpg)
-        base_dir: Base directory (default: app)
+        base_dir: Base directory (default: the app package)
         
     Returns:
         File system path
@@ -0,0 +1,163 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import Settings, settings
+
+
+# SQLite virtual machine instructions between two deadline checks
+SQLITE_PROGRESS_STEPS = 1000
+
+CONNECTION_KEY = "query_deadline"
+
+
+class QueryInterrupted(Exception):
+    """A statement was stopped because its request ran out of time or its client left"""
+
+    def __init__(self, deadline: "QueryDeadline", reason: str):
+        super().__init__(f"Query interrupted ({reason})")
+        self.deadline = deadline
+        self.reason = reason
+
+
+class QueryDeadline:
+    """
+    Time budget and cancellation flag of one request's database work
+
+    Attached to every connection its session begins a transaction on:
+    SQLite connections get a progress handler that aborts the running
+    statement once the budget is spent or the request is cancelled,
+    Postgres transactions get a matching `statement_timeout` and are
+    cancelled server-side on `cancel()`.
+    """
+
+    def __init__(self):
+        self.expires_at: Optional[float] = None
+        self.cancelled = False
+        self._connections: Dict[int, Any] = {}
+        self._lock = threading.Lock()
+
+    def start(self, timeout_ms: float) -> None:
+        """Start the budget (0 = no deadline, only cancellation)"""
+        self.expires_at = time.monotonic() + timeout_ms / 1000 if timeout_ms > 0 else None
+
+    def remaining_ms(self) -> Optional[float]:
+        if self.expires_at is None:
+            return None
+        return (self.expires_at - time.monotonic()) * 1000
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def tripped(self) -> bool:
+        """Whether running statements must be stopped"""
+        return self.cancelled or self.expired
+
+    def reason(self) -> str:
+        return "disconnect" if self.cancelled else "deadline"
+
+    def attach(self, dbapi_connection: Any) -> None:
+        with self._lock:
+            self._connections[id(dbapi_connection)] = dbapi_connection
+
+    def detach(self, dbapi_connection: Any) -> None:
+        with self._lock:
+            self._connections.pop(id(dbapi_connection), None)
+
+    def cancel(self) -> None:
+        """
+        Stop the statements running for this request (thread-safe)
+
+        Only connections still attached are touched, so a connection
+        already returned to the pool never gets another request's query
+        cancelled.
+        """
+        with self._lock:
+            if self.cancelled:
+                return
+            self.cancelled = True
+            for dbapi_connection in self._connections.values():
+                stop = getattr(dbapi_connection, "interrupt", None) or getattr(dbapi_connection, "cancel", None)
+                if stop is not None:
+                    try:
+                        stop()
+                    except Exception:
+                        pass
+
+
+class QueryDeadlines:
+    """
+    Enforces request deadlines on the engines and sessions
+
+    A session created with `info={"query_deadline": deadline}` puts every
+    transaction it begins under that deadline; sessions without one
+    (background jobs, the writer thread, CLI) are not limited.
+    """
+
+    def __init__(self, deadline_settings: Settings):
+        self.settings = deadline_settings
+        self.interrupted = {"deadline": 0, "disconnect": 0}
+
+    def configure(self, deadline_settings: Settings) -> None:
+        """Use other settings for the route timeouts"""
+        self.settings = deadline_settings
+
+    def timeout_ms(self, route_name: Optional[str]) -> float:
+        """Statement deadline of a route (by endpoint function name)"""
+        return self.settings.STATEMENT_TIMEOUTS.get(route_name, self.settings.STATEMENT_TIMEOUT_MS)
+
+    def install(self, engine: Engine) -> None:
+        """Enforce deadlines on the connections of an engine"""
+        event.listen(engine, "handle_error", self._handle_error)
+        event.listen(engine.pool, "checkin", self._checkin)
+
+    def install_session(self, session_class: Any) -> None:
+        """Attach deadlines of the sessions of a sessionmaker/Session class"""
+        event.listen(session_class, "after_begin", self._after_begin)
+
+    def _after_begin(self, session: Session, transaction, connection) -> None:
+        deadline: Optional[QueryDeadline] = session.info.get(CONNECTION_KEY)
+        if deadline is None:
+            return
+        dbapi_connection = connection.connection.dbapi_connection
+        connection.info[CONNECTION_KEY] = deadline
+        deadline.attach(dbapi_connection)
+        if connection.dialect.name == "sqlite":
+            dbapi_connection.set_progress_handler(deadline.tripped, SQLITE_PROGRESS_STEPS)
+        elif connection.dialect.name == "postgresql":
+            remaining = deadline.remaining_ms()
+            if remaining is not None:
+                connection.exec_driver_sql(f"SET LOCAL statement_timeout = {max(1, int(remaining))}")
+
+    def _checkin(self, dbapi_connection, connection_record) -> None:
+        deadline = connection_record.info.pop(CONNECTION_KEY, None)
+        if deadline is None or dbapi_connection is None:
+            return
+        deadline.detach(dbapi_connection)
+        if hasattr(dbapi_connection, "set_progress_handler"):
+            dbapi_connection.set_progress_handler(None, 0)
+
+    def _handle_error(self, context) -> Optional[Exception]:
+        connection = context.connection
+        deadline = connection.info.get(CONNECTION_KEY) if connection is not None else None
+        if deadline is None or not deadline.tripped():
+            return None
+        reason = deadline.reason()
+        self.interrupted[reason] += 1
+        return QueryInterrupted(deadline, reason)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "default_timeout_ms": self.settings.STATEMENT_TIMEOUT_MS,
+            "route_timeouts_ms": self.settings.STATEMENT_TIMEOUTS,
+            "cancel_on_disconnect": self.settings.QUERY_CANCEL_ON_DISCONNECT,
+            "interrupted": dict(self.interrupted),
+        }
+
+
+query_deadlines = QueryDeadlines(settings)
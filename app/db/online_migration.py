@@ -0,0 +1,196 @@
+"""
+Online, chunked backfills for Alembic migrations
+
+Large data changes (filling a new column, rendering a read model, ...)
+are run in primary-key ordered batches, each in its own short transaction,
+instead of one long transaction that locks the table (or the whole SQLite
+file) for minutes. Progress is checkpointed, so an interrupted migration
+resumes where it stopped, and the batch size adapts to the observed
+latency so foreground traffic keeps getting its share of the database.
+
+Usage in a migration script:
+
+    from app.db.online_migration import backfill, reset_checkpoint
+
+    def upgrade():
+        op.add_column('books', sa.Column('title_lower', sa.String(255)))
+
+        def chunk(connection, lo, hi):
+            connection.execute(
+                sa.text('UPDATE books SET title_lower = lower(title) WHERE id > :lo AND id <= :hi'),
+                {'lo': lo, 'hi': hi},
+            )
+
+        backfill('books_title_lower', 'books', chunk)
+
+    def downgrade():
+        reset_checkpoint('books_title_lower')
+        op.drop_column('books', 'title_lower')
+"""
+import logging
+import time
+from typing import Callable, Optional, Tuple
+
+import sqlalchemy as sa
+from sqlalchemy.engine import Connection, Engine
+
+from app.models.migration_checkpoint import MigrationCheckpoint
+
+
+# Child of the "alembic" logger, so progress shows up in `alembic upgrade`
+logger = logging.getLogger("alembic.backfill")
+
+checkpoints = MigrationCheckpoint.__table__
+
+# chunk(connection, lo, hi) processes the rows with lo < pk <= hi inside the
+# transaction of the connection
+ChunkFunction = Callable[[Connection, int, int], None]
+
+
+class Backfill:
+    """
+    A resumable, throttled batch job over one table
+
+    Args:
+        name: Checkpoint name, unique per backfill
+        table: Table to walk
+        chunk: Function processing one key range
+        pk: Integer primary key column to order by
+        batch_size: Initial rows per chunk
+        min_batch_size / max_batch_size: Bounds of the adaptive batch size
+        target_seconds: Desired duration of one chunk; batches shrink when
+            chunks are slower and grow when they are much faster
+        pause_ratio: Sleep this fraction of each chunk's duration between
+            chunks (1.0 = the backfill uses at most half the wall time)
+        progress_seconds: Minimum interval between progress log lines
+    """
+
+    def __init__(
+        self,
+        name: str,
+        table: str,
+        chunk: ChunkFunction,
+        pk: str = "id",
+        batch_size: int = 1000,
+        min_batch_size: int = 100,
+        max_batch_size: int = 20000,
+        target_seconds: float = 0.2,
+        pause_ratio: float = 1.0,
+        progress_seconds: float = 5.0,
+    ):
+        self.name = name
+        self.table = table
+        self.chunk = chunk
+        self._table = sa.table(table, sa.column(pk))
+        self.pk = self._table.c[pk]
+        self.batch_size = batch_size
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.target_seconds = target_seconds
+        self.pause_ratio = pause_ratio
+        self.progress_seconds = progress_seconds
+
+    def _load_checkpoint(self, engine: Engine):
+        with engine.begin() as connection:
+            row = connection.execute(
+                sa.select(checkpoints).where(checkpoints.c.name == self.name)
+            ).first()
+            if row is None:
+                connection.execute(sa.insert(checkpoints).values(
+                    name=self.name, last_key=0, rows_done=0, completed=False
+                ))
+                return 0, 0, False
+            return row.last_key, row.rows_done, row.completed
+
+    def _save_checkpoint(self, connection: Connection, last_key: int, rows_done: int, completed: bool = False) -> None:
+        connection.execute(
+            sa.update(checkpoints)
+            .where(checkpoints.c.name == self.name)
+            .values(last_key=last_key, rows_done=rows_done, completed=completed, updated_at=sa.func.now())
+        )
+
+    def _next_chunk(self, connection: Connection, lo: int) -> Tuple[Optional[int], int]:
+        """Upper bound and row count of the next chunk (at most batch_size keys after lo)"""
+        keys = sa.select(self.pk).where(self.pk > lo).order_by(self.pk).limit(self.batch_size).subquery()
+        return tuple(connection.execute(sa.select(sa.func.max(keys.c[self.pk.name]), sa.func.count())).one())
+
+    def _remaining(self, connection: Connection, lo: int) -> int:
+        return connection.execute(sa.select(sa.func.count()).select_from(self._table).where(self.pk > lo)).scalar()
+
+    def _adapt(self, seconds: float) -> None:
+        """Resize the next batch from the duration of the last chunk"""
+        if seconds > self.target_seconds:
+            self.batch_size = max(self.min_batch_size, int(self.batch_size / 2))
+        elif seconds < self.target_seconds / 2:
+            self.batch_size = min(self.max_batch_size, int(self.batch_size * 1.5))
+
+    def run(self, engine: Engine) -> int:
+        """
+        Run (or resume) the backfill to completion
+
+        Each chunk and its checkpoint are committed together, so a crash
+        never skips or repeats a committed chunk.
+
+        Returns:
+            Number of rows walked in total (including earlier runs)
+        """
+        lo, rows_done, completed = self._load_checkpoint(engine)
+        if completed:
+            logger.info("Backfill %s already completed (%d rows)", self.name, rows_done)
+            return rows_done
+
+        with engine.connect() as connection:
+            total = rows_done + self._remaining(connection, lo)
+        if lo:
+            logger.info("Backfill %s resuming after %s=%d (%d/%d rows)", self.name, self.pk.name, lo, rows_done, total)
+
+        started = time.monotonic()
+        logged_at = started
+        resumed_rows = rows_done
+        while True:
+            chunk_started = time.monotonic()
+            with engine.begin() as connection:
+                hi, rows = self._next_chunk(connection, lo)
+                if hi is None:
+                    self._save_checkpoint(connection, lo, rows_done, completed=True)
+                    break
+                self.chunk(connection, lo, hi)
+                rows_done += rows
+                self._save_checkpoint(connection, hi, rows_done)
+            lo = hi
+
+            seconds = time.monotonic() - chunk_started
+            self._adapt(seconds)
+            now = time.monotonic()
+            if now - logged_at >= self.progress_seconds:
+                rate = (rows_done - resumed_rows) / max(now - started, 1e-9)
+                logger.info(
+                    "Backfill %s: %d/%d rows (%.0f rows/s, batch %d)",
+                    self.name, rows_done, total, rate, self.batch_size,
+                )
+                logged_at = now
+            time.sleep(seconds * self.pause_ratio)
+
+        logger.info("Backfill %s done: %d rows in %.1fs", self.name, rows_done, time.monotonic() - started)
+        return rows_done
+
+
+def backfill(name: str, table: str, chunk: ChunkFunction, **options) -> int:
+    """
+    Run a Backfill from inside a migration script
+
+    Alembic runs migrations in one transaction; that transaction is
+    committed first (the DDL before this call becomes permanent) and the
+    chunks then run on their own connections.
+    """
+    from alembic import op
+
+    with op.get_context().autocommit_block():
+        return Backfill(name, table, chunk, **options).run(op.get_bind().engine)
+
+
+def reset_checkpoint(name: str) -> None:
+    """Forget a backfill's progress (call from the migration's downgrade)"""
+    from alembic import op
+
+    op.execute(sa.delete(checkpoints).where(checkpoints.c.name == name))
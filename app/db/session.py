@@ -1,10 +1,153 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from app.core.config import settings
+import itertools
+import threading
+from typing import List, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.config import Settings, settings
+from app.core.slow_query import slow_query_log
+from app.db.deadline import query_deadlines
+from app.db.statement_cache import statement_cache_stats
 
-engine = create_engine(
-    settings.SQLALCHEMY_DATABASE_URL, 
-    connect_args={"check_same_thread": False} if settings.SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {}
-)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
\ No newline at end of file
+def _create_engine(
+    url: str,
+    engine_settings: Settings = settings,
+    pool_size: Optional[int] = None,
+    max_overflow: Optional[int] = None,
+) -> Engine:
+    created = create_engine(
+        url,
+        pool_size=engine_settings.DB_POOL_SIZE if pool_size is None else pool_size,
+        max_overflow=engine_settings.DB_MAX_OVERFLOW if max_overflow is None else max_overflow,
+        connect_args={"check_same_thread": False} if url.startswith("sqlite") else {}
+    )
+    if url.startswith("sqlite") and engine_settings.SQLITE_JOURNAL_MODE:
+        journal_mode = engine_settings.SQLITE_JOURNAL_MODE
+
+        @event.listens_for(created, "connect")
+        def set_journal_mode(dbapi_connection, connection_record) -> None:
+            cursor = dbapi_connection.cursor()
+            cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+            cursor.close()
+    if engine_settings.SLOW_QUERY_LOG_ENABLED:
+        slow_query_log.install(created)
+    query_deadlines.install(created)
+    statement_cache_stats.install(created)
+    return created
+
+
+class ReplicaSelector:
+    """Pick a replica engine by round-robin or by fewest checked-out connections"""
+
+    def __init__(self, engines: List[Engine], strategy: str):
+        self.engines = engines
+        self.strategy = strategy
+        self._cycle = itertools.cycle(engines)
+        self._lock = threading.Lock()
+
+    def choose(self) -> Engine:
+        if self.strategy == "least_connections":
+            return min(self.engines, key=lambda e: getattr(e.pool, "checkedout", lambda: 0)())
+        with self._lock:
+            return next(self._cycle)
+
+
+class Engines:
+    """
+    The primary and replica engines, created on first use
+
+    Importing the app does not create (or connect) anything, so tooling and
+    the app factory can pick the settings first with `configure`.
+    """
+
+    def __init__(self, engine_settings: Settings):
+        self._settings = engine_settings
+        self._primary: Optional[Engine] = None
+        self._replicas: Optional[List[Engine]] = None
+        self._selector: Optional[ReplicaSelector] = None
+        self._lock = threading.Lock()
+
+    @property
+    def settings(self) -> Settings:
+        """Settings the engines are created from"""
+        return self._settings
+
+    def configure(self, engine_settings: Settings) -> None:
+        """Use other settings for the engines (disposes the existing ones)"""
+        with self._lock:
+            self._dispose()
+            self._settings = engine_settings
+
+    def _create(self) -> None:
+        with self._lock:
+            if self._primary is None:
+                self._replicas = [_create_engine(url, self._settings) for url in self._settings.SQLALCHEMY_REPLICA_URLS]
+                self._selector = ReplicaSelector(self._replicas, self._settings.REPLICA_SELECTION)
+                self._primary = _create_engine(self._settings.SQLALCHEMY_DATABASE_URL, self._settings)
+
+    @property
+    def primary(self) -> Engine:
+        if self._primary is None:
+            self._create()
+        return self._primary
+
+    @property
+    def replicas(self) -> List[Engine]:
+        if self._primary is None:
+            self._create()
+        return self._replicas
+
+    @property
+    def selector(self) -> ReplicaSelector:
+        if self._primary is None:
+            self._create()
+        return self._selector
+
+    def _dispose(self) -> None:
+        for created in [self._primary] + (self._replicas or []):
+            if created is not None:
+                created.dispose()
+        self._primary = self._replicas = self._selector = None
+
+    def dispose(self) -> None:
+        """Close every pooled connection (engines are recreated on next use)"""
+        with self._lock:
+            self._dispose()
+
+
+engines = Engines(settings)
+
+
+def __getattr__(name: str):
+    # `engine`, `replica_engines` and `replica_selector` used to be created
+    # at import; keep them importable
+    if name == "engine":
+        return engines.primary
+    if name == "replica_engines":
+        return engines.replicas
+    if name == "replica_selector":
+        return engines.selector
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class RoutingSession(Session):
+    """
+    Session that routes to the primary or to a read replica
+
+    Sessions created with `info={"read_only": True}` read from one replica
+    (chosen once per session so its reads are consistent); everything else,
+    and any flush, goes to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get("read_only") and engines.replicas and not self._flushing:
+            if "replica" not in self.info:
+                self.info["replica"] = engines.selector.choose()
+            return self.info["replica"]
+        return engines.primary
+
+
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
+query_deadlines.install_session(SessionLocal)
+slow_query_log.install_session(SessionLocal)
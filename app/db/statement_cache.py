@@ -0,0 +1,70 @@
+import threading
+import weakref
+from collections import Counter
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.slow_query import fingerprint
+
+
+# Statements kept in the "not cached" report
+MAX_UNCACHED = 20
+
+
+class StatementCacheStats:
+    """
+    Hit/miss counters of SQLAlchemy's compiled statement cache
+
+    Every executed statement reports whether its compiled form came from
+    the engine's cache (hit), was compiled and cached (miss), or could not
+    be cached at all (no cache key / caching disabled). After warm-up the
+    misses should stop growing; statements that can never be cached are
+    listed by fingerprint so they can be fixed.
+    """
+
+    def __init__(self):
+        self._engines: "weakref.WeakSet[Engine]" = weakref.WeakSet()
+        self._counts: Counter = Counter()
+        self._uncached: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def install(self, engine: Engine) -> None:
+        """Count the statements executed by an engine"""
+        self._engines.add(engine)
+        event.listen(engine, "after_cursor_execute", self._after)
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        # Textual SQL (exec_driver_sql) and DDL are never cached
+        if context is None or context.compiled is None or context.isddl:
+            return
+        outcome = getattr(context.cache_hit, "name", str(context.cache_hit)).lower()
+        with self._lock:
+            self._counts[outcome] += 1
+            if outcome in ("no_cache_key", "caching_disabled"):
+                key = fingerprint(statement)
+                if key in self._uncached or len(self._uncached) < MAX_UNCACHED:
+                    self._uncached[key] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+            uncached = dict(self._uncached.most_common())
+        hits = counts.get("cache_hit", 0)
+        cacheable = hits + counts.get("cache_miss", 0)
+        return {
+            "executions": counts,
+            "hit_ratio": round(hits / cacheable, 4) if cacheable else 0.0,
+            "cache_entries": [len(engine._compiled_cache or ()) for engine in list(self._engines)],
+            "cache_capacity": [getattr(engine._compiled_cache, "capacity", 0) for engine in list(self._engines)],
+            "uncached_statements": uncached,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+            self._uncached.clear()
+
+
+statement_cache_stats = StatementCacheStats()
@@ -0,0 +1,222 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.db.session import _create_engine, engines
+
+
+logger = logging.getLogger(__name__)
+
+# fn(db) -> result, run on the writer session in coordinator mode
+WriteFunction = Callable[[Session], Any]
+
+
+class WriterSession(Session):
+    """
+    Session of the single writer thread
+
+    While a batch is running, `commit()` (called by the repositories) only
+    flushes: the coordinator commits the whole batch once at the end.
+    """
+
+    def commit(self) -> None:
+        if self.info.get("in_batch"):
+            self.flush()
+        else:
+            super().commit()
+
+
+def create_writer_engine() -> Engine:
+    """
+    Engine with the one connection used by the writer thread
+
+    On SQLite the pysqlite driver's own transaction handling is turned off
+    (it breaks SAVEPOINT) and transactions start with BEGIN IMMEDIATE, so
+    the write lock is taken up front instead of failing on upgrade.
+    """
+    writer = _create_engine(engines.settings.SQLALCHEMY_DATABASE_URL, engines.settings, pool_size=1, max_overflow=0)
+    if writer.dialect.name == "sqlite":
+        @event.listens_for(writer, "connect")
+        def disable_pysqlite_transactions(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(writer, "begin")
+        def begin_immediate(connection):
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+    return writer
+
+
+class _Write:
+    """A queued write and the callbacks to run once it is committed"""
+
+    __slots__ = ("fn", "future", "after_commit")
+
+    def __init__(self, fn: WriteFunction):
+        self.fn = fn
+        self.future: Future = Future()
+        self.after_commit: List[Callable[[], Any]] = []
+
+
+class WriteCoordinator:
+    """
+    Optional single-writer mode with group commit
+
+    When `WRITE_COORDINATOR_ENABLED` is set, services hand their mutations
+    to `run`; one writer thread drains the queue, runs each queued write in
+    its own SAVEPOINT of a shared transaction and commits the whole group
+    once. A failing write only rolls back its savepoint and gets its own
+    error; if the final commit fails every write of the group gets that
+    error. Writers never race for the database lock, and the commit (fsync)
+    cost is shared by everything queued while the previous group committed.
+
+    Work that must only happen once the data is durable (index updates,
+    events) is registered with `after_commit` and runs after the group
+    commit, in order.
+
+    Results are returned across threads: writes must return plain data or
+    fully loaded objects, since the writer session drops its objects after
+    every group.
+    """
+
+    def __init__(self):
+        self._queue: "queue.Queue[_Write]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._session: Optional[WriterSession] = None
+        self._current: Optional[_Write] = None
+        self.failed_commit_listeners: List[Callable[[], None]] = []
+        self.groups = 0
+        self.writes = 0
+        self.max_group = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.WRITE_COORDINATOR_ENABLED
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                factory = sessionmaker(class_=WriterSession, bind=create_writer_engine(), autoflush=False, expire_on_commit=False)
+                self._session = factory()
+                self._thread = threading.Thread(target=self._work, name="db-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, fn: WriteFunction) -> Future:
+        """Queue a write; the future resolves once its group is committed"""
+        self._ensure_started()
+        write = _Write(fn)
+        self._queue.put(write)
+        return write.future
+
+    def run(self, db: Session, fn: WriteFunction) -> Any:
+        """
+        Run a write function
+
+        Without the coordinator it runs right away on the caller's session
+        (the repositories commit as usual); with it, it runs on the writer
+        thread and this call blocks until the group is committed.
+        """
+        if not self.enabled:
+            return fn(db)
+        return self.submit(fn).result()
+
+    async def run_async(self, db: Session, fn: WriteFunction) -> Any:
+        """`run` for coroutines: waits without blocking the event loop"""
+        if not self.enabled:
+            return fn(db)
+        return await asyncio.wrap_future(self.submit(fn))
+
+    def after_commit(self, db: Session, fn: Callable[..., Any], *args: Any) -> None:
+        """
+        Call fn(*args) once the current write is committed
+
+        Without the coordinator the repositories have already committed,
+        so it is called right away.
+        """
+        if db is self._session and self._current is not None:
+            self._current.after_commit.append(lambda: fn(*args))
+        else:
+            fn(*args)
+
+    def _collect(self) -> List[_Write]:
+        """Wait for one write, then take everything queued behind it"""
+        group = [self._queue.get()]
+        deadline = time.monotonic() + settings.WRITE_GROUP_WAIT_MS / 1000
+        while len(group) < settings.WRITE_GROUP_MAX:
+            try:
+                timeout = deadline - time.monotonic()
+                group.append(self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return group
+
+    def _work(self) -> None:
+        while True:
+            group = self._collect()
+            try:
+                self._run_group(group)
+            except Exception:
+                logger.exception("Write group failed")
+
+    def _run_group(self, group: List[_Write]) -> None:
+        db = self._session
+        done: List[tuple] = []
+        db.info["in_batch"] = True
+        try:
+            for write in group:
+                self._current = write
+                try:
+                    with db.begin_nested():
+                        result = write.fn(db)
+                    done.append((write, result))
+                except BaseException as e:
+                    write.future.set_exception(e)
+                finally:
+                    self._current = None
+            db.info["in_batch"] = False
+            db.commit()
+        except BaseException as e:
+            db.info["in_batch"] = False
+            db.rollback()
+            for listener in self.failed_commit_listeners:
+                listener()
+            for write, _ in done:
+                write.future.set_exception(e)
+            return
+        finally:
+            db.expunge_all()
+
+        self.groups += 1
+        self.writes += len(group)
+        self.max_group = max(self.max_group, len(group))
+        for write, result in done:
+            for callback in write.after_commit:
+                try:
+                    callback()
+                except Exception:
+                    logger.exception("after_commit callback failed")
+            write.future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "queued": self._queue.qsize(),
+            "groups": self.groups,
+            "writes": self.writes,
+            "avg_group": round(self.writes / self.groups, 2) if self.groups else 0.0,
+            "max_group": self.max_group,
+        }
+
+
+write_coordinator = WriteCoordinator()
@@ -1,21 +1,110 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
-from app.api.endpoints import authors, categories, books
+from app import IMPORT_STARTED
+from app.api.endpoints import authors, categories, books, suggest, changes, stream, jobs, admin
+from app.api.middleware.admission import AdmissionControlMiddleware
+from app.api.middleware.compression import CompressionMiddleware
+from app.api.middleware.idempotency import IdempotencyMiddleware
+from app.api.middleware.query_deadline import QueryDeadlineMiddleware
+from app.api.middleware.read_your_writes import ReadYourWritesMiddleware
+from app.core.config import Settings, settings
+from app.core.memory_profiler import memory_profiler
+from app.core.utils import STATIC_DIR
+from app.db.deadline import query_deadlines
+from app.db.session import engines
+from app.services.job_service import job_service
+from app.warmup import warm_up
 
-app = FastAPI(
-    title="Book Management API",
-    description="An API for managing a collection of books.",
-    version="1.0.0"
-)
 
-# Include routes
-app.include_router(authors.router, prefix="/api/v1/authors", tags=["Authors"])
-app.include_router(categories.router, prefix="/api/v1/categories", tags=["Categories"])
-app.include_router(books.router, prefix="/api/v1/books", tags=["Books"])
+def create_app(app_settings: Optional[Settings] = None) -> FastAPI:
+    """
+    Build the application
 
-# Mount static files for serving cover images
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+    Args:
+        app_settings: Settings to build the app with (the shared `settings`
+            by default). The database engines (URLs, pools, journal mode,
+            slow query log, statement deadlines), the middlewares, the
+            warm-up, the job workers
+            and the memory watcher are configured from them; engines are
+            only created, and connected, by the lifespan warm-up or the
+            first request, not at import. The services, caches and indexes
+            are module singletons and keep reading the shared `settings`,
+            so settings of those (e.g. FUZZY_*, SUGGEST_*, BACKUP_*) only
+            come from the environment.
+    """
+    app_settings = app_settings or settings
+    if app_settings is not settings:
+        engines.configure(app_settings)
+        query_deadlines.configure(app_settings)
+    created_at = time.perf_counter()
 
-@app.get("/")
-def read_root():
-    return {"message": "Welcome to the Book Management API!"}
\ No newline at end of file
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        if app_settings.WARMUP_ENABLED:
+            app.state.startup["warmup_ms"] = await asyncio.to_thread(warm_up, app_settings)
+        # Background job workers run alongside the web worker
+        job_service.start(app_settings.JOB_WORKERS)
+        if app_settings.MEMORY_PROFILING_ENABLED:
+            memory_profiler.start_watcher()
+        app.state.startup["startup_ms"] = round((time.perf_counter() - IMPORT_STARTED) * 1000, 1)
+        yield
+        memory_profiler.stop_watcher()
+        job_service.stop()
+        engines.dispose()
+
+    app = FastAPI(
+        title="Book Management API",
+        description="An API for managing a collection of books.",
+        version="1.0.0",
+        lifespan=lifespan
+    )
+    app.state.settings = app_settings
+    app.state.startup = {"import_ms": round((created_at - IMPORT_STARTED) * 1000, 1)}
+
+    # Statement deadlines, and cancellation of abandoned reads (innermost, so
+    # requests rejected or served from cache never start one)
+    app.add_middleware(QueryDeadlineMiddleware, app_settings=app_settings)
+
+    # Keep clients on the primary right after they write
+    if app_settings.SQLALCHEMY_REPLICA_URLS:
+        app.add_middleware(ReadYourWritesMiddleware, app_settings=app_settings)
+
+    # Fast 503 instead of queueing when the database slows down
+    if app_settings.ADMISSION_CONTROL_ENABLED:
+        app.add_middleware(AdmissionControlMiddleware, app_settings=app_settings)
+
+    # Retries of POST/PUT/PATCH with an Idempotency-Key get the stored
+    # response (outside admission control, so replays are never shed)
+    if app_settings.IDEMPOTENCY_ENABLED:
+        app.add_middleware(IdempotencyMiddleware, app_settings=app_settings)
+
+    # Compression and cached precompressed GET pages (outermost, so cache hits
+    # skip admission control and the database; only the version stamps are
+    # re-read, at most every RESPONSE_CACHE_CHECK_INTERVAL)
+    app.add_middleware(CompressionMiddleware, app_settings=app_settings)
+
+    # Include routes
+    app.include_router(authors.router, prefix="/api/v1/authors", tags=["Authors"])
+    app.include_router(categories.router, prefix="/api/v1/categories", tags=["Categories"])
+    app.include_router(books.router, prefix="/api/v1/books", tags=["Books"])
+    app.include_router(suggest.router, prefix="/api/v1/suggest", tags=["Suggest"])
+    app.include_router(changes.router, prefix="/api/v1/changes", tags=["Changes"])
+    app.include_router(stream.router, prefix="/api/v1/stream", tags=["Stream"])
+    app.include_router(jobs.router, prefix="/api/v1/jobs", tags=["Jobs"])
+    app.include_router(admin.router, prefix="/api/v1/admin", tags=["Admin"])
+
+    # Mount static files for serving cover images
+    app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
+
+    @app.get("/")
+    def read_root():
+        return {"message": "Welcome to the Book Management API!"}
+
+    return app
+
+
+app = create_app()
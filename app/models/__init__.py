@@ -1,3 +1,9 @@
 from app.models.author import Author
 from app.models.book import Book
-from app.models.category import Category
\ No newline at end of file
+from app.models.category import Category
+from app.models.cache_version import CacheVersion
+from app.models.change_log import ChangeLog
+from app.models.job import Job
+from app.models.book_view import BookView
+from app.models.migration_checkpoint import MigrationCheckpoint
+from app.models.idempotency_key import IdempotencyKey
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -10,16 +10,22 @@ class Book(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False, index=True)
     description = Column(Text, nullable=True)
-    published_year = Column(Integer, nullable=False)
+    published_year = Column(Integer, nullable=False, index=True)
 
     author_id = Column(Integer, ForeignKey("authors.id", ondelete="RESTRICT"), nullable=False)
     category_id = Column(Integer, ForeignKey("categories.id", ondelete="RESTRICT"), nullable=False)
  
-    cover_image = Column(String(255), nullable=True) # save path, example: static/covers/book1.jpg
+    cover_image = Column(String(255), nullable=True, index=True) # save path, example: static/covers/book1.jpg
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False, index=True)
 
     # Relationships with Author and Category
     author = relationship("Author", back_populates="books")
-    category = relationship("Category", back_populates="books")
\ No newline at end of file
+    category = relationship("Category", back_populates="books")
+
+    # Filter by author/category and list newest first (also index the FKs)
+    __table_args__ = (
+        Index("ix_books_author_id_created_at", "author_id", "created_at"),
+        Index("ix_books_category_id_created_at", "category_id", "created_at"),
+    )
\ No newline at end of file
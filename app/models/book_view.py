@@ -0,0 +1,36 @@
+from sqlalchemy import Boolean, Column, Integer, String, Text, DateTime, Index, false
+
+from app.db.base import Base
+
+# Denormalized read model: one row per book with author and category inlined
+# and the response JSON pre-rendered. Maintained in the same transaction as
+# the writes to books/authors/categories, rebuilt with
+# `python -m app.cli rebuild-book-view`.
+class BookView(Base):
+    __tablename__ = "book_view"
+
+    id = Column(Integer, primary_key=True)  # same as books.id
+    title = Column(String(255), nullable=False, index=True)
+    published_year = Column(Integer, nullable=False, index=True)
+    cover_image = Column(String(255), nullable=True)
+    # cover_image IS NOT NULL, as an equality the has_cover filter can search
+    has_cover = Column(Boolean, nullable=False, default=False, server_default=false())
+
+    author_id = Column(Integer, nullable=False)
+    author_name = Column(String(255), nullable=False)
+    category_id = Column(Integer, nullable=False)
+    category_name = Column(String(255), nullable=False)
+
+    created_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    updated_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    payload = Column(Text, nullable=False)  # JSON of the Book response schema
+
+    # Every filter column is followed by created_at, so the default listing
+    # (newest first) of a filtered page is read in index order
+    __table_args__ = (
+        Index("ix_book_view_author_id_created_at", "author_id", "created_at"),
+        Index("ix_book_view_category_id_created_at", "category_id", "created_at"),
+        Index("ix_book_view_published_year_created_at", "published_year", "created_at"),
+        Index("ix_book_view_has_cover_created_at", "has_cover", "created_at"),
+    )
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, String
+
+from app.db.base import Base
+
+class CacheVersion(Base):
+    __tablename__ = "cache_versions"
+
+    # Name of the cached table (e.g. "authors", "categories")
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+class ChangeLog(Base):
+    __tablename__ = "change_log"
+    # Feed filtered by entity (?entity=books), in sequence order; AUTOINCREMENT
+    # on SQLite so sequence numbers are never reused
+    __table_args__ = (
+        Index("ix_change_log_entity_seq", "entity", "seq"),
+        {"sqlite_autoincrement": True},
+    )
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    entity = Column(String(50), nullable=False)  # table name, e.g. "books"
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String(10), nullable=False)  # "upsert" or "delete"
+    data = Column(JSON, nullable=True)  # row values for upserts, null for tombstones
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, LargeBinary, Index
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String(255), nullable=False, unique=True)  # Idempotency-Key header sent by the client
+    fingerprint = Column(String(64), nullable=False)  # sha256 of method, path, query and body
+    status = Column(String(20), nullable=False, default="processing")  # processing, completed
+    locked_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)  # when the request holding it started
+
+    response_status = Column(Integer, nullable=True)
+    response_headers = Column(JSON, nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    # Expired keys are purged in bulk
+    __table_args__ = (
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
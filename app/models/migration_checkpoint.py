@@ -0,0 +1,14 @@
+from sqlalchemy import Boolean, Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+class MigrationCheckpoint(Base):
+    __tablename__ = "migration_checkpoints"
+
+    # Progress of an online backfill (see app/db/online_migration.py)
+    name = Column(String(100), primary_key=True)
+    last_key = Column(Integer, nullable=False, default=0)  # primary key of the last processed row
+    rows_done = Column(Integer, nullable=False, default=0)
+    completed = Column(Boolean, nullable=False, default=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -1,8 +1,10 @@
 from typing import Optional
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.repositories.base import BaseRepository
 from app.models.author import Author
+from app.repositories.book_view_repository import book_view_repository
 
 
 class AuthorRepository(BaseRepository[Author]):
@@ -11,13 +13,29 @@ class AuthorRepository(BaseRepository[Author]):
     def __init__(self):
         super().__init__(Author)
     
+    def after_write(self, db: Session, db_obj: Author) -> None:
+        super().after_write(db, db_obj)
+        # Books embed their author: re-render them in the same transaction
+        book_view_repository.refresh_author(db, db_obj.id)
+    
     def get_by_name(self, db: Session, name: str) -> Optional[Author]:
-        """Get author by name"""
+        """Get author by name (from the database: the write path checks names with it)"""
         return db.query(Author).filter(Author.name == name).first()
     
     def search_by_name(self, db: Session, keyword: str, skip: int = 0, limit: int = 100):
         """Search authors by name keyword"""
         return db.query(Author).filter(Author.name.ilike(f"%{keyword}%")).offset(skip).limit(limit).all()
+    
+    def fuzzy_search_by_name(self, db: Session, keyword: str, skip: int = 0, limit: int = 100):
+        """Search authors by name trigram similarity (Postgres pg_trgm only)"""
+        return (
+            db.query(Author)
+            .filter(Author.name.op("%")(keyword))
+            .order_by(func.similarity(Author.name, keyword).desc(), Author.id)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
 
 
 author_repository = AuthorRepository()
@@ -1,8 +1,9 @@
-from typing import Generic, TypeVar, Type, Optional, List, Any, Dict, Callable
+from typing import Generic, TypeVar, Type, Optional, List, Any, Dict, Callable, Tuple, Union
 from sqlalchemy.orm import Session, Query
-from sqlalchemy import desc, asc
+from sqlalchemy import Row, Select, asc, bindparam, desc, func, select
 
 from app.db.base import Base
+from app.repositories.change_log_repository import change_log_repository
 
 ModelType = TypeVar("ModelType", bound=Base)
 
@@ -16,18 +17,89 @@ class BaseRepository(Generic[ModelType]):
     - Multiple sorting options
     - Pagination
     - Custom query modifications
+    
+    Writes are recorded in the change log (same transaction) unless the
+    subclass sets `track_changes = False`; subclasses can stage more work
+    in the same transaction by extending `after_write`/`after_delete`.
     """
     
+    track_changes = True
+    
     def __init__(self, model: Type[ModelType]):
         self.model = model
+        self._templates: Dict[tuple, Select] = {}
     
     def get_query(self, db: Session) -> Query:
-        """Get base query for the model"""
+        """Get a legacy Query for the model (the generic reads use select() templates)"""
         return db.query(self.model)
     
     def get_by_id(self, db: Session, id: int) -> Optional[ModelType]:
         """Get a record by ID"""
-        return self.get_query(db).filter(self.model.id == id).first()
+        return db.scalars(self._template("one", ("id",)), {"filter_id": id}).first()
+    
+    def get_by_ids(self, db: Session, ids: List[int]) -> List[ModelType]:
+        """Get records by IDs, in the order of the given IDs (missing IDs are skipped)"""
+        if not ids:
+            return []
+        records = {record.id: record for record in db.scalars(self._template("ids", ()), {"ids": ids})}
+        return [records[id] for id in ids if id in records]
+    
+    def _filter_fields(self, filters: Optional[Dict[str, Any]]) -> Tuple[Tuple[str, ...], Dict[str, Any]]:
+        """Filtered fields (known to the model, value not None) and their bind parameters"""
+        if not filters:
+            return (), {}
+        fields = tuple(field for field, value in filters.items() if value is not None and hasattr(self.model, field))
+        return fields, {f"filter_{field}": filters[field] for field in fields}
+    
+    def _template(
+        self,
+        kind: str,
+        fields: Tuple[str, ...],
+        order_by: Tuple[Tuple[str, str], ...] = (),
+        columns: Tuple[str, ...] = (),
+    ) -> Select:
+        """
+        Statement template for a query shape, built once per repository
+        
+        Values are bind parameters (filter_<field>, skip, limit, ids), so
+        every call with the same shape reuses one statement object and hits
+        SQLAlchemy's compiled cache instead of rebuilding the statement.
+        
+        Kinds: "page" (offset/limit), "one" (limit 1), "count", "ids"
+        (id IN :ids), "where" (filters only, for query modifiers) and
+        "rows" (offset/limit over the table's columns, or only `columns`,
+        as a Core statement: see `get_rows`).
+        """
+        key = (kind, fields, order_by, columns)
+        statement = self._templates.get(key)
+        if statement is not None:
+            return statement
+        
+        if kind == "rows":
+            # Table columns, not mapped attributes: the statement stays Core
+            source = self.model.__table__.c
+            statement = select(*(source[name] for name in columns)) if columns else select(self.model.__table__)
+        else:
+            source = self.model
+            if kind == "count":
+                statement = select(func.count()).select_from(self.model)
+            else:
+                statement = select(self.model)
+        for field in fields:
+            statement = statement.where(getattr(source, field) == bindparam(f"filter_{field}"))
+        if kind == "ids":
+            statement = statement.where(self.model.id.in_(bindparam("ids", expanding=True)))
+        for field_name, direction in order_by:
+            if hasattr(source, field_name):
+                field = getattr(source, field_name)
+                statement = statement.order_by(desc(field) if direction == "desc" else asc(field))
+        if kind in ("page", "rows"):
+            statement = statement.offset(bindparam("skip")).limit(bindparam("limit"))
+        elif kind == "one":
+            statement = statement.limit(1)
+        
+        self._templates[key] = statement
+        return statement
     
     def get_all(
         self, 
@@ -36,7 +108,7 @@ class BaseRepository(Generic[ModelType]):
         limit: int = 100,
         filters: Optional[Dict[str, Any]] = None,
         order_by: Optional[List[tuple]] = None,
-        query_modifier: Optional[Callable[[Query], Query]] = None
+        query_modifier: Optional[Callable[[Select], Select]] = None
     ) -> List[ModelType]:
         """
         Get all records with flexible filtering and pagination
@@ -48,7 +120,8 @@ class BaseRepository(Generic[ModelType]):
             filters: Dict of field-value pairs for filtering (e.g., {'author_id': 1})
             order_by: List of tuples (field_name, direction) for sorting 
                      e.g., [('created_at', 'desc'), ('title', 'asc')]
-            query_modifier: Optional function to further modify the query
+            query_modifier: Optional function to further modify the select()
+                     statement (e.g. add where clauses)
         
         Returns:
             List of model instances
@@ -64,40 +137,62 @@ class BaseRepository(Generic[ModelType]):
             books = repo.get_all(db, order_by=[('created_at', 'desc'), ('title', 'asc')])
             
             # With custom query modifier
-            def add_joins(query):
-                return query.join(Author).filter(Author.name.like('%John%'))
+            def add_joins(statement):
+                return statement.join(Author).where(Author.name.like('%John%'))
             books = repo.get_all(db, query_modifier=add_joins)
         """
-        query = self.get_query(db)
-        
-        # Apply filters
-        if filters:
-            for field, value in filters.items():
-                if hasattr(self.model, field) and value is not None:
-                    query = query.filter(getattr(self.model, field) == value)
-        
-        # Apply custom query modifications
+        fields, params = self._filter_fields(filters)
+        order = tuple((field_name, direction.lower()) for field_name, direction in order_by or ())
+        statement = self._template("page", fields, order)
         if query_modifier:
-            query = query_modifier(query)
+            statement = query_modifier(statement)
+        return list(db.scalars(statement, {**params, "skip": skip, "limit": limit}))
+    
+    def get_rows(
+        self,
+        db: Session,
+        skip: int = 0,
+        limit: int = 100,
+        filters: Optional[Dict[str, Any]] = None,
+        order_by: Optional[List[tuple]] = None,
+        query_modifier: Optional[Callable[[Select], Select]] = None,
+        columns: Optional[Tuple[str, ...]] = None,
+        as_dict: bool = False
+    ) -> List[Union[Row, Dict[str, Any]]]:
+        """
+        Read-only variant of get_all returning rows instead of model instances
         
-        # Apply ordering
-        if order_by:
-            for field_name, direction in order_by:
-                if hasattr(self.model, field_name):
-                    field = getattr(self.model, field_name)
-                    if direction.lower() == 'desc':
-                        query = query.order_by(desc(field))
-                    else:
-                        query = query.order_by(asc(field))
+        Runs a Core select() of the table's columns (or only `columns`):
+        the rows are tuples with attribute access by column name, not
+        tracked by the session (no identity map, instrumentation or lazy
+        loading), so a large page costs a fraction of get_all.
+        Relationships are not loaded.
+        
+        Args:
+            columns: Column names to read (all the table's columns by default)
+            as_dict: Return plain dicts instead, the cheapest input for a
+                     response schema (Pydantic reads the attributes of a row
+                     through its slow __getattr__)
         
-        # Apply pagination
-        return query.offset(skip).limit(limit).all()
+        Example:
+            authors = repo.get_rows(db, limit=1000, order_by=[("name", "asc")], as_dict=True)
+            payloads = view_repo.get_rows(db, limit=1000, columns=("payload",))
+        """
+        fields, params = self._filter_fields(filters)
+        order = tuple((field_name, direction.lower()) for field_name, direction in order_by or ())
+        statement = self._template("rows", fields, order, tuple(columns or ()))
+        if query_modifier:
+            statement = query_modifier(statement)
+        rows = db.execute(statement, {**params, "skip": skip, "limit": limit}).all()
+        if as_dict:
+            return [row._asdict() for row in rows]
+        return rows
     
     def get_one(
         self,
         db: Session,
         filters: Optional[Dict[str, Any]] = None,
-        query_modifier: Optional[Callable[[Query], Query]] = None
+        query_modifier: Optional[Callable[[Select], Select]] = None
     ) -> Optional[ModelType]:
         """
         Get a single record with flexible filtering
@@ -105,35 +200,23 @@ class BaseRepository(Generic[ModelType]):
         Args:
             db: Database session
             filters: Dict of field-value pairs for filtering
-            query_modifier: Optional function to modify the query
+            query_modifier: Optional function to modify the select() statement
         
         Returns:
             Model instance or None
         """
-        query = self.get_query(db)
-        
-        if filters:
-            for field, value in filters.items():
-                if hasattr(self.model, field) and value is not None:
-                    query = query.filter(getattr(self.model, field) == value)
-        
+        fields, params = self._filter_fields(filters)
+        statement = self._template("one", fields)
         if query_modifier:
-            query = query_modifier(query)
-        
-        return query.first()
-    
-    def create(self, db: Session, obj_in: Dict[str, Any]) -> ModelType:
-        """Create a new record"""
-        db_obj = self.model(**obj_in)
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+            statement = query_modifier(statement)
+        return db.scalars(statement, params).first()
     
     def create(self, db: Session, obj_in: Dict[str, Any]) -> ModelType:
         """Create a new record"""
         db_obj = self.model(**obj_in)
         db.add(db_obj)
+        db.flush()
+        self.after_write(db, db_obj)
         db.commit()
         db.refresh(db_obj)
         return db_obj
@@ -153,6 +236,8 @@ class BaseRepository(Generic[ModelType]):
             if hasattr(db_obj, field):
                 setattr(db_obj, field, value)
         
+        db.flush()
+        self.after_write(db, db_obj)
         db.commit()
         db.refresh(db_obj)
         return db_obj
@@ -164,14 +249,31 @@ class BaseRepository(Generic[ModelType]):
             return False
         
         db.delete(db_obj)
+        self.after_delete(db, id)
         db.commit()
         return True
     
+    def after_write(self, db: Session, db_obj: ModelType) -> None:
+        """
+        Hook run after a create/update is flushed, before it is committed
+        
+        Anything staged here lands in the same transaction as the write.
+        """
+        if self.track_changes:
+            # Refresh to log server defaults (created_at, ...)
+            db.refresh(db_obj)
+            change_log_repository.log_upsert(db, db_obj)
+    
+    def after_delete(self, db: Session, id: int) -> None:
+        """Hook run after a delete, before it is committed"""
+        if self.track_changes:
+            change_log_repository.log_delete(db, self.model.__tablename__, id)
+    
     def count(
         self, 
         db: Session,
         filters: Optional[Dict[str, Any]] = None,
-        query_modifier: Optional[Callable[[Query], Query]] = None
+        query_modifier: Optional[Callable[[Select], Select]] = None
     ) -> int:
         """
         Count records with optional filtering
@@ -179,20 +281,15 @@ class BaseRepository(Generic[ModelType]):
         Args:
             db: Database session
             filters: Dict of field-value pairs for filtering
-            query_modifier: Optional function to modify the query
+            query_modifier: Optional function to modify the select() statement
         
         Returns:
             Count of records
         """
-        query = self.get_query(db)
-        
-        if filters:
-            for field, value in filters.items():
-                if hasattr(self.model, field) and value is not None:
-                    query = query.filter(getattr(self.model, field) == value)
-        
+        fields, params = self._filter_fields(filters)
         if query_modifier:
-            query = query_modifier(query)
-        
-        return query.count()
-
+            statement = query_modifier(self._template("where", fields))
+            statement = select(func.count()).select_from(statement.subquery())
+        else:
+            statement = self._template("count", fields)
+        return db.scalar(statement, params)
@@ -1,8 +1,12 @@
-from typing import Optional, List
+from typing import Dict, Optional, List
+from sqlalchemy import func, select, update
 from sqlalchemy.orm import Session
 
 from app.repositories.base import BaseRepository
 from app.models.book import Book
+from app.repositories.book_view_repository import CHUNK_SIZE, book_view_repository
+from app.repositories.change_log_repository import change_log_repository
+from app.schemas.book import BookFilter
 
 
 class BookRepository(BaseRepository[Book]):
@@ -11,6 +15,93 @@ class BookRepository(BaseRepository[Book]):
     def __init__(self):
         super().__init__(Book)
     
+    def after_write(self, db: Session, db_obj: Book) -> None:
+        super().after_write(db, db_obj)
+        book_view_repository.upsert_books(db, [db_obj])
+    
+    def after_delete(self, db: Session, id: int) -> None:
+        super().after_delete(db, id)
+        book_view_repository.remove(db, id)
+    
+    def filter_conditions(self, book_filter: BookFilter, model=None) -> List:
+        """
+        Compile a BookFilter to SQL conditions
+
+        Every condition is a plain comparison (or IN) on an indexed column so
+        the database can pick an index; only keyword falls back to a
+        substring scan on the remaining rows.
+
+        `model` defaults to Book; BookView has the same filter columns plus
+        `has_cover`, used in place of the cover_image NULL check (pass a
+        table's `.c` to build Core conditions for `get_rows`).
+        """
+        model = model or self.model
+        conditions = []
+        if book_filter.author_ids:
+            conditions.append(model.author_id.in_(book_filter.author_ids))
+        if book_filter.category_ids:
+            conditions.append(model.category_id.in_(book_filter.category_ids))
+        if book_filter.year is not None:
+            conditions.append(model.published_year == book_filter.year)
+        if book_filter.year_from is not None:
+            conditions.append(model.published_year >= book_filter.year_from)
+        if book_filter.year_to is not None:
+            conditions.append(model.published_year <= book_filter.year_to)
+        if book_filter.has_cover is not None:
+            if hasattr(model, "has_cover"):
+                conditions.append(model.has_cover == book_filter.has_cover)
+            elif book_filter.has_cover:
+                conditions.append(model.cover_image.isnot(None))
+            else:
+                conditions.append(model.cover_image.is_(None))
+        if book_filter.created_since is not None:
+            conditions.append(model.created_at >= book_filter.created_since)
+        if book_filter.keyword:
+            conditions.append(model.title.ilike(f"%{book_filter.keyword}%"))
+        return conditions
+    
+    def reassign(self, db: Session, field: str, source_id: int, target_id: int) -> List[int]:
+        """
+        Move every book of an author/category to another one
+
+        The books are moved with one set-based UPDATE; their change log
+        entries and view rows are then written in chunks, all in the
+        caller's transaction (no commit here).
+
+        Args:
+            field: "author_id" or "category_id"
+
+        Returns:
+            IDs of the moved books
+        """
+        column = getattr(Book, field)
+        ids = list(db.scalars(select(Book.id).where(column == source_id).order_by(Book.id)))
+        if not ids:
+            return ids
+        db.execute(
+            update(Book).where(column == source_id).values({field: target_id}),
+            execution_options={"synchronize_session": False},
+        )
+        for start in range(0, len(ids), CHUNK_SIZE):
+            books = list(db.scalars(
+                select(Book).where(Book.id.in_(ids[start:start + CHUNK_SIZE])),
+                execution_options={"populate_existing": True},
+            ))
+            if self.track_changes:
+                change_log_repository.log_upserts(db, books)
+            book_view_repository.upsert_books(db, books)
+            db.flush()
+        return ids
+    
+    def get_similarity_fields(self, db: Session, ids: Optional[List[int]] = None) -> List[Dict]:
+        """Fields of the books (all by default) used by the related books index"""
+        statement = select(
+            Book.id, Book.title, Book.description, Book.author_id, Book.category_id, Book.published_year
+        )
+        if ids is not None:
+            statement = statement.where(Book.id.in_(ids))
+        return [row._asdict() for row in db.execute(statement)]
+    
     def get_by_title(self, db: Session, title: str) -> Optional[Book]:
         """Get book by title"""
         return db.query(Book).filter(Book.title == title).first()
@@ -26,6 +117,17 @@ class BookRepository(BaseRepository[Book]):
     def search_by_title(self, db: Session, keyword: str, skip: int = 0, limit: int = 100) -> List[Book]:
         """Search books by title keyword"""
         return db.query(Book).filter(Book.title.ilike(f"%{keyword}%")).offset(skip).limit(limit).all()
+    
+    def fuzzy_search_by_title(self, db: Session, keyword: str, skip: int = 0, limit: int = 100) -> List[Book]:
+        """Search books by title trigram similarity (Postgres pg_trgm only)"""
+        return (
+            db.query(Book)
+            .filter(Book.title.op("%")(keyword))
+            .order_by(func.similarity(Book.title, keyword).desc(), Book.id)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
 
 
 book_repository = BookRepository()
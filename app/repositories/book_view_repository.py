@@ -0,0 +1,155 @@
+from typing import Dict, Iterable, List
+from sqlalchemy import Row, delete, select
+from sqlalchemy.orm import Session
+
+from app.repositories.base import BaseRepository
+from app.models.author import Author
+from app.models.book import Book
+from app.models.book_view import BookView
+from app.models.category import Category
+from app.schemas.book import Book as BookSchema
+
+
+# Books re-rendered per query when an author/category changes or on rebuild
+CHUNK_SIZE = 1000
+
+# Columns read by the endpoints: the pre-rendered JSON is all they send
+PAYLOAD_COLUMNS = ("id", "payload")
+
+
+class BookViewRepository(BaseRepository[BookView]):
+    """
+    Repository for the denormalized book_view read model
+
+    Maintenance methods only stage changes in the caller's transaction;
+    `rebuild` is the only one that commits.
+    """
+
+    track_changes = False
+
+    def __init__(self):
+        super().__init__(BookView)
+
+    def render(self, book: Book, author: Author, category: Category) -> dict:
+        """Column values of the view row of a book"""
+        data = {column.key: getattr(book, column.key) for column in Book.__table__.columns}
+        data["author"] = author
+        data["category"] = category
+        return {
+            "id": book.id,
+            "title": book.title,
+            "published_year": book.published_year,
+            "cover_image": book.cover_image,
+            "has_cover": book.cover_image is not None,
+            "author_id": author.id,
+            "author_name": author.name,
+            "category_id": category.id,
+            "category_name": category.name,
+            "created_at": book.created_at,
+            "updated_at": book.updated_at,
+            "payload": BookSchema.model_validate(data).model_dump_json(),
+        }
+
+    def upsert_books(self, db: Session, books: List[Book]) -> None:
+        """Render the view rows of some books (authors/categories loaded once per batch)"""
+        if not books:
+            return
+        authors = {a.id: a for a in db.scalars(select(Author).where(Author.id.in_({b.author_id for b in books})))}
+        categories = {c.id: c for c in db.scalars(select(Category).where(Category.id.in_({b.category_id for b in books})))}
+        existing = {v.id: v for v in db.scalars(select(BookView).where(BookView.id.in_([b.id for b in books])))}
+        for book in books:
+            values = self.render(book, authors[book.author_id], categories[book.category_id])
+            row = existing.get(book.id)
+            if row is None:
+                db.add(BookView(**values))
+            else:
+                for field, value in values.items():
+                    setattr(row, field, value)
+
+    def _refresh_where(self, db: Session, condition) -> None:
+        """Re-render the view rows of the books matching a condition, in chunks"""
+        last_id = 0
+        while True:
+            books = list(db.scalars(
+                select(Book).where(condition, Book.id > last_id).order_by(Book.id).limit(CHUNK_SIZE)
+            ))
+            if not books:
+                return
+            self.upsert_books(db, books)
+            db.flush()
+            last_id = books[-1].id
+
+    def refresh_author(self, db: Session, author_id: int) -> None:
+        """Re-render the books of a changed author"""
+        self._refresh_where(db, Book.author_id == author_id)
+
+    def refresh_category(self, db: Session, category_id: int) -> None:
+        """Re-render the books of a changed category"""
+        self._refresh_where(db, Book.category_id == category_id)
+
+    def remove(self, db: Session, book_id: int) -> None:
+        """Drop the view row of a deleted book"""
+        db.execute(delete(BookView).where(BookView.id == book_id))
+
+    def rebuild(self, db: Session) -> int:
+        """
+        Re-render every row from the source tables
+
+        Runs in chunks committed one by one, so reads keep being served
+        from the old rows meanwhile; rows of books that no longer exist are
+        dropped at the end.
+
+        Returns:
+            Number of books rendered
+        """
+        count = 0
+        last_id = 0
+        while True:
+            books = list(db.scalars(select(Book).where(Book.id > last_id).order_by(Book.id).limit(CHUNK_SIZE)))
+            if not books:
+                break
+            self.upsert_books(db, books)
+            db.commit()
+            count += len(books)
+            last_id = books[-1].id
+        db.execute(delete(BookView).where(BookView.id.not_in(select(Book.id))))
+        db.commit()
+        return count
+
+    def get_payloads_by_ids(self, db: Session, ids: List[int]) -> Dict[int, Row]:
+        """Get the payloads of some books, keyed by ID (missing IDs are left out)"""
+        if not ids:
+            return {}
+        table = BookView.__table__
+        rows = db.execute(select(table.c.id, table.c.payload).where(table.c.id.in_(ids)))
+        return {row.id: row for row in rows}
+
+    def get_by_ids(self, db: Session, ids: List[int]) -> List[Row]:
+        """Get the payloads of some books, in the order of the given IDs (missing IDs are skipped)"""
+        rows = self.get_payloads_by_ids(db, ids)
+        return [rows[id] for id in ids if id in rows]
+
+    def get_by_author(self, db: Session, author_id: int, skip: int = 0, limit: int = 100) -> List[Row]:
+        """Get the payloads of the books of an author"""
+        return self.get_rows(db, skip=skip, limit=limit, filters={"author_id": author_id}, columns=PAYLOAD_COLUMNS)
+
+    def get_by_category(self, db: Session, category_id: int, skip: int = 0, limit: int = 100) -> List[Row]:
+        """Get the payloads of the books of a category"""
+        return self.get_rows(db, skip=skip, limit=limit, filters={"category_id": category_id}, columns=PAYLOAD_COLUMNS)
+
+    def search_by_title(self, db: Session, keyword: str, skip: int = 0, limit: int = 100) -> List[Row]:
+        """Search the payloads of the books by title keyword"""
+        return self.get_rows(
+            db,
+            skip=skip,
+            limit=limit,
+            query_modifier=lambda statement: statement.where(BookView.__table__.c.title.ilike(f"%{keyword}%")),
+            columns=PAYLOAD_COLUMNS,
+        )
+
+    def to_json(self, rows: Iterable[Row]) -> str:
+        """JSON array of the pre-rendered payloads of some rows (or BookView instances)"""
+        return "[" + ",".join(row.payload for row in rows) + "]"
+
+
+book_view_repository = BookViewRepository()
@@ -0,0 +1,57 @@
+from typing import Dict
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.models.cache_version import CacheVersion
+
+
+# Session.info flag set by `bump`, for listeners of the session's commit
+BUMPED_KEY = "cache_versions_bumped"
+
+
+class CacheVersionRepository:
+    """
+    Repository for cache version stamps
+
+    Each cached table has a row in `cache_versions` whose version is bumped
+    on every write, so every worker can tell when its local copy is stale.
+    """
+
+    def get_version(self, db: Session, name: str) -> int:
+        """Get the current version of a cached table (0 if never bumped)"""
+        version = db.execute(
+            select(CacheVersion.version).where(CacheVersion.name == name)
+        ).scalar()
+        return version or 0
+
+    def get_versions(self, db: Session) -> Dict[str, int]:
+        """Get the current versions of all cached tables"""
+        rows = db.execute(select(CacheVersion.name, CacheVersion.version)).all()
+        return {name: version for name, version in rows}
+
+    def bump(self, db: Session, name: str) -> int:
+        """
+        Increment the version of a cached table
+
+        The bump is not committed here: callers stage it before their own
+        write so that both land in the same transaction. The row stays
+        locked until then, so the returned version is the one this
+        transaction will commit.
+
+        Returns:
+            The new version
+        """
+        result = db.execute(
+            update(CacheVersion)
+            .where(CacheVersion.name == name)
+            .values(version=CacheVersion.version + 1)
+        )
+        if result.rowcount == 0:
+            # Table was created without the seeded rows (e.g. create_all)
+            db.add(CacheVersion(name=name, version=1))
+            db.flush()
+        db.info[BUMPED_KEY] = True
+        return self.get_version(db, name)
+
+
+cache_version_repository = CacheVersionRepository()
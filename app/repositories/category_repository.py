@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 
 from app.repositories.base import BaseRepository
 from app.models.category import Category
+from app.repositories.book_view_repository import book_view_repository
 
 
 class CategoryRepository(BaseRepository[Category]):
@@ -11,8 +12,13 @@ class CategoryRepository(BaseRepository[Category]):
     def __init__(self):
         super().__init__(Category)
     
+    def after_write(self, db: Session, db_obj: Category) -> None:
+        super().after_write(db, db_obj)
+        # Books embed their category: re-render them in the same transaction
+        book_view_repository.refresh_category(db, db_obj.id)
+    
     def get_by_name(self, db: Session, name: str) -> Optional[Category]:
-        """Get category by name"""
+        """Get category by name (from the database: the write path checks names with it)"""
         return db.query(Category).filter(Category.name == name).first()
     
     def search_by_name(self, db: Session, keyword: str, skip: int = 0, limit: int = 100):
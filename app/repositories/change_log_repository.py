@@ -0,0 +1,58 @@
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.models.change_log import ChangeLog
+
+
+def row_data(db_obj: Any) -> Dict[str, Any]:
+    """Column values of a model instance, JSON-ready"""
+    data = {}
+    for column in db_obj.__table__.columns:
+        value = getattr(db_obj, column.key)
+        if isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        data[column.key] = value
+    return data
+
+
+class ChangeLogRepository:
+    """
+    Repository for the append-only change log
+
+    Entries are added inside the writer's transaction (no commit here), so
+    a change is visible in the feed exactly when the write is.
+    """
+
+    def log_upsert(self, db: Session, db_obj: Any) -> None:
+        """Record the current state of a created/updated record"""
+        db.add(ChangeLog(
+            entity=db_obj.__tablename__,
+            entity_id=db_obj.id,
+            op="upsert",
+            data=row_data(db_obj),
+        ))
+
+    def log_upserts(self, db: Session, db_objs: Iterable[Any]) -> None:
+        """Record the current state of many updated records with one multi-row INSERT"""
+        entries = [
+            {"entity": db_obj.__tablename__, "entity_id": db_obj.id, "op": "upsert", "data": row_data(db_obj)}
+            for db_obj in db_objs
+        ]
+        if entries:
+            db.execute(insert(ChangeLog), entries)
+
+    def log_delete(self, db: Session, entity: str, entity_id: int) -> None:
+        """Record a tombstone for a deleted record"""
+        db.add(ChangeLog(entity=entity, entity_id=entity_id, op="delete", data=None))
+
+    def get_since(self, db: Session, since: int = 0, limit: int = 100, entity: Optional[str] = None) -> List[ChangeLog]:
+        """Get changes with a sequence number greater than `since`, oldest first"""
+        query = select(ChangeLog).where(ChangeLog.seq > since)
+        if entity:
+            query = query.where(ChangeLog.entity == entity)
+        return list(db.scalars(query.order_by(ChangeLog.seq).limit(limit)))
+
+
+change_log_repository = ChangeLogRepository()
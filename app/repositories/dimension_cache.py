@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import namedtuple
+from typing import Dict, List, Optional, Type
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.base import Base
+from app.db.write_coordinator import write_coordinator
+from app.models.author import Author
+from app.models.category import Category
+from app.repositories.cache_version_repository import cache_version_repository
+
+
+class DimensionCache:
+    """
+    Process-local, read-mostly cache of a small dimension table
+
+    Rows are stored as namedtuples (compact, attribute access works with
+    Pydantic `from_attributes`) and indexed by id. The cache
+    checks the table's version stamp at most once every
+    `DIMENSION_CACHE_CHECK_INTERVAL` seconds and reloads the whole table
+    when another worker (or this one) has bumped it.
+    """
+
+    def __init__(self, model: Type[Base], fields: List[str]):
+        self.model = model
+        self.name = model.__tablename__
+        self.fields = fields
+        self.row_type = namedtuple(f"Cached{model.__name__}", fields)
+        self._by_id: Dict[int, tuple] = {}
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _ensure_fresh(self, db: Session) -> None:
+        """Reload the table if its version stamp changed since the last check"""
+        if (
+            self._version is not None
+            and time.monotonic() - self._checked_at < settings.DIMENSION_CACHE_CHECK_INTERVAL
+        ):
+            return
+
+        with self._lock:
+            # Another thread may have refreshed while we were waiting
+            if (
+                self._version is not None
+                and time.monotonic() - self._checked_at < settings.DIMENSION_CACHE_CHECK_INTERVAL
+            ):
+                return
+
+            # Read the version before the rows: a write that lands in between
+            # leaves us with a newer snapshot under an older stamp, which only
+            # causes one extra reload instead of a stale cache.
+            version = cache_version_repository.get_version(db, self.name)
+            if self._version is None or version > self._version:
+                self._load(db, version)
+            self._checked_at = time.monotonic()
+
+    def _load(self, db: Session, version: int) -> None:
+        """Load the whole table and swap in the new indexes"""
+        columns = [getattr(self.model, field) for field in self.fields]
+        by_id = {}
+        for values in db.execute(select(*columns)):
+            row = self.row_type(*values)
+            by_id[row.id] = row
+
+        self._by_id = by_id
+        self._version = version
+
+    def get(self, db: Session, id: int) -> Optional[tuple]:
+        """Get a cached row by ID"""
+        self._ensure_fresh(db)
+        return self._by_id.get(id)
+
+    def invalidate(self, db: Session) -> int:
+        """
+        Bump the table's version stamp so every worker reloads it
+
+        Must be called before the write is committed, the bump is part of
+        the caller's transaction.
+
+        Returns:
+            The new version of the table
+        """
+        version = cache_version_repository.bump(db, self.name)
+        self._version = None
+        return version
+
+    def reset(self) -> None:
+        """Force a reload on the next lookup"""
+        self._version = None
+
+
+author_cache = DimensionCache(Author, ["id", "name", "bio"])
+category_cache = DimensionCache(Category, ["id", "name", "description"])
+
+# The writer thread may have loaded rows of a group whose commit then failed
+write_coordinator.failed_commit_listeners += [author_cache.reset, category_cache.reset]
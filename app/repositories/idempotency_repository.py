@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.repositories.base import BaseRepository
+from app.models.idempotency_key import IdempotencyKey
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class IdempotencyRepository(BaseRepository[IdempotencyKey]):
+    """
+    Repository for the stored responses of Idempotency-Key requests
+
+    A key is taken with a plain INSERT (the unique constraint decides which
+    of several concurrent requests runs), and a key left "processing" by a
+    dead worker is taken over with a conditional UPDATE. Keys are
+    bookkeeping, not catalogue data: no change log entries.
+    """
+
+    track_changes = False
+
+    def __init__(self):
+        super().__init__(IdempotencyKey)
+
+    def get_by_key(self, db: Session, key: str) -> Optional[IdempotencyKey]:
+        """Unexpired entry of a key"""
+        return db.scalar(
+            select(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.expires_at > utcnow())
+        )
+
+    def acquire(self, db: Session, key: str, fingerprint: str, ttl: float, lock_seconds: float) -> Tuple[bool, Optional[IdempotencyKey]]:
+        """
+        Take a key for a request about to run
+
+        Returns:
+            (True, None) if the caller now holds the key and must run the
+            request, else (False, entry) with the entry of whoever has it
+        """
+        now = utcnow()
+        # An expired entry does not hold its key any more
+        db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.expires_at <= now))
+        try:
+            db.execute(insert(IdempotencyKey).values(
+                key=key,
+                fingerprint=fingerprint,
+                status="processing",
+                locked_at=now,
+                expires_at=now + timedelta(seconds=ttl),
+            ))
+            db.commit()
+            return True, None
+        except IntegrityError:
+            db.rollback()
+
+        result = db.execute(
+            update(IdempotencyKey)
+            .where(
+                IdempotencyKey.key == key,
+                IdempotencyKey.fingerprint == fingerprint,
+                IdempotencyKey.status == "processing",
+                IdempotencyKey.locked_at < now - timedelta(seconds=lock_seconds),
+            )
+            .values(locked_at=now)
+        )
+        db.commit()
+        if result.rowcount:
+            return True, None
+        return False, self.get_by_key(db, key)
+
+    def complete(self, db: Session, key: str, status: int, headers: List[List[str]], body: bytes, ttl: float) -> None:
+        """Store the response of a key's request"""
+        db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == key, IdempotencyKey.status == "processing")
+            .values(
+                status="completed",
+                response_status=status,
+                response_headers=headers,
+                response_body=body,
+                expires_at=utcnow() + timedelta(seconds=ttl),
+            )
+        )
+        db.commit()
+
+    def release(self, db: Session, key: str) -> None:
+        """Give up a key without storing a response, so a retry runs again"""
+        db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.status == "processing"))
+        db.commit()
+
+    def purge(self, db: Session, max_keys: int) -> int:
+        """
+        Delete expired entries, then the oldest completed ones over max_keys
+
+        Returns:
+            Number of deleted entries
+        """
+        deleted = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= utcnow())).rowcount
+        excess = (db.scalar(select(func.count()).select_from(IdempotencyKey)) or 0) - max_keys
+        if excess > 0:
+            oldest = (
+                select(IdempotencyKey.id)
+                .where(IdempotencyKey.status == "completed")
+                .order_by(IdempotencyKey.created_at, IdempotencyKey.id)
+                .limit(excess)
+            )
+            deleted += db.execute(
+                delete(IdempotencyKey).where(IdempotencyKey.id.in_(oldest.scalar_subquery()))
+            ).rowcount
+        db.commit()
+        return deleted
+
+
+idempotency_repository = IdempotencyRepository()
@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.repositories.base import BaseRepository
+from app.models.job import Job
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobRepository(BaseRepository[Job]):
+    """
+    Repository for the background job queue
+
+    Claiming is a conditional UPDATE (status still "queued"), so a job is
+    run by exactly one worker even when several processes poll the same
+    table. Jobs are bookkeeping, not catalogue data: no change log entries.
+    """
+
+    track_changes = False
+
+    def __init__(self):
+        super().__init__(Job)
+
+    def enqueue(self, db: Session, type: str, payload: Dict[str, Any], max_attempts: int) -> Job:
+        """Add a job that is due immediately"""
+        return self.create(db, {
+            "type": type,
+            "status": "queued",
+            "payload": payload,
+            "max_attempts": max_attempts,
+            "run_at": utcnow(),
+        })
+
+    def claim(self, db: Session, types: Iterable[str], worker_id: str) -> Optional[Job]:
+        """
+        Take the oldest due job of one of the given types
+
+        Returns:
+            The claimed job (now "running"), or None if there is none or
+            another worker took it first
+        """
+        now = utcnow()
+        job_id = db.execute(
+            select(Job.id)
+            .where(Job.status == "queued", Job.run_at <= now, Job.type.in_(list(types)))
+            .order_by(Job.run_at, Job.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        ).scalar()
+        if job_id is None:
+            db.rollback()
+            return None
+
+        result = db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == "queued")
+            .values(status="running", locked_by=worker_id, locked_at=now, attempts=Job.attempts + 1)
+        )
+        db.commit()
+        if result.rowcount == 0:
+            return None
+        return self.get_by_id(db, job_id)
+
+    def heartbeat(self, db: Session, job_id: int, worker_id: str) -> bool:
+        """
+        Renew the lease of a job this worker is running
+
+        Returns:
+            False if the job is no longer running under this worker
+        """
+        result = db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == "running", Job.locked_by == worker_id)
+            .values(locked_at=utcnow()),
+            execution_options={"synchronize_session": False},
+        )
+        db.commit()
+        return result.rowcount > 0
+
+    def succeed(self, db: Session, job: Job, result: Optional[Dict[str, Any]]) -> Job:
+        """Mark a running job as done"""
+        return self.update(db, job.id, {"status": "succeeded", "result": result, "error": None, "locked_by": None})
+
+    def retry(self, db: Session, job: Job, error: str, delay: float) -> Job:
+        """Put a failed job back in the queue after a delay"""
+        return self.update(db, job.id, {
+            "status": "queued",
+            "error": error,
+            "run_at": utcnow() + timedelta(seconds=delay),
+            "locked_by": None,
+        })
+
+    def fail(self, db: Session, job: Job, error: str) -> Job:
+        """Mark a job as permanently failed"""
+        return self.update(db, job.id, {"status": "failed", "error": error, "locked_by": None})
+
+    def requeue_stale(self, db: Session, lease_seconds: float) -> Dict[str, int]:
+        """
+        Requeue running jobs whose lease was not renewed in time (the worker
+        process died or hung: running jobs get a heartbeat)
+
+        Jobs that already used all their attempts are marked failed instead,
+        so a job that keeps crashing its worker is not retried forever.
+
+        Returns:
+            Number of requeued and of failed jobs
+        """
+        stale = (Job.status == "running", Job.locked_at < utcnow() - timedelta(seconds=lease_seconds))
+        failed = db.execute(
+            update(Job)
+            .where(*stale, Job.attempts >= Job.max_attempts)
+            .values(status="failed", error="Lease expired on the last attempt (worker died or hung)", locked_by=None),
+            execution_options={"synchronize_session": False},
+        )
+        requeued = db.execute(
+            update(Job)
+            .where(*stale)
+            .values(status="queued", locked_by=None, run_at=utcnow()),
+            execution_options={"synchronize_session": False},
+        )
+        db.commit()
+        return {"requeued": requeued.rowcount, "failed": failed.rowcount}
+
+    def count_by_status(self, db: Session) -> Dict[str, int]:
+        """Number of jobs per status"""
+        rows = db.execute(select(Job.status, func.count()).group_by(Job.status)).all()
+        return {status: count for status, count in rows}
+
+
+job_repository = JobRepository()
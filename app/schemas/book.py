@@ -1,5 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from datetime import datetime
+from typing import List
 
 from app.schemas.author import Author
 from app.schemas.category import Category
@@ -24,6 +25,23 @@ class BookUpdate(BaseModel):
     category_id: int | None = None
     cover_image: str | None = None
 
+class BookFilter(BaseModel):
+    """Filters for listing books, every field is optional and combined with AND"""
+    author_ids: List[int] | None = None
+    category_ids: List[int] | None = None
+    year: int | None = None
+    year_from: int | None = None
+    year_to: int | None = None
+    keyword: str | None = None
+    has_cover: bool | None = None
+    created_since: datetime | None = None
+
+    @field_validator("author_ids", "category_ids")
+    @classmethod
+    def normalize_ids(cls, ids: List[int] | None) -> List[int] | None:
+        # Same set of ids -> same filter (and same coalescing key)
+        return sorted(set(ids)) if ids else None
+
 class BookInDBBase(BookBase):
     id: int
     description: str | None = None
@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel
+
+class Change(BaseModel):
+    seq: int
+    entity: str
+    entity_id: int
+    op: str  # "upsert" or "delete"
+    data: Optional[Dict[str, Any]] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class ChangePage(BaseModel):
+    """Schema return for client"""
+    changes: List[Change] = []
+    next_since: int
+    has_more: bool
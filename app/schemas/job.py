@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+from pydantic import BaseModel
+
+class Job(BaseModel):
+    """Schema return for client"""
+    id: int
+    type: str
+    status: str  # queued, running, succeeded, failed
+    attempts: int
+    max_attempts: int
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    run_at: datetime
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,12 @@
+from typing import List
+from pydantic import BaseModel
+
+class SuggestItem(BaseModel):
+    id: int
+    name: str
+
+class Suggestions(BaseModel):
+    """Schema return for client"""
+    titles: List[SuggestItem] = []
+    authors: List[SuggestItem] = []
+    categories: List[SuggestItem] = []
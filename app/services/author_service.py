@@ -1,8 +1,17 @@
 from typing import Optional
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
 from app.repositories.author_repository import author_repository
+from app.repositories.book_repository import book_repository
+from app.repositories.dimension_cache import author_cache
+from app.db.write_coordinator import write_coordinator
+from app.services.index_service import search_indexes
+from app.core.pubsub import event_hub
+from app.services.related_service import related_books_service
+from app.repositories.change_log_repository import row_data
+from app.services.fuzzy_search_service import fuzzy_search_service, uses_pg_trgm
 from app.schemas.author import AuthorCreate, AuthorUpdate
 
 
@@ -24,58 +33,132 @@ class AuthorService:
     
     def get_authors(self, db: Session, skip: int = 0, limit: int = 100):
         """Get all authors with pagination"""
-        return self.repository.get_all(db, skip=skip, limit=limit, order_by="name")
+        return self.repository.get_rows(db, skip=skip, limit=limit, order_by=[("name", "asc")], as_dict=True)
     
     def create_author(self, db: Session, author_in: AuthorCreate):
         """Create a new author"""
-        # Check if name already exists
-        existing_author = self.repository.get_by_name(db, author_in.name)
-        if existing_author:
+        def write(db: Session):
+            # Check if name already exists
+            existing_author = self.repository.get_by_name(db, author_in.name)
+            if existing_author:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Author with name '{author_in.name}' already exists"
+                )
+
+            # Create author
+            author_data = author_in.model_dump()
+            version = author_cache.invalidate(db)
+            author = self.repository.create(db, author_data)
+            write_coordinator.after_commit(db, search_indexes.upsert, "authors", version, author.id, author.name)
+            write_coordinator.after_commit(db, event_hub.publish, "authors", "created", author.id, row_data(author))
+            return author
+        try:
+            return write_coordinator.run(db, write)
+        except IntegrityError:
+            # The name was taken by a concurrent write after the check
+            db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Author with name '{author_in.name}' already exists"
             )
-        
-        # Create author
-        author_data = author_in.model_dump()
-        return self.repository.create(db, author_data)
     
     def update_author(self, db: Session, author_id: int, author_in: AuthorUpdate):
         """Update an author"""
-        # Check if author exists
-        existing_author = self.repository.get_by_id(db, author_id)
-        if not existing_author:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Author with id {author_id} not found"
-            )
-        
-        # Check if new name already exists (if name is being updated)
-        if author_in.name and author_in.name != existing_author.name:
-            name_exists = self.repository.get_by_name(db, author_in.name)
-            if name_exists:
+        def write(db: Session):
+            # Check if author exists
+            existing_author = self.repository.get_by_id(db, author_id)
+            if not existing_author:
                 raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Author with name '{author_in.name}' already exists"
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Author with id {author_id} not found"
                 )
-        
-        # Update only provided fields
-        update_data = author_in.model_dump(exclude_unset=True)
-        return self.repository.update(db, author_id, update_data)
+
+            # Check if new name already exists (if name is being updated)
+            if author_in.name and author_in.name != existing_author.name:
+                name_exists = self.repository.get_by_name(db, author_in.name)
+                if name_exists:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Author with name '{author_in.name}' already exists"
+                    )
+
+            # Update only provided fields
+            update_data = author_in.model_dump(exclude_unset=True)
+            version = author_cache.invalidate(db)
+            author = self.repository.update(db, author_id, update_data)
+            write_coordinator.after_commit(db, search_indexes.upsert, "authors", version, author.id, author.name)
+            write_coordinator.after_commit(db, event_hub.publish, "authors", "updated", author.id, row_data(author))
+            return author
+        try:
+            return write_coordinator.run(db, write)
+        except IntegrityError:
+            # The name was taken by a concurrent write after the check
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Author with name '{author_in.name}' already exists"
+            )
     
     def delete_author(self, db: Session, author_id: int):
         """Delete an author"""
-        success = self.repository.delete(db, author_id)
-        if not success:
+        def write(db: Session):
+            version = author_cache.invalidate(db)
+            success = self.repository.delete(db, author_id)
+            if not success:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Author with id {author_id} not found"
+                )
+            write_coordinator.after_commit(db, search_indexes.remove, "authors", version, author_id)
+            write_coordinator.after_commit(db, event_hub.publish, "authors", "deleted", author_id)
+            return {"message": "Author deleted successfully"}
+        return write_coordinator.run(db, write)
+    
+    def merge_author(self, db: Session, author_id: int, target_id: int):
+        """
+        Move every book of an author to another one, then delete it
+
+        The books are reassigned with one set-based UPDATE in the same
+        transaction as the delete (see BookRepository.reassign), instead of
+        one book update per book. The stream only gets one "merged" event
+        (with the number of books moved), not an "updated" event per book:
+        subscribers that track books read the moves from the change log.
+        """
+        if author_id == target_id:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Author with id {author_id} not found"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cannot merge an author into itself"
+            )
+        
+        def write(db: Session):
+            for id in (author_id, target_id):
+                if not self.repository.get_by_id(db, id):
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail=f"Author with id {id} not found"
+                    )
+            version = author_cache.invalidate(db)
+            book_ids = book_repository.reassign(db, "author_id", author_id, target_id)
+            self.repository.delete(db, author_id)
+            write_coordinator.after_commit(db, search_indexes.remove, "authors", version, author_id)
+            write_coordinator.after_commit(
+                db, event_hub.publish, "authors", "merged", author_id, {"into": target_id, "books": len(book_ids)}
             )
-        return {"message": "Author deleted successfully"}
+            write_coordinator.after_commit(db, event_hub.publish, "authors", "deleted", author_id)
+            return book_ids
+        book_ids = write_coordinator.run(db, write)
+        related_books_service.refresh_books(db, book_ids)
+        return {"message": "Author merged successfully", "target_id": target_id, "books_moved": len(book_ids)}
     
-    def search_authors(self, db: Session, keyword: str, skip: int = 0, limit: int = 100):
-        """Search authors by name keyword"""
-        return self.repository.search_by_name(db, keyword, skip=skip, limit=limit)
+    def search_authors(self, db: Session, keyword: str, skip: int = 0, limit: int = 100, fuzzy: bool = False):
+        """Search authors by name keyword (or by name similarity when fuzzy)"""
+        if not fuzzy:
+            return self.repository.search_by_name(db, keyword, skip=skip, limit=limit)
+        if uses_pg_trgm(db):
+            return self.repository.fuzzy_search_by_name(db, keyword, skip=skip, limit=limit)
+        ids = fuzzy_search_service.search(db, "authors", keyword, skip=skip, limit=limit)
+        return self.repository.get_by_ids(db, ids)
 
 
 author_service = AuthorService()
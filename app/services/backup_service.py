@@ -0,0 +1,258 @@
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from fastapi import HTTPException, status
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.utils import COVERS_DIR, get_file_path_from_url
+from app.db.session import engines
+from app.services.job_service import job_service
+
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+DATABASE_FILE = "app.db"
+
+
+class _TooManyRestarts(Exception):
+    """Raised from the progress callback to stop a paced copy that keeps restarting"""
+
+
+class BackupService:
+    """
+    Online backups of the SQLite database and of the covers it references
+
+    The database is copied with the sqlite3 backup API in steps of
+    BACKUP_PAGES_PER_STEP pages, sleeping BACKUP_STEP_SLEEP_MS in between,
+    so requests keep getting the database while it runs:
+
+    - in WAL mode (SQLITE_JOURNAL_MODE=wal) the copy reads one snapshot
+      in a read transaction held for the whole copy; writers are never
+      blocked by it;
+    - with a rollback journal each step only holds a read lock, and a
+      write from another connection makes SQLite restart the copy (that
+      is what keeps it consistent); after BACKUP_MAX_RESTARTS restarts the
+      rest is copied in one step, holding off writers for that step.
+
+    Covers are never modified in place (an upload gets a new file name),
+    so they are snapshotted with hard links: every cover is linked before
+    the database copy starts, so a cover replaced (and deleted) during the
+    copy is still there, and the links the copied database does not
+    reference are dropped afterwards.
+
+    A backup is a directory BACKUP_DIR/backup-<time> with app.db, covers/
+    and manifest.json; it is built under a temporary name and renamed
+    when complete. The last BACKUP_KEEP backups are kept.
+    """
+
+    def database_path(self) -> str:
+        """File of the primary database (only SQLite files can be backed up)"""
+        url = make_url(engines.settings.SQLALCHEMY_DATABASE_URL)
+        if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Online backups are only supported for SQLite database files"
+            )
+        return os.path.abspath(url.database)
+
+    def _copy_database(self, source_path: str, target_path: str) -> Dict[str, Any]:
+        """Paced copy of a live database with the backup API"""
+        source = sqlite3.connect(source_path, timeout=30, isolation_level=None)
+        target = sqlite3.connect(target_path)
+        progress = {"steps": 0, "restarts": 0, "pages": 0}
+        remaining_before = None
+
+        def paced(status_code: int, remaining: int, total: int) -> None:
+            nonlocal remaining_before
+            progress["steps"] += 1
+            progress["pages"] = total
+            if remaining_before is not None and remaining > remaining_before:
+                progress["restarts"] += 1
+                if progress["restarts"] > settings.BACKUP_MAX_RESTARTS:
+                    raise _TooManyRestarts()
+            remaining_before = remaining
+            if remaining:
+                time.sleep(settings.BACKUP_STEP_SLEEP_MS / 1000)
+
+        try:
+            progress["journal_mode"] = source.execute("PRAGMA journal_mode").fetchone()[0]
+            if progress["journal_mode"] == "wal":
+                # Copy one snapshot: writers append to the WAL meanwhile and
+                # neither wait for the copy nor restart it
+                source.execute("BEGIN")
+                source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            try:
+                source.backup(target, pages=settings.BACKUP_PAGES_PER_STEP, progress=paced)
+            except _TooManyRestarts:
+                logger.warning("Backup restarted %d times by concurrent writes, copying the rest in one step",
+                               progress["restarts"] - 1)
+                source.backup(target, pages=-1)
+                progress["single_step"] = True
+        finally:
+            target.close()
+            source.close()
+        return progress
+
+    def _referenced_covers(self, database_path: str) -> Set[str]:
+        """Cover URLs referenced by the books of a database copy"""
+        connection = sqlite3.connect(database_path)
+        try:
+            rows = connection.execute("SELECT cover_image FROM books WHERE cover_image IS NOT NULL")
+            return {cover for (cover,) in rows}
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _link(source: str, target: str) -> None:
+        """Hard-link a file (copy it across file systems)"""
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copy2(source, target)
+
+    def backup(self, backup_dir: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Take a consistent backup of the database and of its covers
+
+        Returns:
+            The backup's manifest (path, duration, page and cover counts)
+        """
+        database_path = self.database_path()
+        backup_dir = backup_dir or settings.BACKUP_DIR
+        now = time.time()
+        name = time.strftime("backup-%Y%m%d-%H%M%S", time.localtime(now)) + f"{int(now * 1000) % 1000:03d}"
+        final_path = os.path.join(backup_dir, name)
+        work_path = final_path + ".tmp"
+        covers_path = os.path.join(work_path, "covers")
+        os.makedirs(covers_path)
+        started = time.monotonic()
+
+        # Link every current cover first: covers deleted during the copy survive
+        linked = set()
+        if os.path.isdir(COVERS_DIR):
+            for filename in os.listdir(COVERS_DIR):
+                source = os.path.join(COVERS_DIR, filename)
+                if os.path.isfile(source):
+                    self._link(source, os.path.join(covers_path, filename))
+                    linked.add(filename)
+        covers_ms = (time.monotonic() - started) * 1000
+
+        copy_started = time.monotonic()
+        progress = self._copy_database(database_path, os.path.join(work_path, DATABASE_FILE))
+        database_ms = (time.monotonic() - copy_started) * 1000
+
+        # Keep exactly the covers the copied database references
+        referenced = {
+            os.path.basename(url): url
+            for url in self._referenced_covers(os.path.join(work_path, DATABASE_FILE))
+        }
+        missing: List[str] = []
+        for filename in linked - set(referenced):
+            os.remove(os.path.join(covers_path, filename))
+        for filename, url in referenced.items():
+            if filename in linked:
+                continue
+            # Uploaded while the database was being copied
+            source = get_file_path_from_url(url)
+            if os.path.isfile(source):
+                self._link(source, os.path.join(covers_path, filename))
+            else:
+                missing.append(url)
+
+        manifest = {
+            "name": name,
+            "path": os.path.abspath(final_path),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "source": database_path,
+            "duration_ms": round((time.monotonic() - started) * 1000, 1),
+            "database_ms": round(database_ms, 1),
+            "covers_link_ms": round(covers_ms, 1),
+            "database_bytes": os.path.getsize(os.path.join(work_path, DATABASE_FILE)),
+            "covers": len(referenced) - len(missing),
+            "missing_covers": missing,
+            **progress,
+        }
+        with open(os.path.join(work_path, MANIFEST), "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.rename(work_path, final_path)
+        self.prune(backup_dir)
+        logger.info("Backup %s taken in %.0f ms", name, manifest["duration_ms"])
+        return manifest
+
+    def list_backups(self, backup_dir: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Manifests of the complete backups, newest first"""
+        backup_dir = backup_dir or settings.BACKUP_DIR
+        if not os.path.isdir(backup_dir):
+            return []
+        manifests = []
+        for name in sorted(os.listdir(backup_dir), reverse=True):
+            path = os.path.join(backup_dir, name, MANIFEST)
+            if name.startswith("backup-") and os.path.isfile(path):
+                with open(path) as f:
+                    manifests.append(json.load(f))
+        return manifests
+
+    def prune(self, backup_dir: Optional[str] = None) -> None:
+        """Delete the backups beyond the newest BACKUP_KEEP (and unfinished ones)"""
+        backup_dir = backup_dir or settings.BACKUP_DIR
+        for manifest in self.list_backups(backup_dir)[settings.BACKUP_KEEP:]:
+            shutil.rmtree(os.path.join(backup_dir, manifest["name"]), ignore_errors=True)
+        for name in os.listdir(backup_dir):
+            if name.endswith(".tmp"):
+                path = os.path.join(backup_dir, name)
+                # Leave a backup that is being taken right now alone
+                if time.time() - os.path.getmtime(path) > 3600:
+                    shutil.rmtree(path, ignore_errors=True)
+
+    def restore(self, backup_path: str) -> Dict[str, Any]:
+        """
+        Restore a backup over the live database and covers
+
+        The app must be stopped. The backup is integrity-checked, written
+        over the database with the backup API (which also handles the
+        journal files), and its covers are copied back into the covers
+        directory; covers that are not in the backup are left in place.
+
+        Returns:
+            The restored backup's manifest
+        """
+        database_path = self.database_path()
+        with open(os.path.join(backup_path, MANIFEST)) as f:
+            manifest = json.load(f)
+        source = sqlite3.connect(os.path.join(backup_path, DATABASE_FILE))
+        try:
+            result = source.execute("PRAGMA integrity_check").fetchone()[0]
+            if result != "ok":
+                raise ValueError(f"Backup database is corrupt: {result}")
+            target = sqlite3.connect(database_path, timeout=30)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+        finally:
+            source.close()
+
+        os.makedirs(COVERS_DIR, exist_ok=True)
+        covers_path = os.path.join(backup_path, "covers")
+        for filename in os.listdir(covers_path):
+            target = os.path.join(COVERS_DIR, filename)
+            if not os.path.exists(target):
+                self._link(os.path.join(covers_path, filename), target)
+        return manifest
+
+
+backup_service = BackupService()
+
+
+@job_service.register("backup")
+def run_backup(db: Session, payload: dict) -> dict:
+    """Handler of "backup" jobs: take an online backup"""
+    return backup_service.backup()
@@ -1,11 +1,33 @@
 from typing import Optional, List
 from sqlalchemy.orm import Session
-from fastapi import HTTPException, status, UploadFile
+from fastapi import HTTPException, status, UploadFile, Response
 import os
 
+from app.models.book import Book
+from app.models.book_view import BookView
 from app.repositories.book_repository import book_repository
-from app.schemas.book import BookCreate, BookUpdate
-from app.core.utils import save_upload_file, delete_file, get_file_path_from_url
+from app.repositories.book_view_repository import book_view_repository
+from app.repositories.cache_version_repository import cache_version_repository
+from app.repositories.dimension_cache import author_cache, category_cache
+from app.schemas.book import Book as BookSchema, BookCreate, BookUpdate, BookFilter
+from app.db.deadline import QueryInterrupted
+from app.db.write_coordinator import write_coordinator
+from app.services.index_service import search_indexes
+from app.core.pubsub import event_hub
+from app.repositories.change_log_repository import row_data
+from app.services.fuzzy_search_service import fuzzy_search_service, uses_pg_trgm
+from app.services.job_service import job_service
+from app.services.related_service import related_books_service
+from app.core.config import settings
+from app.core.singleflight import SingleFlight
+from app.core.utils import (
+    save_upload_file, stage_upload_file, promote_staged_file, delete_file, get_file_path_from_url
+)
+
+
+# Fields clients may sort books by
+BOOK_SORT_FIELDS = {"id", "title", "published_year", "created_at", "updated_at"}
+MAX_SORT_KEYS = 3
 
 
 class BookService:
@@ -13,82 +35,222 @@ class BookService:
     
     def __init__(self):
         self.repository = book_repository
+        self.reads = SingleFlight()
+    
+    def _coalesce(self, db: Session, key: tuple, load):
+        """
+        Run a read through the single-flight layer
+
+        Concurrent calls with the same key (method + normalized params)
+        share one query and its serialized result. Replica and primary
+        reads are kept apart so read-your-writes clients never get a
+        replica result.
+        """
+        if not settings.SINGLE_FLIGHT_ENABLED:
+            return load()
+        try:
+            return self.reads.do((bool(db.info.get("read_only")),) + key, load)
+        except QueryInterrupted as e:
+            if e.deadline is db.info.get("query_deadline"):
+                raise
+            # The shared query was cut short for the request that ran it
+            return load()
+    
+    def _serialize(self, db: Session, book: Book) -> BookSchema:
+        """
+        Build the response schema for a book
+
+        Author and category are attached from the in-process dimension cache
+        instead of lazy-loading the relationships; the ORM relationship is
+        only used on a cache miss.
+        """
+        data = {column.key: getattr(book, column.key) for column in Book.__table__.columns}
+        data["author"] = author_cache.get(db, book.author_id) or book.author
+        data["category"] = category_cache.get(db, book.category_id) or book.category
+        return BookSchema.model_validate(data)
+    
+    def _json_response(self, content: str) -> Response:
+        """
+        Send a JSON array rendered from book_view payloads as is
+
+        The payloads already have the shape of the Book schema, so they skip
+        response_model validation and re-serialization.
+        """
+        return Response(content=content, media_type="application/json")
     
     def get_book(self, db: Session, book_id: int):
         """Get a single book by ID"""
-        book = self.repository.get_by_id(db, book_id)
-        if not book:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Book with id {book_id} not found")
-        return book
-    
-    def get_books(self, db: Session, skip: int = 0, limit: int = 100, author_id: Optional[int] = None, category_id: Optional[int] = None, year: Optional[int] = None, keyword: Optional[str] = None):
-        """Get all books with pagination"""
-        return self.repository.get_all(
-            db, 
-            skip=skip, 
-            limit=limit, 
-            filters={"author_id": author_id, "category_id": category_id, "year": year, "keyword": keyword}, 
-            order_by=[("created_at", "desc")]
-        )
+        def load():
+            book = self.repository.get_by_id(db, book_id)
+            if not book:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Book with id {book_id} not found")
+            return self._serialize(db, book)
+        return self._coalesce(db, ("get_book", book_id), load)
     
-    def create_book(self, db: Session, book_in: BookCreate):
-        """Create a new book"""
-        # Check if title already exists
-        existing_book = self.repository.get_by_title(db, book_in.title)
-        if existing_book:
+    def _parse_sort(self, sort: str) -> List[tuple]:
+        """
+        Parse a sort expression like "-published_year,title"
+
+        A leading "-" sorts descending. The id is appended as a tie-breaker
+        so that pagination is stable.
+        """
+        order_by = []
+        for key in sort.split(","):
+            key = key.strip()
+            if not key:
+                continue
+            direction = "desc" if key.startswith("-") else "asc"
+            field = key.lstrip("+-")
+            if field not in BOOK_SORT_FIELDS:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Cannot sort by '{field}'. Allowed fields: {', '.join(sorted(BOOK_SORT_FIELDS))}"
+                )
+            order_by.append((field, direction))
+        
+        if len(order_by) > MAX_SORT_KEYS:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Book with title '{book_in.title}' already exists"
+                detail=f"Cannot sort by more than {MAX_SORT_KEYS} fields"
             )
-        
-        # Create book
-        book_data = book_in.model_dump()
-        return self.repository.create(db, book_data)
+        if not any(field == "id" for field, _ in order_by):
+            order_by.append(("id", order_by[-1][1] if order_by else "desc"))
+        return order_by
     
-    def update_book(self, db: Session, book_id: int, book_in: BookUpdate):
-        """Update a book"""
-        # Check if book exists
-        existing_book = self.repository.get_by_id(db, book_id)
-        if not existing_book:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Book with id {book_id} not found"
+    def get_books(self, db: Session, skip: int = 0, limit: int = 100, book_filter: Optional[BookFilter] = None, sort: str = "-created_at"):
+        """Get all books matching the filter, sorted and paginated"""
+        book_filter = book_filter or BookFilter()
+        order_by = self._parse_sort(sort)
+        def load():
+            conditions = self.repository.filter_conditions(book_filter, BookView.__table__.c)
+            rows = book_view_repository.get_rows(
+                db, 
+                skip=skip, 
+                limit=limit, 
+                order_by=order_by,
+                query_modifier=lambda statement: statement.where(*conditions),
+                columns=("payload",)
             )
-        
-        # Check if new title already exists (if title is being updated)
-        if book_in.title and book_in.title != existing_book.title:
-            title_exists = self.repository.get_by_title(db, book_in.title)
-            if title_exists:
+            return book_view_repository.to_json(rows)
+        key = ("get_books", skip, limit, book_filter.model_dump_json(), tuple(order_by))
+        return self._json_response(self._coalesce(db, key, load))
+    
+    def create_book(self, db: Session, book_in: BookCreate):
+        """Create a new book"""
+        def write(db: Session):
+            # Check if title already exists
+            existing_book = self.repository.get_by_title(db, book_in.title)
+            if existing_book:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Book with title '{book_in.title}' already exists"
                 )
-        
-        # Update only provided fields
-        update_data = book_in.model_dump(exclude_unset=True)
-        return self.repository.update(db, book_id, update_data)
+
+            # Create book
+            book_data = book_in.model_dump()
+            version = cache_version_repository.bump(db, "books")
+            book = self.repository.create(db, book_data)
+            write_coordinator.after_commit(db, search_indexes.upsert, "books", version, book.id, book.title)
+            write_coordinator.after_commit(db, related_books_service.upsert, row_data(book))
+            write_coordinator.after_commit(db, event_hub.publish, "books", "created", book.id, row_data(book))
+            return BookSchema.model_validate(book)
+        return write_coordinator.run(db, write)
+    
+    def update_book(self, db: Session, book_id: int, book_in: BookUpdate):
+        """Update a book"""
+        def write(db: Session):
+            # Check if book exists
+            existing_book = self.repository.get_by_id(db, book_id)
+            if not existing_book:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Book with id {book_id} not found"
+                )
+
+            # Check if new title already exists (if title is being updated)
+            if book_in.title and book_in.title != existing_book.title:
+                title_exists = self.repository.get_by_title(db, book_in.title)
+                if title_exists:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Book with title '{book_in.title}' already exists"
+                    )
+
+            # Update only provided fields
+            update_data = book_in.model_dump(exclude_unset=True)
+            version = cache_version_repository.bump(db, "books")
+            book = self.repository.update(db, book_id, update_data)
+            write_coordinator.after_commit(db, search_indexes.upsert, "books", version, book.id, book.title)
+            write_coordinator.after_commit(db, related_books_service.upsert, row_data(book))
+            write_coordinator.after_commit(db, event_hub.publish, "books", "updated", book.id, row_data(book))
+            return BookSchema.model_validate(book)
+        return write_coordinator.run(db, write)
     
     def delete_book(self, db: Session, book_id: int):
         """Delete a book"""
-        success = self.repository.delete(db, book_id)
-        if not success:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Book with id {book_id} not found"
-            )
-        return {"message": "Book deleted successfully"}
+        def write(db: Session):
+            version = cache_version_repository.bump(db, "books")
+            success = self.repository.delete(db, book_id)
+            if not success:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Book with id {book_id} not found"
+                )
+            write_coordinator.after_commit(db, search_indexes.remove, "books", version, book_id)
+            write_coordinator.after_commit(db, related_books_service.remove, book_id)
+            write_coordinator.after_commit(db, event_hub.publish, "books", "deleted", book_id)
+            return {"message": "Book deleted successfully"}
+        return write_coordinator.run(db, write)
     
     def get_books_by_author(self, db: Session, author_id: int, skip: int = 0, limit: int = 100):
         """Get all books by a specific author"""
-        return self.repository.get_by_author(db, author_id, skip=skip, limit=limit)
+        def load():
+            rows = book_view_repository.get_by_author(db, author_id, skip=skip, limit=limit)
+            return book_view_repository.to_json(rows)
+        return self._json_response(self._coalesce(db, ("get_books_by_author", author_id, skip, limit), load))
     
     def get_books_by_category(self, db: Session, category_id: int, skip: int = 0, limit: int = 100):
         """Get all books by a specific category"""
-        return self.repository.get_by_category(db, category_id, skip=skip, limit=limit)
+        def load():
+            rows = book_view_repository.get_by_category(db, category_id, skip=skip, limit=limit)
+            return book_view_repository.to_json(rows)
+        return self._json_response(self._coalesce(db, ("get_books_by_category", category_id, skip, limit), load))
     
-    def search_books(self, db: Session, keyword: str, skip: int = 0, limit: int = 100):
-        """Search books by title keyword"""
-        return self.repository.search_by_title(db, keyword, skip=skip, limit=limit)
+    def get_related_books(self, db: Session, book_id: int, limit: int = 10):
+        """
+        Get the books most related to a book, best first
+
+        Reads the precomputed neighbour list, then the view rows of the
+        book and its neighbours in one query. Books deleted since the index
+        was built are skipped.
+        """
+        def load():
+            pairs = related_books_service.related(db, book_id, settings.RELATED_BOOKS_K)
+            ids = [id for id, _ in pairs or []]
+            rows = book_view_repository.get_payloads_by_ids(db, [book_id] + ids)
+            if book_id not in rows:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Book with id {book_id} not found")
+            if pairs is None:
+                # Written in another worker since the last build
+                book = self.repository.get_by_id(db, book_id)
+                ids = [id for id, _ in related_books_service.score(db, row_data(book), settings.RELATED_BOOKS_K)]
+                rows.update(book_view_repository.get_payloads_by_ids(db, ids))
+            return book_view_repository.to_json([rows[id] for id in ids if id in rows][:limit])
+        return self._json_response(self._coalesce(db, ("get_related_books", book_id, limit), load))
+    
+    def search_books(self, db: Session, keyword: str, skip: int = 0, limit: int = 100, fuzzy: bool = False):
+        """Search books by title keyword (or by title similarity when fuzzy)"""
+        def load():
+            if not fuzzy:
+                rows = book_view_repository.search_by_title(db, keyword, skip=skip, limit=limit)
+            else:
+                if uses_pg_trgm(db):
+                    ids = [book.id for book in self.repository.fuzzy_search_by_title(db, keyword, skip=skip, limit=limit)]
+                else:
+                    ids = fuzzy_search_service.search(db, "books", keyword, skip=skip, limit=limit)
+                rows = book_view_repository.get_by_ids(db, ids)
+            return book_view_repository.to_json(rows)
+        return self._json_response(self._coalesce(db, ("search_books", keyword, skip, limit, fuzzy), load))
     
     async def upload_cover_image(self, db: Session, book_id: int, file: UploadFile):
         """
@@ -120,15 +282,57 @@ class BookService:
             file_path, url_path = await save_upload_file(file)
             
             # Update book with new cover image URL
-            updated_book = self.repository.update(db, book_id, {"cover_image": url_path})
-            
-            return updated_book
+            return await write_coordinator.run_async(db, lambda db: self._set_cover(db, book_id, url_path))
             
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to upload cover image: {str(e)}"
             )
-
+    
+    def _set_cover(self, db: Session, book_id: int, url_path: str):
+        """Point a book at a new cover image and propagate the change (run as a write)"""
+        version = cache_version_repository.bump(db, "books")
+        updated_book = self.repository.update(db, book_id, {"cover_image": url_path})
+        write_coordinator.after_commit(db, search_indexes.upsert, "books", version, updated_book.id, updated_book.title)
+        write_coordinator.after_commit(db, event_hub.publish, "books", "cover", updated_book.id, row_data(updated_book))
+        return BookSchema.model_validate(updated_book)
+    
+    def enqueue_cover_upload(self, db: Session, book_id: int, file: UploadFile):
+        """
+        Stage a cover image and process it in a background job
+        
+        Only the cheap checks run in the request; moving the file, removing
+        the old cover and updating the book happen in the "cover" job.
+        
+        Returns:
+            The queued job
+        """
+        if not self.repository.get_by_id(db, book_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Book with id {book_id} not found"
+            )
+        staged_path = stage_upload_file(file, settings.UPLOAD_STAGING_DIR)
+        return job_service.enqueue(db, "cover", {"book_id": book_id, "staged_path": staged_path})
+    
+    def process_cover_job(self, db: Session, payload: dict) -> dict:
+        """Handler of "cover" jobs queued by enqueue_cover_upload"""
+        book = self.repository.get_by_id(db, payload["book_id"])
+        if not book:
+            delete_file(payload["staged_path"])
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Book with id {payload['book_id']} not found"
+            )
+        
+        file_path, url_path = promote_staged_file(payload["staged_path"])
+        old_cover = book.cover_image
+        if old_cover != url_path:
+            write_coordinator.run(db, lambda db: self._set_cover(db, book.id, url_path))
+            if old_cover:
+                delete_file(get_file_path_from_url(old_cover))
+        return {"cover_image": url_path}
 
 book_service = BookService()
+job_service.register("cover")(book_service.process_cover_job)
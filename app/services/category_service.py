@@ -1,8 +1,16 @@
 from typing import Optional
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
 from app.repositories.category_repository import category_repository
+from app.repositories.book_repository import book_repository
+from app.repositories.dimension_cache import category_cache
+from app.db.write_coordinator import write_coordinator
+from app.services.index_service import search_indexes
+from app.core.pubsub import event_hub
+from app.services.related_service import related_books_service
+from app.repositories.change_log_repository import row_data
 from app.schemas.category import CategoryCreate, CategoryUpdate
 
 
@@ -24,54 +32,122 @@ class CategoryService:
     
     def get_categories(self, db: Session, skip: int = 0, limit: int = 100):
         """Get all categories with pagination"""
-        return self.repository.get_all(db, skip=skip, limit=limit, order_by="name")
+        return self.repository.get_rows(db, skip=skip, limit=limit, order_by=[("name", "asc")], as_dict=True)
     
     def create_category(self, db: Session, category_in: CategoryCreate):
         """Create a new category"""
-        # Check if name already exists
-        existing_category = self.repository.get_by_name(db, category_in.name)
-        if existing_category:
+        def write(db: Session):
+            # Check if name already exists
+            existing_category = self.repository.get_by_name(db, category_in.name)
+            if existing_category:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Category with name '{category_in.name}' already exists"
+                )
+
+            # Create category
+            category_data = category_in.model_dump()
+            version = category_cache.invalidate(db)
+            category = self.repository.create(db, category_data)
+            write_coordinator.after_commit(db, search_indexes.upsert, "categories", version, category.id, category.name)
+            write_coordinator.after_commit(db, event_hub.publish, "categories", "created", category.id, row_data(category))
+            return category
+        try:
+            return write_coordinator.run(db, write)
+        except IntegrityError:
+            # The name was taken by a concurrent write after the check
+            db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Category with name '{category_in.name}' already exists"
             )
-        
-        # Create category
-        category_data = category_in.model_dump()
-        return self.repository.create(db, category_data)
     
     def update_category(self, db: Session, category_id: int, category_in: CategoryUpdate):
         """Update a category"""
-        # Check if category exists
-        existing_category = self.repository.get_by_id(db, category_id)
-        if not existing_category:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Category with id {category_id} not found"
-            )
-        
-        # Check if new name already exists (if name is being updated)
-        if category_in.name and category_in.name != existing_category.name:
-            name_exists = self.repository.get_by_name(db, category_in.name)
-            if name_exists:
+        def write(db: Session):
+            # Check if category exists
+            existing_category = self.repository.get_by_id(db, category_id)
+            if not existing_category:
                 raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Category with name '{category_in.name}' already exists"
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Category with id {category_id} not found"
                 )
-        
-        # Update only provided fields
-        update_data = category_in.model_dump(exclude_unset=True)
-        return self.repository.update(db, category_id, update_data)
+
+            # Check if new name already exists (if name is being updated)
+            if category_in.name and category_in.name != existing_category.name:
+                name_exists = self.repository.get_by_name(db, category_in.name)
+                if name_exists:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Category with name '{category_in.name}' already exists"
+                    )
+
+            # Update only provided fields
+            update_data = category_in.model_dump(exclude_unset=True)
+            version = category_cache.invalidate(db)
+            category = self.repository.update(db, category_id, update_data)
+            write_coordinator.after_commit(db, search_indexes.upsert, "categories", version, category.id, category.name)
+            write_coordinator.after_commit(db, event_hub.publish, "categories", "updated", category.id, row_data(category))
+            return category
+        try:
+            return write_coordinator.run(db, write)
+        except IntegrityError:
+            # The name was taken by a concurrent write after the check
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Category with name '{category_in.name}' already exists"
+            )
     
     def delete_category(self, db: Session, category_id: int):
         """Delete a category"""
-        success = self.repository.delete(db, category_id)
-        if not success:
+        def write(db: Session):
+            version = category_cache.invalidate(db)
+            success = self.repository.delete(db, category_id)
+            if not success:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Category with id {category_id} not found"
+                )
+            write_coordinator.after_commit(db, search_indexes.remove, "categories", version, category_id)
+            write_coordinator.after_commit(db, event_hub.publish, "categories", "deleted", category_id)
+            return {"message": "Category deleted successfully"}
+        return write_coordinator.run(db, write)
+    
+    def merge_category(self, db: Session, category_id: int, target_id: int):
+        """
+        Move every book of a category to another one, then delete it
+
+        The books are reassigned with one set-based UPDATE in the same
+        transaction as the delete (see BookRepository.reassign), instead of
+        one book update per book. As with authors, the moved books get no
+        per-book stream event; they are in the change log.
+        """
+        if category_id == target_id:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Category with id {category_id} not found"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cannot merge a category into itself"
+            )
+        
+        def write(db: Session):
+            for id in (category_id, target_id):
+                if not self.repository.get_by_id(db, id):
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail=f"Category with id {id} not found"
+                    )
+            version = category_cache.invalidate(db)
+            book_ids = book_repository.reassign(db, "category_id", category_id, target_id)
+            self.repository.delete(db, category_id)
+            write_coordinator.after_commit(db, search_indexes.remove, "categories", version, category_id)
+            write_coordinator.after_commit(
+                db, event_hub.publish, "categories", "merged", category_id, {"into": target_id, "books": len(book_ids)}
             )
-        return {"message": "Category deleted successfully"}
+            write_coordinator.after_commit(db, event_hub.publish, "categories", "deleted", category_id)
+            return book_ids
+        book_ids = write_coordinator.run(db, write)
+        related_books_service.refresh_books(db, book_ids)
+        return {"message": "Category merged successfully", "target_id": target_id, "books_moved": len(book_ids)}
     
     def search_categories(self, db: Session, keyword: str, skip: int = 0, limit: int = 100):
         """Search categories by name keyword"""
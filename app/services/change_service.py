@@ -0,0 +1,35 @@
+from typing import Optional
+from sqlalchemy.orm import Session
+
+from app.repositories.change_log_repository import change_log_repository
+from app.schemas.change import Change, ChangePage
+
+
+class ChangeService:
+    """Service layer for the incremental change feed"""
+
+    def get_changes(self, db: Session, since: int = 0, limit: int = 100, entity: Optional[str] = None) -> ChangePage:
+        """
+        Get one page of changes after a sequence number
+
+        Clients store `next_since` and pass it back as `since` until
+        `has_more` is false. Each entity is reported with its full row on
+        upsert and as a tombstone (data = null) on delete.
+
+        Note: on Postgres sequence numbers are assigned before commit, so
+        a long transaction may commit a lower seq after a higher one is
+        already visible. Clients that need strict completeness should
+        re-read a small window below their cursor.
+        """
+        # Fetch one extra row to know whether another page follows
+        rows = change_log_repository.get_since(db, since=since, limit=limit + 1, entity=entity)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return ChangePage(
+            changes=[Change.model_validate(row) for row in rows],
+            next_since=rows[-1].seq if rows else since,
+            has_more=has_more,
+        )
+
+
+change_service = ChangeService()
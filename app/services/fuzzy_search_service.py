@@ -0,0 +1,41 @@
+from typing import List
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.trigram import TrigramIndex
+from app.models.author import Author
+from app.models.book import Book
+from app.services.index_service import IndexService, search_indexes
+
+
+class FuzzySearchService(IndexService):
+    """
+    Service layer for typo-tolerant search on databases without pg_trgm
+
+    Keeps an in-memory trigram index over book titles and author names;
+    Postgres uses pg_trgm GIN indexes in the repositories instead.
+    """
+
+    columns = {
+        "books": Book.title,
+        "authors": Author.name,
+    }
+    index_class = TrigramIndex
+
+    @property
+    def memory_budget_mb(self) -> float:
+        return settings.FUZZY_MEMORY_BUDGET_MB
+
+    def search(self, db: Session, name: str, keyword: str, skip: int = 0, limit: int = 100) -> List[int]:
+        """Get the IDs most similar to a keyword, best first"""
+        index = self.get_index(db, name)
+        matches = index.search(keyword, settings.FUZZY_SIMILARITY_THRESHOLD, skip + limit)
+        return [id for id, _ in matches[skip:]]
+
+
+def uses_pg_trgm(db: Session) -> bool:
+    """Whether fuzzy search can be delegated to pg_trgm"""
+    return db.get_bind().dialect.name == "postgresql"
+
+
+fuzzy_search_service = search_indexes.register(FuzzySearchService())
@@ -0,0 +1,117 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.idempotency_key import IdempotencyKey
+from app.repositories.idempotency_repository import idempotency_repository
+
+
+# Response headers that belong to the original response only
+UNSTORED_HEADERS = {"date", "server", "set-cookie"}
+
+
+class IdempotencyService:
+    """
+    Stored responses of requests sent with an Idempotency-Key header
+
+    The first request with a key takes it and runs; its response is stored
+    for IDEMPOTENCY_TTL_SECONDS and replayed to every retry with the same
+    key and the same request (method, path, query and body). Entries live
+    in the primary database, so retries are deduplicated across workers.
+    Every method opens its own short session: callers hold no connection
+    while the request itself runs or while a duplicate waits.
+    """
+
+    def __init__(self):
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+
+    @staticmethod
+    def fingerprint(method: str, path: str, query: bytes, body: bytes) -> str:
+        """Hash identifying the request a key was first used with"""
+        digest = hashlib.sha256()
+        for part in (method.encode(), path.encode(), query, body):
+            digest.update(len(part).to_bytes(8, "big"))
+            digest.update(part)
+        return digest.hexdigest()
+
+    def acquire(self, key: str, fingerprint: str) -> Tuple[bool, Optional[IdempotencyKey]]:
+        """
+        Take a key for a request about to run
+
+        Returns:
+            (True, None) if the caller must run the request and then call
+            `complete` or `release`, else (False, entry) with the existing
+            entry (None if it went away meanwhile: try again)
+        """
+        self._maybe_purge()
+        db = SessionLocal()
+        try:
+            return idempotency_repository.acquire(
+                db, key, fingerprint, settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_LOCK_SECONDS
+            )
+        finally:
+            db.close()
+
+    def complete(self, key: str, status: int, headers: List[Tuple[bytes, bytes]], body: bytes) -> None:
+        """Store the response of a key's request"""
+        stored = [
+            [name.decode("latin-1"), value.decode("latin-1")]
+            for name, value in headers
+            if name.decode("latin-1").lower() not in UNSTORED_HEADERS
+        ]
+        db = SessionLocal()
+        try:
+            idempotency_repository.complete(db, key, status, stored, body, settings.IDEMPOTENCY_TTL_SECONDS)
+        finally:
+            db.close()
+        self.record("stored")
+
+    def release(self, key: str) -> None:
+        """Give up a key without a stored response (the request failed)"""
+        db = SessionLocal()
+        try:
+            idempotency_repository.release(db, key)
+        finally:
+            db.close()
+        self.record("released")
+
+    def _maybe_purge(self) -> None:
+        with self._lock:
+            if time.monotonic() - self._last_purge < settings.IDEMPOTENCY_PURGE_INTERVAL:
+                return
+            self._last_purge = time.monotonic()
+        self.purge()
+
+    def purge(self) -> int:
+        """Delete expired entries and trim the store to IDEMPOTENCY_MAX_KEYS"""
+        db = SessionLocal()
+        try:
+            deleted = idempotency_repository.purge(db, settings.IDEMPOTENCY_MAX_KEYS)
+        finally:
+            db.close()
+        self.record("purged", deleted)
+        return deleted
+
+    def record(self, outcome: str, count: int = 1) -> None:
+        with self._lock:
+            self._counts[outcome] += count
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+        return {
+            "enabled": settings.IDEMPOTENCY_ENABLED,
+            "ttl_seconds": settings.IDEMPOTENCY_TTL_SECONDS,
+            "max_keys": settings.IDEMPOTENCY_MAX_KEYS,
+            "max_response_bytes": settings.IDEMPOTENCY_MAX_RESPONSE_BYTES,
+            "counts": counts,
+        }
+
+
+idempotency_service = IdempotencyService()
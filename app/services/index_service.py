@@ -0,0 +1,139 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.repositories.cache_version_repository import cache_version_repository
+from app.services.job_service import job_service
+
+
+class IndexService(ABC):
+    """
+    Base class for services that keep in-memory indexes over a table column
+
+    Subclasses set `columns` (cache version name -> indexed column),
+    `index_class` (built with `build(rows, budget)`, updated with
+    `add(id, label, budget)` / `remove(id)`, exposing `size_bytes`) and
+    `memory_budget_mb`.
+
+    Writes made by this worker are applied incrementally through
+    `upsert`/`remove`; writes made by other workers are picked up by
+    comparing the tables' version stamps at most once every
+    `SEARCH_INDEX_CHECK_INTERVAL` seconds and rebuilding the affected index.
+    """
+
+    columns: Dict = {}
+    index_class = None
+
+    def __init__(self):
+        self._indexes = {name: self.index_class() for name in self.columns}
+        self._versions: Dict[str, Optional[int]] = {name: None for name in self.columns}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    @abstractmethod
+    def memory_budget_mb(self) -> float:
+        """Memory all the indexes of the service may use together"""
+
+    def _budget(self, name: str) -> int:
+        """Bytes left for one index once the others are accounted for"""
+        used = sum(index.size_bytes for other, index in self._indexes.items() if other != name)
+        return int(self.memory_budget_mb * 1024 * 1024) - used
+
+    def _is_fresh(self) -> bool:
+        return (
+            None not in self._versions.values()
+            and time.monotonic() - self._checked_at < settings.SEARCH_INDEX_CHECK_INTERVAL
+        )
+
+    def get_index(self, db: Session, name: str):
+        """Get an index, rebuilding the stale ones first"""
+        if not self._is_fresh():
+            with self._lock:
+                # Another thread may have refreshed while we were waiting
+                if not self._is_fresh():
+                    self._refresh(db)
+        return self._indexes[name]
+
+    def _refresh(self, db: Session) -> None:
+        """Rebuild the indexes whose version stamp changed"""
+        versions = cache_version_repository.get_versions(db)
+        for name, column in self.columns.items():
+            version = versions.get(name, 0)
+            # Only move forward: a lagging read replica may report an older
+            # version than the one this worker already applied
+            if self._versions[name] is None or version > self._versions[name]:
+                rows = db.execute(select(column.class_.id, column))
+                self._indexes[name] = self.index_class.build(rows, self._budget(name))
+                self._versions[name] = version
+        self._checked_at = time.monotonic()
+
+    def _apply(self, name: str, version: int) -> bool:
+        """
+        Check that a local write directly follows the indexed version
+
+        If another write landed in between (here or in another worker) the
+        index is marked stale and rebuilt on the next lookup instead.
+        """
+        if self._versions[name] != version - 1:
+            self._versions[name] = None
+            return False
+        self._versions[name] = version
+        return True
+
+    def upsert(self, name: str, version: int, id: int, label: str) -> None:
+        """Apply a committed create/update to the index"""
+        if name not in self.columns:
+            return
+        with self._lock:
+            if self._apply(name, version):
+                self._indexes[name].add(id, label, self._budget(name))
+
+    def remove(self, name: str, version: int, id: int) -> None:
+        """Apply a committed delete to the index"""
+        if name not in self.columns:
+            return
+        with self._lock:
+            if self._apply(name, version):
+                self._indexes[name].remove(id)
+
+
+class SearchIndexes:
+    """Fan-out of committed writes to every registered in-memory index"""
+
+    def __init__(self):
+        self._services: List[IndexService] = []
+
+    def register(self, service: IndexService) -> IndexService:
+        self._services.append(service)
+        return service
+
+    def upsert(self, name: str, version: int, id: int, label: str) -> None:
+        for service in self._services:
+            service.upsert(name, version, id, label)
+
+    def remove(self, name: str, version: int, id: int) -> None:
+        for service in self._services:
+            service.remove(name, version, id)
+
+
+search_indexes = SearchIndexes()
+
+
+@job_service.register("reindex")
+def reindex(db: Session, payload: dict) -> dict:
+    """
+    Handler of "reindex" jobs
+
+    Bumps the version stamps of the given tables (all indexed tables by
+    default), so every worker rebuilds its in-memory indexes and caches on
+    its next lookup.
+    """
+    names = payload.get("names") or ["books", "authors", "categories"]
+    versions = {name: cache_version_repository.bump(db, name) for name in names}
+    db.commit()
+    return {"versions": versions}
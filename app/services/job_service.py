@@ -0,0 +1,212 @@
+import logging
+import os
+import random
+import socket
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.repositories.job_repository import job_repository
+
+
+logger = logging.getLogger(__name__)
+
+# handler(db, payload) -> result (JSON-serializable) or None
+JobHandler = Callable[[Session, Dict[str, Any]], Optional[Dict[str, Any]]]
+
+
+class JobService:
+    """
+    Background jobs persisted in the app's own database
+
+    Handlers are registered per job type. Worker threads (started with
+    `start`, or in a separate process with `python -m app.worker`) claim
+    due jobs, run them in their own session and record the result.
+
+    A handler that raises is retried with exponential backoff (plus
+    jitter) until `max_attempts`; an HTTPException below 500 is a
+    permanent failure (e.g. the book was deleted) and is not retried.
+    Concurrency caps per job type (`JOB_CONCURRENCY`) apply per process.
+    While a handler runs, a heartbeat thread renews the job's lease, so a
+    long job is not requeued by the reaper while it is still running.
+    """
+
+    def __init__(self):
+        self.handlers: Dict[str, JobHandler] = {}
+        self._running: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    def register(self, type: str) -> Callable[[JobHandler], JobHandler]:
+        """Decorator registering the handler of a job type"""
+        def decorator(handler: JobHandler) -> JobHandler:
+            self.handlers[type] = handler
+            return handler
+        return decorator
+
+    def enqueue(self, db: Session, type: str, payload: Dict[str, Any], max_attempts: Optional[int] = None):
+        """Queue a job and wake up the local workers"""
+        if type not in self.handlers:
+            raise ValueError(f"No handler registered for job type '{type}'")
+        job = job_repository.enqueue(db, type, payload, max_attempts or settings.JOB_MAX_ATTEMPTS)
+        self._wakeup.set()
+        return job
+
+    def get_job(self, db: Session, job_id: int):
+        """Get a job by ID"""
+        job = job_repository.get_by_id(db, job_id)
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Job with id {job_id} not found"
+            )
+        return job
+
+    def _cap(self, type: str) -> int:
+        """Maximum number of jobs of a type running at once in this process"""
+        return settings.JOB_CONCURRENCY.get(type, settings.JOB_WORKERS or 1)
+
+    def backoff(self, attempts: int) -> float:
+        """Seconds to wait before the next attempt"""
+        delay = min(settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.JOB_RETRY_MAX_SECONDS)
+        return delay * random.uniform(0.5, 1.0)
+
+    def run_once(self) -> bool:
+        """
+        Claim and run one due job
+
+        Returns:
+            True if a job was run, False if there was nothing to do
+        """
+        db = SessionLocal()
+        try:
+            with self._lock:
+                # Reserve a slot before claiming so caps hold across threads
+                types = [type for type in self.handlers if self._running.get(type, 0) < self._cap(type)]
+                for type in types:
+                    self._running[type] = self._running.get(type, 0) + 1
+            job = None
+            try:
+                job = job_repository.claim(db, types, self.worker_id) if types else None
+            finally:
+                with self._lock:
+                    for type in types:
+                        if job is None or type != job.type:
+                            self._running[type] -= 1
+            if job is None:
+                return False
+
+            try:
+                self._execute(db, job)
+            finally:
+                with self._lock:
+                    self._running[job.type] -= 1
+            return True
+        finally:
+            db.close()
+
+    def _heartbeat(self, job_id: int, done: threading.Event) -> None:
+        """Renew the lease of a running job until it is done"""
+        while not done.wait(settings.JOB_LEASE_SECONDS / 3):
+            db = SessionLocal()
+            try:
+                if not job_repository.heartbeat(db, job_id, self.worker_id):
+                    logger.warning("Job %s lost its lease while running", job_id)
+                    return
+            except Exception:
+                logger.exception("Job heartbeat error")
+            finally:
+                db.close()
+
+    @contextmanager
+    def _lease(self, job_id: int) -> Iterator[None]:
+        """Keep a job's lease renewed while the block runs"""
+        done = threading.Event()
+        thread = threading.Thread(target=self._heartbeat, args=(job_id, done), name=f"job-heartbeat-{job_id}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+            thread.join()
+
+    def _execute(self, db: Session, job) -> None:
+        handler = self.handlers[job.type]
+        try:
+            with self._lease(job.id):
+                result = handler(db, job.payload or {})
+        except Exception as e:
+            db.rollback()
+            error = e.detail if isinstance(e, HTTPException) else f"{type(e).__name__}: {e}"
+            permanent = isinstance(e, HTTPException) and e.status_code < 500
+            if permanent or job.attempts >= job.max_attempts:
+                logger.warning("Job %s (%s) failed: %s", job.id, job.type, error)
+                job_repository.fail(db, job, error)
+            else:
+                job_repository.retry(db, job, error, self.backoff(job.attempts))
+            return
+        job_repository.succeed(db, job, result)
+
+    def _work(self) -> None:
+        """Worker thread loop"""
+        while not self._stopping.is_set():
+            try:
+                if self.run_once():
+                    continue
+            except Exception:
+                logger.exception("Job worker error")
+            self._wakeup.wait(settings.JOB_POLL_INTERVAL)
+            self._wakeup.clear()
+
+    def _reap(self) -> None:
+        """Requeue jobs abandoned by dead workers, once per lease period"""
+        while not self._stopping.wait(settings.JOB_LEASE_SECONDS / 2):
+            db = SessionLocal()
+            try:
+                counts = job_repository.requeue_stale(db, settings.JOB_LEASE_SECONDS)
+                if counts["failed"]:
+                    logger.warning("%d jobs failed after their last lease expired", counts["failed"])
+            except Exception:
+                logger.exception("Job reaper error")
+            finally:
+                db.close()
+
+    def start(self, workers: int) -> None:
+        """Start the worker threads of this process"""
+        if workers <= 0 or self._threads:
+            return
+        self._stopping.clear()
+        targets = [self._work] * workers + [self._reap]
+        for i, target in enumerate(targets):
+            thread = threading.Thread(target=target, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the worker threads (running jobs are allowed to finish)"""
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def stats(self, db: Session) -> Dict[str, Any]:
+        with self._lock:
+            running = dict(self._running)
+        return {
+            "worker_id": self.worker_id,
+            "threads": len(self._threads),
+            "running_here": running,
+            "concurrency": settings.JOB_CONCURRENCY,
+            "jobs": job_repository.count_by_status(db),
+        }
+
+
+job_service = JobService()
@@ -0,0 +1,146 @@
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.repositories.book_repository import book_repository
+from app.services.job_service import job_service
+
+if TYPE_CHECKING:
+    from app.core.related import RelatedBooksIndex
+
+# Books moved at once that are still updated in place (upserts cost ~8ms
+# each on a 50k-book index); larger moves queue a rebuild
+RELATED_UPSERT_LIMIT = 100
+
+
+def _index_class():
+    # numpy/scipy add ~130ms to the import of the app; load them on first use
+    from app.core.related import RelatedBooksIndex
+    return RelatedBooksIndex
+
+
+class RelatedBooksService:
+    """
+    Service layer for the precomputed "related books" index
+
+    The index is built in batch (`rebuild`, the "related-index" job or
+    `python -m app.cli rebuild-related-index`) into RELATED_INDEX_DIR and
+    memory-mapped by every worker, which switches to a newer build at most
+    once every `SEARCH_INDEX_CHECK_INTERVAL` seconds. The first lookup
+    builds it when no build exists yet.
+
+    Writes made by this worker are applied to the loaded index right away
+    (`upsert`/`remove`); books written in other workers since the build are
+    scored on the fly until the next build.
+    """
+
+    def __init__(self):
+        self._index: Optional["RelatedBooksIndex"] = None
+        self._build: Optional[str] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._index is not None
+            and time.monotonic() - self._checked_at < settings.SEARCH_INDEX_CHECK_INTERVAL
+        )
+
+    def has_build(self) -> bool:
+        """Whether a saved build exists (loading one is cheap, building one is not)"""
+        return self._index is not None or os.path.exists(os.path.join(settings.RELATED_INDEX_DIR, "CURRENT"))
+
+    def get_index(self, db: Session) -> "RelatedBooksIndex":
+        """Get the index, switching to a newer build (or building one) first"""
+        if not self._is_fresh():
+            with self._lock:
+                if not self._is_fresh():
+                    if _index_class().current_build(settings.RELATED_INDEX_DIR) is None:
+                        self._build_index(db)
+                    self._load()
+                    self._checked_at = time.monotonic()
+        return self._index
+
+    def _build_index(self, db: Session) -> int:
+        index = _index_class().build(
+            book_repository.get_similarity_fields(db), settings.RELATED_BOOKS_K, settings.RELATED_BOOKS_WEIGHTS
+        )
+        index.save(settings.RELATED_INDEX_DIR)
+        return len(index)
+
+    def _load(self) -> None:
+        """Memory-map the current build unless it is already loaded"""
+        build = _index_class().current_build(settings.RELATED_INDEX_DIR)
+        if build != self._build:
+            self._index = _index_class().load(settings.RELATED_INDEX_DIR)
+            self._build = build
+
+    def rebuild(self, db: Session) -> int:
+        """
+        Rebuild the index from the books table
+
+        Lookups keep using the previous build until the new one is saved.
+
+        Returns:
+            Number of books indexed
+        """
+        count = self._build_index(db)
+        with self._lock:
+            self._load()
+            self._checked_at = time.monotonic()
+        return count
+
+    def related(self, db: Session, book_id: int, limit: int) -> Optional[List[Tuple[int, float]]]:
+        """
+        (id, score) pairs of the books most related to an indexed book, best first
+
+        Returns None if the book is not in the index (see `score`).
+        """
+        index = self.get_index(db)
+        with self._lock:
+            return index.related(book_id, limit)
+
+    def score(self, db: Session, book: Dict, limit: int) -> List[Tuple[int, float]]:
+        """Score a book the index does not know against every indexed book"""
+        index = self.get_index(db)
+        with self._lock:
+            return index.score(book, limit)
+
+    def upsert(self, book: Dict) -> None:
+        """Apply a committed create/update to the loaded index"""
+        with self._lock:
+            if self._index is not None:
+                self._index.upsert(book)
+
+    def refresh_books(self, db: Session, book_ids: List[int]) -> None:
+        """
+        Apply a committed bulk change (books moved to another author or category)
+
+        Up to RELATED_UPSERT_LIMIT books are updated in the loaded index;
+        beyond that a rebuild is queued instead.
+        """
+        if not book_ids or self._index is None:
+            return
+        if len(book_ids) > RELATED_UPSERT_LIMIT:
+            job_service.enqueue(db, "related-index", {})
+            return
+        for book in book_repository.get_similarity_fields(db, book_ids):
+            self.upsert(book)
+
+    def remove(self, book_id: int) -> None:
+        """Apply a committed delete to the loaded index"""
+        with self._lock:
+            if self._index is not None:
+                self._index.remove(book_id)
+
+
+related_books_service = RelatedBooksService()
+
+
+@job_service.register("related-index")
+def rebuild_related_index(db: Session, payload: dict) -> dict:
+    """Handler of "related-index" jobs: rebuild the related books index"""
+    return {"books": related_books_service.rebuild(db)}
@@ -0,0 +1,40 @@
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.prefix_index import PrefixIndex
+from app.models.author import Author
+from app.models.book import Book
+from app.models.category import Category
+from app.schemas.suggest import Suggestions, SuggestItem
+from app.services.index_service import IndexService, search_indexes
+
+
+class SuggestService(IndexService):
+    """Service layer for autocomplete suggestions over in-memory prefix indexes"""
+
+    columns = {
+        "books": Book.title,
+        "authors": Author.name,
+        "categories": Category.name,
+    }
+    index_class = PrefixIndex
+
+    @property
+    def memory_budget_mb(self) -> float:
+        return settings.SUGGEST_MEMORY_BUDGET_MB
+
+    def suggest(self, db: Session, q: str, limit: int = 5) -> Suggestions:
+        """Get the top titles, author names and category names starting with q"""
+
+        def items(name: str):
+            index = self.get_index(db, name)
+            return [SuggestItem(id=id, name=label) for id, label in index.search(q, limit)]
+
+        return Suggestions(
+            titles=items("books"),
+            authors=items("authors"),
+            categories=items("categories"),
+        )
+
+
+suggest_service = search_indexes.register(SuggestService())
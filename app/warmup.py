@@ -0,0 +1,131 @@
+"""
+Startup warm-up, run from the app's lifespan before it accepts traffic
+
+Moves first-request costs (opening connections, compiling SQL, loading
+in-memory caches) to startup, so a freshly started worker answers its
+first requests as fast as a warm one.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from fastapi import HTTPException
+from sqlalchemy import text
+
+from app.core.config import Settings
+from app.db.session import SessionLocal, engines
+
+
+logger = logging.getLogger(__name__)
+
+
+def open_connections(app_settings: Settings) -> None:
+    """
+    Open pool connections ahead of the first requests
+
+    The connections are checked out at the same time, so the pools really
+    hold that many once they are returned.
+    """
+    count = min(app_settings.WARMUP_CONNECTIONS, app_settings.DB_POOL_SIZE)
+    for engine in [engines.primary] + engines.replicas:
+        def ping(_):
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+                # Hold the connection until every ping is running
+                time.sleep(0.01)
+        with ThreadPoolExecutor(count) as pool:
+            list(pool.map(ping, range(count)))
+
+
+def compile_statements(app_settings: Settings) -> None:
+    """
+    Run the hot read paths once, on the primary and on a replica
+
+    SQLAlchemy caches compiled statements per engine on first execution;
+    this also exercises the Pydantic serializers of the responses. Unknown
+    IDs are used on purpose: only the statement shapes matter.
+    """
+    from app.services.author_service import author_service
+    from app.services.book_service import book_service
+    from app.services.category_service import category_service
+    from app.services.change_service import change_service
+
+    calls: List[Callable] = [
+        lambda db: book_service.get_books(db, limit=1),
+        lambda db: book_service.get_book(db, 0),
+        lambda db: book_service.get_books_by_author(db, 0, limit=1),
+        lambda db: book_service.get_books_by_category(db, 0, limit=1),
+        lambda db: book_service.search_books(db, "a", limit=1),
+        lambda db: author_service.get_authors(db, limit=1),
+        lambda db: author_service.get_author(db, 0),
+        lambda db: category_service.get_categories(db, limit=1),
+        lambda db: category_service.get_category(db, 0),
+        lambda db: change_service.get_changes(db, 0, limit=1),
+    ]
+    for read_only in ([False, True] if engines.replicas else [False]):
+        db = SessionLocal(info={"read_only": read_only})
+        try:
+            for call in calls:
+                try:
+                    call(db)
+                except HTTPException:
+                    pass
+                except Exception:
+                    logger.exception("Warm-up query failed")
+                    db.rollback()
+        finally:
+            db.close()
+
+
+def load_caches(app_settings: Settings) -> None:
+    """Load the in-memory dimension caches and search indexes"""
+    from app.repositories.dimension_cache import author_cache, category_cache
+    from app.services.fuzzy_search_service import fuzzy_search_service
+    from app.services.related_service import related_books_service
+    from app.services.suggest_service import suggest_service
+
+    db = SessionLocal(info={"read_only": True})
+    try:
+        author_cache.get(db, 0)
+        category_cache.get(db, 0)
+        for name in suggest_service.columns:
+            suggest_service.get_index(db, name)
+        if db.get_bind().dialect.name != "postgresql":
+            for name in fuzzy_search_service.columns:
+                fuzzy_search_service.get_index(db, name)
+        # Map an existing build only; building one is left to the job/CLI
+        if related_books_service.has_build():
+            related_books_service.get_index(db)
+    finally:
+        db.close()
+
+
+STEPS = [
+    ("connections", open_connections, None),
+    ("statements", compile_statements, None),
+    ("caches", load_caches, "WARMUP_CACHES"),
+]
+
+
+def warm_up(app_settings: Settings) -> Dict[str, float]:
+    """
+    Run the warm-up steps
+
+    A failing step is logged and skipped: a worker that cannot warm up
+    still starts (its first requests are just slower).
+
+    Returns:
+        Duration of each step in ms
+    """
+    timings = {}
+    for name, step, flag in STEPS:
+        if flag is not None and not getattr(app_settings, flag):
+            continue
+        started = time.perf_counter()
+        try:
+            step(app_settings)
+        except Exception:
+            logger.exception("Warm-up step %s failed", name)
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+    return timings
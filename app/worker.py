@@ -0,0 +1,32 @@
+"""
+Standalone background job worker
+
+Run with `python -m app.worker` (set JOB_WORKERS=0 on the web processes to
+keep slow jobs off them entirely).
+"""
+import logging
+import signal
+import threading
+
+from app.core.config import settings
+from app.services.job_service import job_service
+
+# Importing the services registers their job handlers
+import app.services.backup_service  # noqa: F401
+import app.services.book_service  # noqa: F401
+import app.services.index_service  # noqa: F401
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+
+    job_service.start(max(settings.JOB_WORKERS, 1))
+    stop.wait()
+    job_service.stop()
+
+
+if __name__ == "__main__":
+    main()
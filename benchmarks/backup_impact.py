@@ -0,0 +1,149 @@
+"""
+Online backup benchmark: backup duration and request latency during it
+
+Fills a throwaway SQLite database, then runs reader and writer threads
+(book reads by ID, single-book updates) and measures their latency with
+no backup running, during a paced backup (BACKUP_PAGES_PER_STEP /
+BACKUP_STEP_SLEEP_MS) and during a one-step backup, next to the duration
+of each backup. Run it once per journal mode.
+
+Usage (from the repository root):
+    python benchmarks/backup_impact.py --books 200000 --readers 4 --writers 1
+    SQLITE_JOURNAL_MODE=wal python benchmarks/backup_impact.py --books 200000
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+WORK_DIR = tempfile.mkdtemp()
+os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{os.path.join(WORK_DIR, 'bench.db')}"
+os.environ.setdefault("SLOW_QUERY_LOG_ENABLED", "false")
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.session import SessionLocal, engines  # noqa: E402
+from app.models.author import Author  # noqa: E402
+from app.models.book import Book  # noqa: E402
+from app.models.category import Category  # noqa: E402
+import app.models  # noqa: E402,F401
+from app.repositories.book_repository import book_repository  # noqa: E402
+from app.services.backup_service import backup_service  # noqa: E402
+
+
+class Load:
+    """Reader/writer threads recording per-operation latency in ms"""
+
+    def __init__(self, books: int, readers: int, writers: int):
+        self.books = books
+        self.latencies = {"read": [], "write": []}
+        self.stopping = threading.Event()
+        self.threads = (
+            [threading.Thread(target=self.run, args=("read",)) for _ in range(readers)]
+            + [threading.Thread(target=self.run, args=("write",)) for _ in range(writers)]
+        )
+
+    def run(self, kind: str) -> None:
+        db = SessionLocal()
+        try:
+            while not self.stopping.is_set():
+                started = time.perf_counter()
+                if kind == "read":
+                    book_repository.get_by_id(db, random.randint(1, self.books))
+                    db.rollback()
+                else:
+                    book_repository.update(db, random.randint(1, self.books), {"published_year": random.randint(1900, 2024)})
+                    # Think time, so writers do not monopolize the lock
+                    time.sleep(0.002)
+                self.latencies[kind].append((time.perf_counter() - started) * 1000)
+        finally:
+            db.close()
+
+    def measure(self, during) -> dict:
+        """Latencies while `during()` runs"""
+        self.latencies = {"read": [], "write": []}
+        result = during()
+        report = {}
+        for kind, values in self.latencies.items():
+            if values:
+                values = sorted(values)
+                report[kind] = {
+                    "ops": len(values),
+                    "p50_ms": round(statistics.median(values), 2),
+                    "p99_ms": round(values[int(len(values) * 0.99) - 1], 2),
+                    "max_ms": round(values[-1], 2),
+                }
+        return {"result": result, **report}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--books", type=int, default=200000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=1)
+    parser.add_argument("--baseline-seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(engines.primary)
+    db = SessionLocal()
+    db.add(Author(id=1, name="author"))
+    db.add(Category(id=1, name="category"))
+    for start in range(0, args.books, 10000):
+        db.execute(insert(Book), [
+            {"title": f"book {i}", "description": "description " * 20, "published_year": 2000, "author_id": 1, "category_id": 1}
+            for i in range(start, min(start + 10000, args.books))
+        ])
+    db.commit()
+    db.close()
+    print(f"database: {os.path.getsize(os.path.join(WORK_DIR, 'bench.db')) / 1024 / 1024:.1f} MB, {args.books} books,"
+          f" journal mode {settings.SQLITE_JOURNAL_MODE or 'delete'}")
+
+    # Writes go to the books table only: keep the change log and view out of the way
+    book_repository.track_changes = False
+    load = Load(args.books, args.readers, args.writers)
+    for thread in load.threads:
+        thread.start()
+    backups = os.path.join(WORK_DIR, "backups")
+    try:
+        runs = [("no backup", lambda: time.sleep(args.baseline_seconds))]
+        runs.append((
+            f"paced backup ({settings.BACKUP_PAGES_PER_STEP} pages, {settings.BACKUP_STEP_SLEEP_MS} ms sleep)",
+            lambda: backup_service.backup(backups),
+        ))
+
+        def one_step():
+            pages, settings.BACKUP_PAGES_PER_STEP = settings.BACKUP_PAGES_PER_STEP, -1
+            try:
+                return backup_service.backup(backups)
+            finally:
+                settings.BACKUP_PAGES_PER_STEP = pages
+        runs.append(("one-step backup", one_step))
+
+        for name, during in runs:
+            report = load.measure(during)
+            manifest = report.pop("result")
+            print(name)
+            if manifest:
+                print(f"  backup: {manifest['database_ms']:.0f} ms, {manifest['steps']} steps, {manifest['restarts']} restarts"
+                      f"{', finished in one step' if manifest.get('single_step') else ''}")
+            for kind in ("read", "write"):
+                if kind in report:
+                    print(f"  {kind:<5}: {report[kind]}")
+    finally:
+        load.stopping.set()
+        for thread in load.threads:
+            thread.join()
+        engines.dispose()
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
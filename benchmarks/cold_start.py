@@ -0,0 +1,116 @@
+"""
+Cold-start benchmark: process start to first successful API response
+
+Starts `uvicorn app.main:app` in a fresh process, polls until the first
+request succeeds and records how long that took, plus the worker's own
+breakdown from GET /api/v1/admin/startup. Each run is appended to
+benchmarks/cold_start.jsonl with the git commit, so regressions show up
+when the file is compared over time.
+
+Usage (from the repository root, with the database migrated):
+    python benchmarks/cold_start.py --runs 5
+    python benchmarks/cold_start.py --path /api/v1/books/?limit=20 --no-record
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS = os.path.join(ROOT, "benchmarks", "cold_start.jsonl")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def get(url: str, timeout: float = 5.0):
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return response.status, response.read()
+
+
+def run_once(path: str, timeout: float) -> dict:
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+    )
+    try:
+        first_ms = None
+        while time.perf_counter() - started < timeout:
+            try:
+                status, _ = get(base + path)
+                if status == 200:
+                    first_ms = (time.perf_counter() - started) * 1000
+                    break
+            except (urllib.error.URLError, ConnectionError, OSError):
+                time.sleep(0.005)
+        if first_ms is None:
+            raise RuntimeError(f"No successful response from {path} within {timeout}s")
+
+        # Latency of the next requests, for comparison with the first one
+        warm = []
+        for _ in range(5):
+            t = time.perf_counter()
+            get(base + path)
+            warm.append((time.perf_counter() - t) * 1000)
+
+        try:
+            breakdown = json.loads(get(base + "/api/v1/admin/startup")[1])
+        except urllib.error.HTTPError:
+            breakdown = None
+        return {
+            "first_response_ms": round(first_ms, 1),
+            "warm_request_ms": round(statistics.median(warm), 2),
+            "server": breakdown,
+        }
+    finally:
+        process.terminate()
+        process.wait(10)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--path", default="/api/v1/books/?limit=20", help="Request whose first success ends the measurement")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--no-record", action="store_true", help=f"Do not append to {os.path.relpath(RESULTS, ROOT)}")
+    args = parser.parse_args()
+
+    runs = [run_once(args.path, args.timeout) for _ in range(args.runs)]
+    for run in runs:
+        print(json.dumps(run))
+    result = {
+        "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "path": args.path,
+        "runs": args.runs,
+        "first_response_ms_median": round(statistics.median(run["first_response_ms"] for run in runs), 1),
+        "warm_request_ms_median": round(statistics.median(run["warm_request_ms"] for run in runs), 2),
+    }
+    print(json.dumps(result))
+    if not args.no_record:
+        with open(RESULTS, "a") as f:
+            f.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
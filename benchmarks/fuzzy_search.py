@@ -0,0 +1,103 @@
+"""
+Fuzzy search benchmark: recall and latency of the in-app trigram index
+
+Fills a throwaway SQLite database with synthetic book titles, builds the
+index through FuzzySearchService (as the first fuzzy search of a worker
+does), then searches titles with one random typo and reports recall@k
+(the misspelled book is in the top k results), query latency and the
+index size. pg_trgm (Postgres) is not covered.
+
+Usage (from the repository root):
+    python benchmarks/fuzzy_search.py --titles 1000000 --queries 500
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DATABASE = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{DATABASE}"
+os.environ.setdefault("SLOW_QUERY_LOG_ENABLED", "false")
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.session import SessionLocal, engines  # noqa: E402
+from app.models.author import Author  # noqa: E402
+from app.models.book import Book  # noqa: E402
+from app.models.category import Category  # noqa: E402
+import app.models  # noqa: E402,F401
+from app.services.fuzzy_search_service import fuzzy_search_service  # noqa: E402
+
+
+def typo(text: str) -> str:
+    """Replace, drop or insert one letter"""
+    i = random.randrange(len(text))
+    kind = random.choice(("replace", "drop", "insert"))
+    if kind == "replace":
+        return text[:i] + random.choice(string.ascii_lowercase) + text[i + 1:]
+    if kind == "drop":
+        return text[:i] + text[i + 1:]
+    return text[:i] + random.choice(string.ascii_lowercase) + text[i:]
+
+
+def percentile(values, p: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(len(values) * p))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--titles", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--vocabulary", type=int, default=50000, help="distinct words titles are made of")
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    words = ["".join(random.choices(string.ascii_lowercase, k=random.randint(3, 9))) for _ in range(args.vocabulary)]
+    titles = [" ".join(random.choices(words, k=random.randint(2, 5))) for _ in range(args.titles)]
+
+    Base.metadata.create_all(engines.primary)
+    db = SessionLocal()
+    db.add(Author(id=1, name="author"))
+    db.add(Category(id=1, name="category"))
+    for start in range(0, args.titles, 10000):
+        db.execute(insert(Book), [
+            {"id": i + 1, "title": titles[i], "published_year": 2000, "author_id": 1, "category_id": 1}
+            for i in range(start, min(start + 10000, args.titles))
+        ])
+    db.commit()
+    print(f"{args.titles} titles, threshold {settings.FUZZY_SIMILARITY_THRESHOLD},"
+          f" budget {settings.FUZZY_MEMORY_BUDGET_MB} MB")
+
+    try:
+        started = time.perf_counter()
+        index = fuzzy_search_service.get_index(db, "books")
+        print(f"build: {time.perf_counter() - started:.1f} s, {index.size_bytes / 1024 / 1024:.0f} MB,"
+              f" {len(index)} indexed, {index.skipped} skipped over budget")
+
+        found = 0
+        latencies = []
+        for id in random.sample(range(1, args.titles + 1), args.queries):
+            query = typo(titles[id - 1])
+            started = time.perf_counter()
+            ids = fuzzy_search_service.search(db, "books", query, limit=args.k)
+            latencies.append((time.perf_counter() - started) * 1000)
+            found += id in ids
+        print(f"recall@{args.k}: {found / args.queries:.3f}")
+        print(f"latency: p50 {percentile(latencies, 0.5):.1f} ms, p95 {percentile(latencies, 0.95):.1f} ms,"
+              f" p99 {percentile(latencies, 0.99):.1f} ms, max {max(latencies):.1f} ms")
+    finally:
+        db.close()
+        engines.dispose()
+        os.remove(DATABASE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark of the ORM read path against the Core row path (get_rows)
+
+Reads 1000-row pages from a throwaway SQLite database with
+BaseRepository.get_all (ORM instances) and BaseRepository.get_rows (Core
+rows), including what the endpoint does with them afterwards (response
+schema validation, or joining the pre-rendered book_view payloads), and
+reports the latency and the peak memory allocated per page.
+
+Usage (from the repository root):
+    python benchmarks/read_path.py --calls 200 --page 1000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DATABASE = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{DATABASE}"
+os.environ.setdefault("SLOW_QUERY_LOG_ENABLED", "false")
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.db.session import SessionLocal, engines  # noqa: E402
+from app.models.author import Author  # noqa: E402
+from app.models.book import Book  # noqa: E402
+from app.models.category import Category  # noqa: E402
+import app.models  # noqa: E402,F401
+from app.repositories.author_repository import author_repository  # noqa: E402
+from app.repositories.book_repository import book_repository  # noqa: E402
+from app.repositories.book_view_repository import book_view_repository  # noqa: E402
+from app.schemas.author import Author as AuthorSchema  # noqa: E402
+from app.schemas.book import BookInDBBase  # noqa: E402
+
+
+def measure(name: str, calls: int, fn) -> dict:
+    db = SessionLocal()
+    try:
+        fn(db)  # first call compiles and caches
+        db.expunge_all()
+        started = time.perf_counter()
+        for _ in range(calls):
+            fn(db)
+            # A request's session ends with the request
+            db.expunge_all()
+        elapsed = (time.perf_counter() - started) / calls
+
+        tracemalloc.start()
+        peaks = []
+        for _ in range(min(calls, 20)):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            fn(db)
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+            db.expunge_all()
+        tracemalloc.stop()
+    finally:
+        db.close()
+    result = {"name": name, "ms": elapsed * 1000, "peak_kb": sorted(peaks)[len(peaks) // 2] / 1024}
+    print(f"{name:<42} {result['ms']:8.2f} ms/page   {result['peak_kb']:9.1f} KB peak/page")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--page", type=int, default=1000)
+    args = parser.parse_args()
+    page = args.page
+
+    Base.metadata.create_all(engines.primary)
+    db = SessionLocal()
+    db.add_all([Author(id=i, name=f"author {i}", bio="bio " * 20) for i in range(1, page + 1)])
+    db.add(Category(id=1, name="category"))
+    db.add_all([
+        Book(title=f"book {i}", description="description " * 10, published_year=1950 + i % 70,
+             author_id=1 + i % page, category_id=1)
+        for i in range(page)
+    ])
+    db.commit()
+    book_view_repository.rebuild(db)
+    db.close()
+
+    authors = TypeAdapter(List[AuthorSchema])
+    books = TypeAdapter(List[BookInDBBase])
+    order = [("name", "asc")]
+    pairs = [
+        (
+            ("authors: ORM get_all + schema", lambda db: authors.validate_python(
+                author_repository.get_all(db, 0, page, order_by=order), from_attributes=True)),
+            ("authors: Core get_rows(as_dict) + schema", lambda db: authors.validate_python(
+                author_repository.get_rows(db, 0, page, order_by=order, as_dict=True))),
+        ),
+        (
+            ("books: ORM get_all + schema", lambda db: books.validate_python(
+                book_repository.get_all(db, 0, page), from_attributes=True)),
+            ("books: Core get_rows(as_dict) + schema", lambda db: books.validate_python(
+                book_repository.get_rows(db, 0, page, as_dict=True))),
+        ),
+        (
+            ("book_view: ORM get_all + payloads", lambda db: book_view_repository.to_json(
+                book_view_repository.get_all(db, 0, page))),
+            ("book_view: Core payload column", lambda db: book_view_repository.to_json(
+                book_view_repository.get_rows(db, 0, page, columns=("payload",)))),
+        ),
+    ]
+    for orm_case, core_case in pairs:
+        orm = measure(orm_case[0], args.calls, orm_case[1])
+        core = measure(core_case[0], args.calls, core_case[1])
+        print(f"{'':<42} {orm['ms'] / core['ms']:7.2f}x faster   {orm['peak_kb'] / core['peak_kb']:8.2f}x less memory")
+    engines.dispose()
+    os.remove(DATABASE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Microbenchmark of the per-call Python overhead of the repository reads
+
+Runs BaseRepository.get_all / get_one / count / get_by_id against a
+throwaway SQLite database, next to the legacy Query chain they replaced,
+and reports microseconds per call plus the compiled-cache outcome of the
+statements (every timed call must be a cache hit).
+
+Usage (from the repository root):
+    python benchmarks/repository_overhead.py --calls 5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DATABASE = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{DATABASE}"
+os.environ.setdefault("SLOW_QUERY_LOG_ENABLED", "false")
+
+from sqlalchemy import asc, desc  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.db.session import SessionLocal, engines  # noqa: E402
+from app.db.statement_cache import statement_cache_stats  # noqa: E402
+from app.models.author import Author  # noqa: E402
+from app.models.book import Book  # noqa: E402
+from app.models.category import Category  # noqa: E402
+import app.models  # noqa: E402,F401
+from app.repositories.book_repository import book_repository  # noqa: E402
+
+
+def legacy_get_all(db, filters, order_by, skip, limit):
+    """The Query chain used before the select() templates"""
+    query = db.query(Book)
+    for field, value in filters.items():
+        if hasattr(Book, field) and value is not None:
+            query = query.filter(getattr(Book, field) == value)
+    for field_name, direction in order_by:
+        if hasattr(Book, field_name):
+            field = getattr(Book, field_name)
+            query = query.order_by(desc(field) if direction.lower() == "desc" else asc(field))
+    return query.offset(skip).limit(limit).all()
+
+
+def legacy_count(db, filters):
+    query = db.query(Book)
+    for field, value in filters.items():
+        if hasattr(Book, field) and value is not None:
+            query = query.filter(getattr(Book, field) == value)
+    return query.count()
+
+
+def timed(name, calls, fn):
+    db = SessionLocal()
+    try:
+        fn(db, 0)  # first call compiles and caches
+        statement_cache_stats.reset()
+        started = time.perf_counter()
+        for i in range(calls):
+            fn(db, i)
+        elapsed = time.perf_counter() - started
+    finally:
+        db.close()
+    executions = statement_cache_stats.stats()["executions"]
+    print(f"{name:<28} {elapsed / calls * 1e6:8.1f} us/call   {executions}")
+    return executions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--calls", type=int, default=5000)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(engines.primary)
+    db = SessionLocal()
+    db.add_all([Author(id=i, name=f"author {i}") for i in range(1, 11)])
+    db.add(Category(id=1, name="category"))
+    db.add_all([
+        Book(title=f"book {i}", published_year=1950 + i % 70, author_id=1 + i % 10, category_id=1)
+        for i in range(1000)
+    ])
+    db.commit()
+    db.close()
+
+    order = [("published_year", "desc"), ("title", "asc")]
+    cases = [
+        ("legacy Query get_all", lambda db, i: legacy_get_all(db, {"author_id": 1 + i % 10}, order, 0, 5)),
+        ("select() get_all", lambda db, i: book_repository.get_all(db, 0, 5, {"author_id": 1 + i % 10}, order)),
+        ("legacy Query count", lambda db, i: legacy_count(db, {"author_id": 1 + i % 10})),
+        ("select() count", lambda db, i: book_repository.count(db, {"author_id": 1 + i % 10})),
+        ("select() get_one", lambda db, i: book_repository.get_one(db, {"author_id": 1 + i % 10})),
+        ("select() get_by_id", lambda db, i: book_repository.get_by_id(db, 1 + i % 1000)),
+    ]
+    failed = []
+    for name, fn in cases:
+        executions = timed(name, args.calls, fn)
+        if set(executions) != {"cache_hit"}:
+            failed.append(name)
+    engines.dispose()
+    os.remove(DATABASE)
+    if failed:
+        sys.exit(f"Compiled cache not hit by: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""add migration checkpoints
+
+Revision ID: 2c9e7f1b5d38
+Revises: f6a1d3e8b274
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c9e7f1b5d38'
+down_revision: Union[str, Sequence[str], None] = 'f6a1d3e8b274'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('migration_checkpoints',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('last_key', sa.Integer(), nullable=False),
+    sa.Column('rows_done', sa.Integer(), nullable=False),
+    sa.Column('completed', sa.Boolean(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('migration_checkpoints')
@@ -0,0 +1,34 @@
+"""add book filter indexes
+
+Revision ID: 5b8e0f3c7a21
+Revises: c41d8e2a9f63
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e0f3c7a21'
+down_revision: Union[str, Sequence[str], None] = 'c41d8e2a9f63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_books_published_year'), 'books', ['published_year'], unique=False)
+    op.create_index(op.f('ix_books_created_at'), 'books', ['created_at'], unique=False)
+    op.create_index('ix_books_author_id_created_at', 'books', ['author_id', 'created_at'], unique=False)
+    op.create_index('ix_books_category_id_created_at', 'books', ['category_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_books_category_id_created_at', table_name='books')
+    op.drop_index('ix_books_author_id_created_at', table_name='books')
+    op.drop_index(op.f('ix_books_created_at'), table_name='books')
+    op.drop_index(op.f('ix_books_published_year'), table_name='books')
@@ -0,0 +1,122 @@
+"""backfill book view
+
+Revision ID: 9a4b6e2d8c17
+Revises: 2c9e7f1b5d38
+Create Date: 2026-10-19 16:10:00.000000
+
+"""
+import json
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.online_migration import backfill, reset_checkpoint
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4b6e2d8c17'
+down_revision: Union[str, Sequence[str], None] = '2c9e7f1b5d38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Tables as of this revision (not the app's models, which keep changing)
+books = sa.table(
+    'books',
+    sa.column('id', sa.Integer),
+    sa.column('title', sa.String),
+    sa.column('description', sa.Text),
+    sa.column('published_year', sa.Integer),
+    sa.column('author_id', sa.Integer),
+    sa.column('category_id', sa.Integer),
+    sa.column('cover_image', sa.String),
+    sa.column('created_at', sa.DateTime(timezone=True)),
+    sa.column('updated_at', sa.DateTime(timezone=True)),
+)
+authors = sa.table('authors', sa.column('id', sa.Integer), sa.column('name', sa.String), sa.column('bio', sa.Text))
+categories = sa.table(
+    'categories', sa.column('id', sa.Integer), sa.column('name', sa.String), sa.column('description', sa.Text)
+)
+book_view = sa.table(
+    'book_view',
+    sa.column('id', sa.Integer),
+    sa.column('title', sa.String),
+    sa.column('published_year', sa.Integer),
+    sa.column('cover_image', sa.String),
+    sa.column('author_id', sa.Integer),
+    sa.column('author_name', sa.String),
+    sa.column('category_id', sa.Integer),
+    sa.column('category_name', sa.String),
+    sa.column('created_at', sa.DateTime(timezone=True)),
+    sa.column('updated_at', sa.DateTime(timezone=True)),
+    sa.column('payload', sa.Text),
+)
+
+
+def _datetime(value: datetime) -> str:
+    # Same format as pydantic's JSON output
+    text = value.isoformat()
+    return text[:-6] + 'Z' if text.endswith('+00:00') else text
+
+
+def render_payload(row) -> str:
+    """JSON of the Book response schema as of this revision (same field order)"""
+    return json.dumps({
+        'title': row.title,
+        'description': row.description,
+        'published_year': row.published_year,
+        'author_id': row.author_id,
+        'category_id': row.category_id,
+        'id': row.id,
+        'cover_image': row.cover_image,
+        'created_at': _datetime(row.created_at),
+        'updated_at': _datetime(row.updated_at),
+        'author': {'name': row.author_name, 'bio': row.author_bio, 'id': row.author_id},
+        'category': {'name': row.category_name, 'description': row.category_description, 'id': row.category_id},
+    }, ensure_ascii=False, separators=(',', ':'))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    def chunk(connection, lo, hi):
+        rows = connection.execute(
+            sa.select(
+                *books.c,
+                authors.c.name.label('author_name'),
+                authors.c.bio.label('author_bio'),
+                categories.c.name.label('category_name'),
+                categories.c.description.label('category_description'),
+            )
+            .join(authors, authors.c.id == books.c.author_id)
+            .join(categories, categories.c.id == books.c.category_id)
+            .where(books.c.id > lo, books.c.id <= hi)
+        ).all()
+        # Re-running a chunk (after an interruption) replaces its rows
+        connection.execute(sa.delete(book_view).where(book_view.c.id > lo, book_view.c.id <= hi))
+        if rows:
+            connection.execute(sa.insert(book_view), [
+                {
+                    'id': row.id,
+                    'title': row.title,
+                    'published_year': row.published_year,
+                    'cover_image': row.cover_image,
+                    'author_id': row.author_id,
+                    'author_name': row.author_name,
+                    'category_id': row.category_id,
+                    'category_name': row.category_name,
+                    'created_at': row.created_at,
+                    'updated_at': row.updated_at,
+                    'payload': render_payload(row),
+                }
+                for row in rows
+            ])
+
+    backfill('book_view', 'books', chunk)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    reset_checkpoint('book_view')
+    op.execute('DELETE FROM book_view')
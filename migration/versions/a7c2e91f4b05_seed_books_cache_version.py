@@ -0,0 +1,28 @@
+"""seed books cache version
+
+Revision ID: a7c2e91f4b05
+Revises: 3f9a6c1d2e7b
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c2e91f4b05'
+down_revision: Union[str, Sequence[str], None] = '3f9a6c1d2e7b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("INSERT INTO cache_versions (name, version) VALUES ('books', 0)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM cache_versions WHERE name = 'books'")
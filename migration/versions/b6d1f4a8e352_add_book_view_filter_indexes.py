@@ -0,0 +1,35 @@
+"""add book view filter indexes
+
+Revision ID: b6d1f4a8e352
+Revises: e3b5c8d1f940
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d1f4a8e352'
+down_revision: Union[str, Sequence[str], None] = 'e3b5c8d1f940'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('book_view', sa.Column('has_cover', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.execute("UPDATE book_view SET has_cover = (cover_image IS NOT NULL)")
+    op.create_index('ix_book_view_published_year_created_at', 'book_view', ['published_year', 'created_at'], unique=False)
+    op.create_index('ix_book_view_has_cover_created_at', 'book_view', ['has_cover', 'created_at'], unique=False)
+    op.drop_index(op.f('ix_book_view_cover_image'), table_name='book_view')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_book_view_cover_image'), 'book_view', ['cover_image'], unique=False)
+    op.drop_index('ix_book_view_has_cover_created_at', table_name='book_view')
+    op.drop_index('ix_book_view_published_year_created_at', table_name='book_view')
+    op.drop_column('book_view', 'has_cover')
@@ -0,0 +1,39 @@
+"""add trigram indexes
+
+Revision ID: c41d8e2a9f63
+Revises: a7c2e91f4b05
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d8e2a9f63'
+down_revision: Union[str, Sequence[str], None] = 'a7c2e91f4b05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Fuzzy search uses pg_trgm on Postgres; other databases use the
+    # in-app trigram index and need nothing here.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_books_title_trgm', 'books', ['title'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+    op.create_index('ix_authors_name_trgm', 'authors', ['name'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_authors_name_trgm', table_name='authors')
+    op.drop_index('ix_books_title_trgm', table_name='books')
@@ -0,0 +1,34 @@
+"""add book sort indexes
+
+Revision ID: d7f2a9c4e681
+Revises: c4e8a1f7b293
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7f2a9c4e681'
+down_revision: Union[str, Sequence[str], None] = 'c4e8a1f7b293'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_books_updated_at'), 'books', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_books_cover_image'), 'books', ['cover_image'], unique=False)
+    op.create_index(op.f('ix_book_view_updated_at'), 'book_view', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_book_view_cover_image'), 'book_view', ['cover_image'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_book_view_cover_image'), table_name='book_view')
+    op.drop_index(op.f('ix_book_view_updated_at'), table_name='book_view')
+    op.drop_index(op.f('ix_books_cover_image'), table_name='books')
+    op.drop_index(op.f('ix_books_updated_at'), table_name='books')
@@ -0,0 +1,28 @@
+"""add change log entity index
+
+Revision ID: e3b5c8d1f940
+Revises: d7f2a9c4e681
+Create Date: 2026-10-19 18:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b5c8d1f940'
+down_revision: Union[str, Sequence[str], None] = 'd7f2a9c4e681'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_change_log_entity_seq', 'change_log', ['entity', 'seq'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_change_log_entity_seq', table_name='change_log')
@@ -0,0 +1,58 @@
+"""add book view
+
+Revision ID: f6a1d3e8b274
+Revises: e3b7c5d91a42
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a1d3e8b274'
+down_revision: Union[str, Sequence[str], None] = 'e3b7c5d91a42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The table starts empty: fill it with `python -m app.cli rebuild-book-view`
+    op.create_table('book_view',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('published_year', sa.Integer(), nullable=False),
+    sa.Column('cover_image', sa.String(length=255), nullable=True),
+    sa.Column('author_id', sa.Integer(), nullable=False),
+    sa.Column('author_name', sa.String(length=255), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('category_name', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_book_view_title'), 'book_view', ['title'], unique=False)
+    op.create_index(op.f('ix_book_view_published_year'), 'book_view', ['published_year'], unique=False)
+    op.create_index(op.f('ix_book_view_created_at'), 'book_view', ['created_at'], unique=False)
+    op.create_index('ix_book_view_author_id_created_at', 'book_view', ['author_id', 'created_at'], unique=False)
+    op.create_index('ix_book_view_category_id_created_at', 'book_view', ['category_id', 'created_at'], unique=False)
+    if op.get_bind().dialect.name == 'postgresql':
+        # Keyword search (ILIKE '%...%') moved from books to book_view
+        op.create_index('ix_book_view_title_trgm', 'book_view', ['title'], unique=False,
+                        postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_book_view_title_trgm', table_name='book_view')
+    op.drop_index('ix_book_view_category_id_created_at', table_name='book_view')
+    op.drop_index('ix_book_view_author_id_created_at', table_name='book_view')
+    op.drop_index(op.f('ix_book_view_created_at'), table_name='book_view')
+    op.drop_index(op.f('ix_book_view_published_year'), table_name='book_view')
+    op.drop_index(op.f('ix_book_view_title'), table_name='book_view')
+    op.drop_table('book_view')
@@ -0,0 +1,30 @@
+import os
+import tempfile
+
+import pytest
+
+# Point the app at a throwaway SQLite database before anything imports it
+DATABASE = os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{DATABASE}"
+os.environ.setdefault("SLOW_QUERY_LOG_ENABLED", "false")
+
+from app.db.base import Base  # noqa: E402
+from app.db.session import SessionLocal, engines  # noqa: E402
+import app.models  # noqa: E402,F401
+
+
+@pytest.fixture(scope="session")
+def engine():
+    Base.metadata.create_all(engines.primary)
+    yield engines.primary
+    engines.dispose()
+    os.remove(DATABASE)
+
+
+@pytest.fixture
+def db(engine):
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,21 @@
+"""EXPLAIN QUERY PLAN checks of the change feed (GET /api/v1/changes)"""
+from sqlalchemy import event
+
+from app.repositories.change_log_repository import change_log_repository
+
+
+def test_entity_feed_searches_entity_seq_index(engine, db):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        change_log_repository.get_since(db, since=10, limit=100, entity="books")
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    statement, parameters = statements[-1]
+    with engine.connect() as connection:
+        plan = [row[3] for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+    assert plan == ["SEARCH change_log USING INDEX ix_change_log_entity_seq (entity=? AND seq>?)"], plan
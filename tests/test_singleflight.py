@@ -0,0 +1,44 @@
+"""SingleFlight coalescing of concurrent async callers"""
+import asyncio
+
+from app.core.singleflight import SingleFlight
+
+
+def test_concurrent_awaiters_run_fn_once():
+    singleflight = SingleFlight()
+    runs = []
+
+    async def load():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*[singleflight.do_async("key", load) for _ in range(10)])
+
+    assert asyncio.run(main()) == ["result"] * 10
+    assert len(runs) == 1
+    assert singleflight.stats()["shared"] == 9
+    assert singleflight.stats()["in_flight"] == 0
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    singleflight = SingleFlight()
+    runs = []
+
+    async def load():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        leader = asyncio.create_task(singleflight.do_async("key", load))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(singleflight.do_async("key", load)) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        results = await asyncio.gather(*followers)
+        return leader.cancelled(), results
+
+    assert asyncio.run(main()) == (True, ["result"] * 3)
+    assert len(runs) == 1